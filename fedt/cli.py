@@ -3,9 +3,15 @@ import argparse
 import time
 
 from fedt.server import run_server
+from fedt.edge import run_edge
+from fedt.simulation import simulate
+from fedt.stats import show_server_stats
 from fedt.run_clients import run_clients, run_clients_with_a_specific_strategy
 from fedt.settings import aggregation_strategies, number_of_simulations
 from fedt.utils import find_target_processes, kill_processes
+from fedt.dataset import prepare_dataset
+from fedt.settings import number_of_clients, dataset_seed, client_shared_memory, edge_config, simulation_config
+from fedt.settings import imported_aggregation_strategy
 
 import subprocess, signal, os
 from multiprocessing import Process
@@ -14,6 +20,8 @@ def cmd_server():
     return asyncio.run(run_server())
 def cmd_server_with_args(strategy):
     return asyncio.run(run_server(strategy))
+def cmd_edge(edge_id, host, port, clients, upstream):
+    return asyncio.run(run_edge(edge_id, port, clients, upstream, host=host))
 
 def run_server_many_times():
     for strategy in aggregation_strategies:
@@ -103,8 +111,24 @@ def main():
     run_server_parser = run_subparsers.add_parser("server", help="Roda o servidor")
     run_server_parser.set_defaults(func=cmd_server)
 
+    # Subcomando: run edge
+    run_edge_parser = run_subparsers.add_parser("edge", help="Roda um agregador intermediário (edge)")
+    run_edge_parser.add_argument("--edge-id", type=int, required=True, help="ID do edge (client_ID dele no root)")
+    run_edge_parser.add_argument("--host", default=edge_config["IP"], help="Endereço local onde o edge escuta os clientes")
+    run_edge_parser.add_argument("--port", default=edge_config["port"], help="Porta onde os clientes do edge se conectam")
+    run_edge_parser.add_argument("--clients", type=int, default=edge_config["number_of_clients"], help="Número de clientes ligados ao edge")
+    run_edge_parser.add_argument(
+        "--upstream", default=f"{edge_config['upstream_IP']}:{edge_config['upstream_port']}",
+        help="Endereço do servidor root (host:porta)"
+    )
+    run_edge_parser.set_defaults(func=cmd_edge)
+
     # Subcomando: run clients
     run_clients_parser = run_subparsers.add_parser("clients", help="Roda os clientes")
+    run_clients_parser.add_argument(
+        "--shared-memory", action="store_true", default=client_shared_memory,
+        help="Carrega o dataset uma vez em memória compartilhada para todos os clientes"
+    )
     run_clients_parser.set_defaults(func=run_clients)
 
     # Subcomando: run many-serverr
@@ -123,10 +147,55 @@ def main():
     # Define o comportamento padrão de "run" sem subcomando
     run_parser.set_defaults(func=run_server_and_clients)
 
+    # Subcomando principal: simulate
+    simulate_parser = subparsers.add_parser(
+        "simulate", help="Roda o servidor e todos os clientes como tarefas asyncio num único processo"
+    )
+    simulate_parser.add_argument("--clients", type=int, default=number_of_clients, help="Número de clientes simulados")
+    simulate_parser.add_argument("--strategy", default=imported_aggregation_strategy, help="Estratégia de agregação")
+    simulate_parser.add_argument(
+        "--fit-workers", type=int, default=simulation_config["fit_workers"],
+        help="Processos que treinam as florestas locais (0 = um por CPU)"
+    )
+    simulate_parser.add_argument(
+        "--launch-interval", type=float, default=simulation_config["launch_interval"],
+        help="Segundos entre o início de dois clientes"
+    )
+    simulate_parser.add_argument(
+        "--server", action=argparse.BooleanOptionalAction, default=True,
+        help="Inicia o servidor junto (--no-server conecta a um servidor já em execução)"
+    )
+    simulate_parser.set_defaults(func=simulate)
+
+    # Subcomando principal: stats
+    stats_parser = subparsers.add_parser(
+        "stats", help="Mostra as estatísticas ao vivo de um servidor (ou edge) em execução"
+    )
+    stats_parser.add_argument("--address", default=None, help="Endereço do servidor (host:porta); padrão: o do config.toml")
+    stats_parser.add_argument("--watch", type=float, default=0.0, help="Repete a consulta a cada N segundos")
+    stats_parser.set_defaults(func=show_server_stats)
+
+    # Subcomando principal: dataset
+    dataset_parser = subparsers.add_parser("dataset", help="Prepara o dataset")
+    dataset_subparsers = dataset_parser.add_subparsers(dest="target", help="")
+
+    # Subcomando: dataset prepare
+    dataset_prepare_parser = dataset_subparsers.add_parser(
+        "prepare", help="Converte o CSV para .npy e grava os shards de cada cliente"
+    )
+    dataset_prepare_parser.add_argument("--clients", type=int, default=number_of_clients, help="Número de shards (clientes)")
+    dataset_prepare_parser.add_argument("--seed", type=int, default=dataset_seed, help="Seed do sorteio dos shards")
+    dataset_prepare_parser.set_defaults(func=prepare_dataset)
+
     args = parser.parse_args()
 
     if hasattr(args, "func"):
-        args.func()
+        # Os argumentos do subcomando são repassados para a função.
+        func_args = {
+            key: value for key, value in vars(args).items()
+            if key not in ("command", "target", "func")
+        }
+        args.func(**func_args)
     else:
         parser.print_help()
 
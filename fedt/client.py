@@ -1,25 +1,27 @@
 import asyncio
 import time
-import os
-import json
 import gc 
 
 import grpc
-import grpc.aio as grpc_aio
 
 from fedt.settings import (
     server_ip, server_port, number_of_rounds, 
-    client_timeout, client_debug, 
-    imported_aggregation_strategy, results_folder
+    client_timeout, client_fetch_timeout, client_debug, 
+    imported_aggregation_strategy, results_folder, transport_config
 )
 from fedt import utils
 from fedt.utils import create_specific_result_folder
 from fedt.utils import format_time
+from fedt.tree_store import TreeStore
+from fedt.transport import create_channel
+from fedt.traffic import RpcTraffic, client_interceptors
+from fedt.tracing import Tracer, trace_file_path, CLIENT_TRACE_PID_OFFSET
+from fedt.metrics import MetricsWriter, next_metrics_file_path
 from fedt import fedT_pb2
 from fedt import fedT_pb2_grpc
 
-from sklearn.ensemble import RandomForestRegressor
-from client_utils import HouseClient
+from fedt.forest import ForestContainer
+from fedt.client_utils import HouseClient, fit_local_trees
 
 import argparse
 import logging
@@ -43,181 +45,463 @@ parse.add_argument(
     default=imported_aggregation_strategy,
     help="Nome da estratégia (opcional)"
 )
-args = parse.parse_args()
-ID = args.client_id
-aggregation_strategy = args.strategy
-
-log_level = logging.DEBUG if client_debug else logging.INFO
-logger = utils.setup_logger(
-    name=f"Client {ID}",
-    log_file=f"fedt_client_{ID}.log",
-    level=log_level
+parse.add_argument(
+    "--shm-name",
+    type=str,
+    default=None,
+    help="Bloco de memória compartilhada com o dataset (opcional)"
+)
+parse.add_argument(
+    "--server-address",
+    type=str,
+    default=f"{server_ip}:{server_port}",
+    help="Endereço do servidor ou do edge (host:porta)"
 )
 
 
-def send_stream_trees(serialise_trees:bytes, client_ID:int):
+def send_stream_trees(serialise_trees:bytes, client_ID:int, client_round:int):
     async def _gen():
         for tree in serialise_trees:
             msg = fedT_pb2.Forest_CLient()
             msg.client_ID = client_ID
+            msg.round = client_round
             msg.serialised_tree = tree
             yield msg
             await asyncio.sleep(0)
     return _gen()
 
-async def run():
-    base_file_name = f"{aggregation_strategy}_client-id-{ID}"
-    results_folder = create_specific_result_folder(results_folder, aggregation_strategy, f"client-id-{ID}") 
-    existing_files = [
-        file for file in os.listdir(results_folder)
-        if file.startswith(base_file_name) and file.endswith(".json")
-    ]
-    next_file_index = len(existing_files) + 1
-    result_file_name = f"{base_file_name}_{next_file_index}.json"
-    result_file_path = (results_folder / result_file_name).resolve()
-
-    logger.warning(f"Result path: {result_file_path}")
-
-    async with grpc_aio.insecure_channel(f"{server_ip}:{server_port}") as channel:
-        stub = fedT_pb2_grpc.FedTStub(channel)
-
-        dataset = utils.load_house_client()
-
-        for round_idx in range(number_of_rounds):
-            round_start_time = time.time()
-            logger.warning(f"Round: {round_idx}")
-
-            request_settings = fedT_pb2.Request_Server(client_ID=ID)
-            server_reply_settings = await stub.get_server_settings(request_settings)
-            trees_by_client = server_reply_settings.trees_by_client
-            server_round = getattr(server_reply_settings, "current_round", None)
-
-            logger.debug(f"Trees by client: {trees_by_client}.")
-
-            wait_start = time.time()
-            while server_round is not None and server_round < round_idx:
-                logger.info(f"Servidor no round {server_round}, esperando atingir round {round_idx}...")
-                await asyncio.sleep(5)
-                server_reply_settings = await stub.get_server_settings(request_settings)
-                server_round = server_reply_settings.current_round
-                trees_by_client = server_reply_settings.trees_by_client
-                if time.time() - wait_start > client_timeout:
-                    raise RuntimeError(f"[Client {ID}] Timeout esperando servidor avançar do round {server_round} para {round_idx}")
-
-            request_model = fedT_pb2.Request_Server(client_ID=ID)
-            server_trees_serialised = []
-            async for server_reply in stub.get_server_model(request_model):
-                server_trees_serialised.append(server_reply.serialised_tree)
-
-            first_server_serialise_trees_size = utils.get_size_of_many_serialised_models(server_trees_serialised)
-            logger.debug(f"Early Server Model in MB: {first_server_serialise_trees_size/(1024**2)}")
-
-            loop = asyncio.get_running_loop()
-            server_trees_deserialise = await loop.run_in_executor(
-                executor,
-                utils.deserialise_several_trees,
-                server_trees_serialised
-            )
-            del server_trees_serialised
-            gc.collect()
-
-            server_model = RandomForestRegressor(
-                n_estimators=trees_by_client,
-                max_depth=3,
-                warm_start=True
-            )
-            server_model.fit(dataset[0], dataset[1])
-            server_model.estimators_ = server_trees_deserialise
-
-            fit_start_time = time.time()
-            client = HouseClient(trees_by_client, dataset, ID)
-            fit_time = time.time() - fit_start_time
-
-            (absolute_error, squared_error, (pearson_corr, p_value), best_trees) = client.evaluate(server_model)
-            logger.info(f"\nModelo Inicial:\nAbsolute Error: {absolute_error:.3f}\nSquared Error: {squared_error:.3f}\nPearson: {pearson_corr:.3f}")
-
-            serialise_trees = await loop.run_in_executor(
-                executor,
-                utils.serialise_several_trees,
-                client.trees
-            )
-            client_serialise_trees_size = utils.get_size_of_many_serialised_models(serialise_trees)
-            logger.debug(f"Local Model in MB: {client_serialise_trees_size/(1024**2)}")
-
-            server_trees_serialised = []
-            async for reply in stub.aggregate_trees(send_stream_trees(serialise_trees, ID)):
-                server_trees_serialised.append(reply.serialised_tree)
-
-            del serialise_trees
-            gc.collect()
-
-            logger.info("Modelo global recebido")
-
-            request_end = fedT_pb2.Request_Server(client_ID=ID)
-            await stub.end_of_transmission(request_end)
+def send_stream_chunks(serialise_trees:list[bytes], client_ID:int, client_round:int, chunk_size:int, tree_hashes=(), known_hashes=()):
+    async def _gen():
+        chunks = list(utils.chunk_serialised_trees(serialise_trees, chunk_size)) or [[]]
+        yield fedT_pb2.Forest_Chunk_Client(
+            client_ID=client_ID,
+            round=client_round,
+            serialised_trees=chunks[0],
+            tree_hashes=tree_hashes,
+            known_hashes=known_hashes
+        )
+        for chunk in chunks[1:]:
+            yield fedT_pb2.Forest_Chunk_Client(client_ID=client_ID, round=client_round, serialised_trees=chunk)
+    return _gen()
 
-            server_trees_deserialised = await loop.run_in_executor(
-                executor,
-                utils.deserialise_several_trees,
-                server_trees_serialised
+async def receive_stream_chunks(replies, tree_store:TreeStore):
+    """
+    Recebe o modelo em lotes, guardando as árvores novas no tree_store.
+    Retorna os hashes do modelo e quantos bytes de árvores chegaram.
+    """
+    hashes = []
+    received_bytes = 0
+    async for reply in replies:
+        for tree in reply.serialised_trees:
+            hashes.append(tree_store.add_serialised(tree))
+            received_bytes += len(tree)
+        hashes.extend(reply.tree_hashes)
+    return hashes, received_bytes
+
+async def fetch_global_model(stub, client_ID:int, client_round:int, tree_store:TreeStore):
+    """
+    Baixa o modelo global do round com long-poll: o servidor responde quando a agregação terminar.
+    Se o long-poll expira, a busca é repetida (sem reenviar as árvores) até o timeout do cliente.
+    Retorna os hashes do modelo e quantos bytes de árvores chegaram.
+    """
+    wait_start = time.time()
+    while True:
+        request = fedT_pb2.Request_Server(client_ID=client_ID, round=client_round, known_hashes=tree_store.hashes())
+        try:
+            return await receive_stream_chunks(
+                stub.fetch_global_model(request, timeout=client_fetch_timeout),
+                tree_store
             )
-            server_model.estimators_ = server_trees_deserialised
-
-            final_server_serialise_trees_size = utils.get_size_of_many_serialised_models(server_trees_serialised)
-            logger.debug(f"Final Server Model in MB: {final_server_serialise_trees_size/(1024**2)}")
+        except grpc.aio.AioRpcError as error:
+            if error.code() != grpc.StatusCode.DEADLINE_EXCEEDED or time.time() - wait_start > client_timeout:
+                raise
+
+def split_known_trees(trees, tree_store:TreeStore, server_hashes:set):
+    """
+    Separa as árvores que o servidor já possui (enviadas só pelo hash) das que precisam ser serializadas.
+    """
+    tree_hashes = []
+    serialise_trees = []
+    for tree in trees:
+        digest = tree_store.hash_of(tree)
+        if digest is not None and digest in server_hashes:
+            tree_hashes.append(digest)
+        else:
+            digest = tree_store.add_tree(tree)
+            serialise_trees.append(tree_store.get_serialised(digest))
+    return serialise_trees, tree_hashes
+
+class RoundWatcher():
+    """
+    Acompanha, numa tarefa em segundo plano, os eventos de round enviados pelo servidor (subscribe_rounds).
+    Se o servidor não oferece o stream, ou ele cai, `wait_for_round` retorna False e o cliente volta ao polling.
+    """
+
+    def __init__(self, stub: fedT_pb2_grpc.FedTStub, client_ID) -> None:
+        self.stub = stub
+        self.client_ID = client_ID
+        self.current_round = None
+        self.trees_by_client = None
+        self.finished = False
+        self.closed = False
+        self.changed = asyncio.Condition()
+        self._task = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._listen())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _listen(self) -> None:
+        try:
+            async for event in self.stub.subscribe_rounds(fedT_pb2.Request_Server(client_ID=self.client_ID)):
+                async with self.changed:
+                    if event.kind == fedT_pb2.Round_Event.TRAINING_FINISHED:
+                        self.finished = True
+                    self.current_round = event.round
+                    self.trees_by_client = event.trees_by_client
+                    self.changed.notify_all()
+        except grpc.aio.AioRpcError:
+            # UNIMPLEMENTED (servidor antigo) ou UNAVAILABLE (servidor desligando): fica o polling.
+            pass
+        finally:
+            async with self.changed:
+                self.closed = True
+                self.changed.notify_all()
+
+    def _reached(self, round_idx) -> bool:
+        return self.finished or (self.current_round is not None and self.current_round >= round_idx)
+
+    async def wait_for_round(self, round_idx, timeout) -> bool:
+        """
+        ### Função:
+        Esperar o servidor chegar no round `round_idx` (ou encerrar o treinamento).
+        ### Returns:
+        - True se o round chegou; False se o stream não está disponível ou o tempo acabou.
+        """
+        async with self.changed:
+            try:
+                await asyncio.wait_for(
+                    self.changed.wait_for(lambda: self.closed or self._reached(round_idx)),
+                    max(timeout, 0)
+                )
+            except asyncio.TimeoutError:
+                pass
+            return self._reached(round_idx)
+
+async def run(ID, aggregation_strategy=imported_aggregation_strategy, server_address=f"{server_ip}:{server_port}",
+              shm_name=None, fit_executor=None):
+    """
+    ### Função:
+    Rodar um cliente do início ao fim do treinamento.
+    ### Args:
+    - ID: ID do cliente.
+    - aggregation_strategy: Estratégia usada no servidor (nome da pasta de resultados).
+    - server_address: Endereço do servidor ou do edge (host:porta).
+    - shm_name: Bloco de memória compartilhada com o dataset (opcional).
+    - fit_executor: Pool de processos onde a floresta local é treinada (opcional, usado pelo `fedt simulate`).
+    """
+    log_level = logging.DEBUG if client_debug else logging.INFO
+    logger = utils.setup_logger(
+        name=f"Client {ID}",
+        log_file=f"fedt_client_{ID}.log",
+        level=log_level
+    )
+    # Último round anunciado pelo servidor, usado para reconhecer o encerramento do treinamento.
+    last_server_round = None
+    round_watcher = None
 
+    base_file_name = f"{aggregation_strategy}_client-id-{ID}"
+    client_results_folder = create_specific_result_folder(results_folder, aggregation_strategy, f"client-id-{ID}") 
+    result_file_path = next_metrics_file_path(client_results_folder, base_file_name)
+    metrics_writer = MetricsWriter(result_file_path)
 
-            evaluate_start_time = time.time()
-            (absolute_error, squared_error, (pearson_corr, p_value), best_trees) = await loop.run_in_executor(
-                executor,
-                client.evaluate,
-                server_model
-            )
-            evaluate_time = time.time() - evaluate_start_time
-            logger.info(f"\nModelo Final:\nAbsolute Error: {absolute_error:.3f}\nSquared Error: {squared_error:.3f}\nPearson: {pearson_corr:.3f}")
-
-            round_end_time = time.time()
-            round_time = round_end_time - round_start_time
+    logger.warning(f"Result path: {result_file_path}")
 
-            start_inference_time = time.time()
-            await loop.run_in_executor(
-                executor,
-                client.evaluate_inference_time,
-                100
-            )
-            inference_time = time.time() - start_inference_time
-            logger.debug(f"\nDuração do Round: {format_time(round_time)}\nTempo de treinamento: {format_time(fit_time)}\nTempo de avaliação: {format_time(evaluate_time)}\nTempo de inferência: {format_time(inference_time)}")
-
-            del server_model, client, server_trees_serialised, server_trees_deserialised
-
-            metrics = {
-                "trees_by_client": trees_by_client,
-                "first_server_serialise_trees_size": first_server_serialise_trees_size,
-                "fit_time": fit_time,
-                "client_serialise_trees_size": client_serialise_trees_size,
-                "final_server_serialise_trees_size": final_server_serialise_trees_size,
-                "squared_error": squared_error,
-                "pearson_corr": pearson_corr,
-                "round_time": round_time,
-                "round_start_time": round_start_time,
-                "round_end_time": round_end_time,
-                "evaluate_time": evaluate_time,
-                "inference_time": inference_time
-            }
-            if result_file_path.exists():
-                with open(result_file_path, "r", encoding="utf-8") as file:
-                    data = json.load(file)
-            else:
-                data = {}
-
-            data[server_round] = metrics
-            with open(result_file_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=4, ensure_ascii=False)
-
-            gc.collect()
-            await asyncio.sleep(15)
+    round_idx = -1
+    # Bytes, mensagens e duração das RPCs deste cliente, contados no round em que acontecem.
+    traffic = RpcTraffic(lambda: round_idx)
+    interceptors = client_interceptors(traffic, ID) if transport_config["rpc_accounting"] else None
+    tracer = Tracer(trace_file_path(aggregation_strategy, result_file_path), f"client-id-{ID}", CLIENT_TRACE_PID_OFFSET + ID)
+
+    try:
+        async with create_channel(server_address, interceptors=interceptors) as channel:
+            stub = fedT_pb2_grpc.FedTStub(channel)
+            round_watcher = RoundWatcher(stub, ID)
+            round_watcher.start()
+
+            dataset = utils.load_house_client(ID, shm_name)
+            tree_store = TreeStore()
+            # Árvores que o servidor garantidamente possui: o último modelo global recebido.
+            server_hashes = set()
+
+            while round_idx + 1 < number_of_rounds:
+                round_idx += 1
+                round_start_time = time.time()
+                logger.warning(f"Round: {round_idx}")
+
+                request_settings = fedT_pb2.Request_Server(client_ID=ID)
+                with tracer.span("get_settings", round=round_idx):
+                    server_reply_settings = await stub.get_server_settings(request_settings)
+                trees_by_client = server_reply_settings.trees_by_client
+                server_round = getattr(server_reply_settings, "current_round", None)
+                last_server_round = server_round
+                # No modo assíncrono não há rounds no servidor: o upload leva a versão do modelo baixado.
+                asynchronous = server_reply_settings.asynchronous
+
+                # Se o round fechou sem este cliente (quorum ou prazo), pula para o round atual do servidor.
+                if not asynchronous and server_round is not None and server_round > round_idx:
+                    logger.warning(f"Servidor já está no round {server_round}, pulando do round {round_idx}.")
+                    round_idx = server_round
+                    if round_idx >= number_of_rounds:
+                        break
+
+                upload_round = server_reply_settings.model_version if asynchronous else round_idx
+                # Servidores que não anunciam chunk_size só aceitam uma árvore por mensagem.
+                chunk_size = server_reply_settings.chunk_size
+                tree_dedup = chunk_size > 0 and server_reply_settings.tree_dedup
+                # Upload confirmado na hora e modelo global baixado à parte (fetch_global_model).
+                upload_ack = chunk_size > 0 and server_reply_settings.upload_ack
+
+                logger.debug(f"Trees by client: {trees_by_client}.")
+
+                wait_start = time.time()
+                waited = False
+                while not asynchronous and server_round is not None and server_round < round_idx:
+                    waited = True
+                    logger.info(f"Servidor no round {server_round}, esperando atingir round {round_idx}...")
+                    if not await round_watcher.wait_for_round(round_idx, client_timeout - (time.time() - wait_start)):
+                        await asyncio.sleep(5)
+                    server_reply_settings = await stub.get_server_settings(request_settings)
+                    server_round = server_reply_settings.current_round
+                    last_server_round = server_round
+                    trees_by_client = server_reply_settings.trees_by_client
+                    if time.time() - wait_start > client_timeout:
+                        raise RuntimeError(f"[Client {ID}] Timeout esperando servidor avançar do round {server_round} para {round_idx}")
+                if waited:
+                    tracer.complete("wait_round", wait_start, time.time(), round=round_idx)
+
+                loop = asyncio.get_running_loop()
+                if tree_dedup:
+                    request_model = fedT_pb2.Request_Server(client_ID=ID, known_hashes=tree_store.hashes())
+                    with tracer.span("download_model", round=round_idx):
+                        server_model_hashes, first_server_serialise_trees_size = await receive_stream_chunks(
+                            stub.get_server_model_packed(request_model),
+                            tree_store
+                        )
+                    server_hashes.update(server_model_hashes)
+                    with tracer.span("deserialise_model", round=round_idx):
+                        server_trees_deserialise = await loop.run_in_executor(
+                            executor,
+                            tree_store.get_several_trees,
+                            server_model_hashes
+                        )
+                else:
+                    request_model = fedT_pb2.Request_Server(client_ID=ID)
+                    server_trees_serialised = []
+                    with tracer.span("download_model", round=round_idx):
+                        if chunk_size > 0:
+                            async for server_reply in stub.get_server_model_packed(request_model):
+                                server_trees_serialised.extend(server_reply.serialised_trees)
+                        else:
+                            async for server_reply in stub.get_server_model(request_model):
+                                server_trees_serialised.append(server_reply.serialised_tree)
+
+                    first_server_serialise_trees_size = utils.get_size_of_many_serialised_models(server_trees_serialised)
+
+                    with tracer.span("deserialise_model", round=round_idx):
+                        server_trees_deserialise = await loop.run_in_executor(
+                            executor,
+                            utils.deserialise_several_trees,
+                            server_trees_serialised
+                        )
+                    del server_trees_serialised
+                    gc.collect()
+
+                logger.debug(f"Early Server Model in MB: {first_server_serialise_trees_size/(1024**2)}")
+
+                server_model = ForestContainer(server_trees_deserialise)
+
+                # A construção do HouseClient (FlatForest e predições de teste) e a avaliação rodam fora do event loop,
+                # que no `fedt simulate` é compartilhado por todos os clientes, pelo gRPC e pelos RoundWatchers.
+                fit_start_time = time.time()
+                if fit_executor is None:
+                    client = await loop.run_in_executor(executor, HouseClient, trees_by_client, dataset, ID)
+                else:
+                    local_trees = await loop.run_in_executor(fit_executor, fit_local_trees, trees_by_client, ID, shm_name)
+                    client = await loop.run_in_executor(executor, HouseClient, trees_by_client, dataset, ID, local_trees)
+                fit_time = time.time() - fit_start_time
+                tracer.complete("fit", fit_start_time, fit_start_time + fit_time, round=round_idx, trees=trees_by_client)
+
+                with tracer.span("evaluate_initial_model", round=round_idx):
+                    (absolute_error, squared_error, (pearson_corr, p_value), best_trees) = await loop.run_in_executor(
+                        executor,
+                        client.evaluate,
+                        server_model
+                    )
+                logger.info(f"\nModelo Inicial:\nAbsolute Error: {absolute_error:.3f}\nSquared Error: {squared_error:.3f}\nPearson: {pearson_corr:.3f}")
+
+                with tracer.span("serialise", round=round_idx):
+                    if tree_dedup:
+                        serialise_trees, tree_hashes = await loop.run_in_executor(
+                            executor,
+                            split_known_trees,
+                            client.trees,
+                            tree_store,
+                            server_hashes
+                        )
+                    else:
+                        serialise_trees = await loop.run_in_executor(
+                            executor,
+                            utils.serialise_several_trees,
+                            client.trees
+                        )
+                client_serialise_trees_size = utils.get_size_of_many_serialised_models(serialise_trees)
+                logger.debug(f"Local Model in MB: {client_serialise_trees_size/(1024**2)}")
+
+                # Com upload_ack, o envio e a espera pela agregação são spans separados; nos protocolos
+                # antigos o modelo global volta na mesma chamada do upload ("upload_and_wait_aggregation").
+                if tree_dedup and upload_ack:
+                    with tracer.span("upload", round=round_idx, bytes=client_serialise_trees_size):
+                        await stub.upload_trees(send_stream_chunks(
+                            serialise_trees, ID, upload_round, chunk_size, tree_hashes=tree_hashes
+                        ))
+                    with tracer.span("wait_aggregation", round=round_idx):
+                        final_server_model_hashes, final_server_serialise_trees_size = await fetch_global_model(
+                            stub, ID, upload_round, tree_store
+                        )
+                elif tree_dedup:
+                    with tracer.span("upload_and_wait_aggregation", round=round_idx, bytes=client_serialise_trees_size):
+                        final_server_model_hashes, final_server_serialise_trees_size = await receive_stream_chunks(
+                            stub.aggregate_trees_packed(send_stream_chunks(
+                                serialise_trees, ID, upload_round, chunk_size,
+                                tree_hashes=tree_hashes,
+                                known_hashes=tree_store.hashes()
+                            )),
+                            tree_store
+                        )
+                else:
+                    server_trees_serialised = []
+                    if upload_ack:
+                        with tracer.span("upload", round=round_idx, bytes=client_serialise_trees_size):
+                            await stub.upload_trees(send_stream_chunks(serialise_trees, ID, upload_round, chunk_size))
+                        download_store = TreeStore()
+                        with tracer.span("wait_aggregation", round=round_idx):
+                            download_hashes, _ = await fetch_global_model(stub, ID, upload_round, download_store)
+                        server_trees_serialised = [download_store.get_serialised(digest) for digest in download_hashes]
+                        del download_store
+                    else:
+                        with tracer.span("upload_and_wait_aggregation", round=round_idx, bytes=client_serialise_trees_size):
+                            if chunk_size > 0:
+                                async for reply in stub.aggregate_trees_packed(send_stream_chunks(serialise_trees, ID, upload_round, chunk_size)):
+                                    server_trees_serialised.extend(reply.serialised_trees)
+                            else:
+                                async for reply in stub.aggregate_trees(send_stream_trees(serialise_trees, ID, upload_round)):
+                                    server_trees_serialised.append(reply.serialised_tree)
+                    final_server_serialise_trees_size = utils.get_size_of_many_serialised_models(server_trees_serialised)
+
+                del serialise_trees
+                gc.collect()
+
+                logger.info("Modelo global recebido")
+
+                request_end = fedT_pb2.Request_Server(client_ID=ID, round=upload_round)
+                with tracer.span("end_of_transmission", round=round_idx):
+                    await stub.end_of_transmission(request_end)
+
+                with tracer.span("deserialise_global_model", round=round_idx):
+                    if tree_dedup:
+                        server_trees_deserialised = await loop.run_in_executor(
+                            executor,
+                            tree_store.get_several_trees,
+                            final_server_model_hashes
+                        )
+                        # O servidor mantém as árvores da última agregação; o resto pode ser descartado.
+                        tree_store.retain(final_server_model_hashes)
+                        server_hashes = set(final_server_model_hashes)
+                    else:
+                        server_trees_deserialised = await loop.run_in_executor(
+                            executor,
+                            utils.deserialise_several_trees,
+                            server_trees_serialised
+                        )
+                        del server_trees_serialised
+                server_model.estimators_ = server_trees_deserialised
+
+                logger.debug(f"Final Server Model in MB: {final_server_serialise_trees_size/(1024**2)}")
+
+
+                evaluate_start_time = time.time()
+                (absolute_error, squared_error, (pearson_corr, p_value), best_trees) = await loop.run_in_executor(
+                    executor,
+                    client.evaluate,
+                    server_model
+                )
+                evaluate_time = time.time() - evaluate_start_time
+                tracer.complete("evaluate", evaluate_start_time, evaluate_start_time + evaluate_time, round=round_idx)
+                logger.info(f"\nModelo Final:\nAbsolute Error: {absolute_error:.3f}\nSquared Error: {squared_error:.3f}\nPearson: {pearson_corr:.3f}")
+
+                round_end_time = time.time()
+                round_time = round_end_time - round_start_time
+                tracer.complete("round", round_start_time, round_end_time, round=round_idx)
+
+                start_inference_time = time.time()
+                await loop.run_in_executor(
+                    executor,
+                    client.evaluate_inference_time,
+                    100
+                )
+                inference_time = time.time() - start_inference_time
+                tracer.complete("inference", start_inference_time, start_inference_time + inference_time, round=round_idx)
+                logger.debug(f"\nDuração do Round: {format_time(round_time)}\nTempo de treinamento: {format_time(fit_time)}\nTempo de avaliação: {format_time(evaluate_time)}\nTempo de inferência: {format_time(inference_time)}")
+
+                del server_model, client, server_trees_deserialised
+
+                metrics = {
+                    "trees_by_client": trees_by_client,
+                    "first_server_serialise_trees_size": first_server_serialise_trees_size,
+                    "fit_time": fit_time,
+                    "client_serialise_trees_size": client_serialise_trees_size,
+                    "final_server_serialise_trees_size": final_server_serialise_trees_size,
+                    "squared_error": squared_error,
+                    "pearson_corr": pearson_corr,
+                    "round_time": round_time,
+                    "round_start_time": round_start_time,
+                    "round_end_time": round_end_time,
+                    "evaluate_time": evaluate_time,
+                    "inference_time": inference_time,
+                    "rpc_traffic": traffic.take_client(round_idx, ID)
+                }
+                metrics_writer.write(round_idx if asynchronous else server_round, metrics)
+
+                gc.collect()
+                if round_idx + 1 < number_of_rounds:
+                    # No modo síncrono, o próximo round começa quando o servidor avisa; sem o stream, espera fixa.
+                    with tracer.span("wait_next_round", round=round_idx):
+                        if asynchronous or not await round_watcher.wait_for_round(round_idx + 1, client_timeout):
+                            await asyncio.sleep(15)
+                    if round_watcher.finished:
+                        break
+    except grpc.aio.AioRpcError as error:
+        # Com round_policy "quorum" ou "deadline", o último round pode fechar (e o servidor desligar) sem este cliente.
+        if error.code() != grpc.StatusCode.UNAVAILABLE or last_server_round != number_of_rounds - 1:
+            raise
+        logger.warning("O servidor encerrou o treinamento antes deste cliente finalizar o último round.")
+    finally:
+        if round_watcher is not None:
+            await round_watcher.close()
+        await metrics_writer.close()
+        await tracer.close()
+
+
+def main():
+    args = parse.parse_args()
+    asyncio.run(run(args.client_id, args.strategy, args.server_address, args.shm_name))
+    executor.shutdown(wait=True)
 
 
 if __name__ == "__main__":
-    asyncio.run(run())
-    executor.shutdown(wait=True)
\ No newline at end of file
+    main()
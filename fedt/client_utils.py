@@ -8,38 +8,77 @@ from sklearn.metrics import mean_squared_error
 from scipy.stats import pearsonr
 
 from fedt import utils
+from fedt.forest import FlatForest
 
 import warnings
+from functools import lru_cache
 from scipy.stats import ConstantInputWarning
 
 warnings.filterwarnings("ignore", category=ConstantInputWarning)
 
+@lru_cache(maxsize=None)
+def _load_training_data(client_ID, shm_name):
+    X_train, y_train, _, _ = utils.load_house_client(client_ID, shm_name)
+    return X_train, y_train
+
+def fit_local_trees(trees_by_client, client_ID, shm_name):
+    """
+    ### Função:
+    Treinar a floresta local de um cliente fora do processo dele (pool de processos do `fedt simulate`).
+    Os dados de treino são lidos da memória compartilhada uma vez por processo do pool.
+    ### Returns:
+    - Lista de árvores.
+    """
+    X_train, y_train = _load_training_data(client_ID, shm_name)
+    local_model = RandomForestRegressor(n_estimators=trees_by_client)
+    utils.set_initial_params(local_model, X_train, y_train)
+    return local_model.estimators_
+
 class HouseClient():
 
-    def __init__(self, trees_by_client: int, dataset, ID) -> None:
+    def __init__(self, trees_by_client: int, dataset, ID, trees=None) -> None:
         # Load house data
         self.X_train, self.y_train, self.X_test, self.y_test = dataset
 
         # Initialize local model and set initial_parameters
+        # (as árvores podem chegar já treinadas, ver fit_local_trees)
         self.local_model = RandomForestRegressor(n_estimators=trees_by_client)
-        utils.set_initial_params(self.local_model, self.X_train, self.y_train) 
+        if trees is None:
+            utils.set_initial_params(self.local_model, self.X_train, self.y_train) 
+        else:
+            utils.set_model_params(self.local_model, trees)
         self.trees = self.local_model.estimators_
+        self.local_forest = FlatForest(self.trees)
+        # Predições do modelo local no conjunto de teste, reaproveitadas enquanto o modelo local não muda.
+        self.local_predictions = None
         self.ID = ID
 
     def get_global_parameters(self, global_model: RandomForestRegressor):
             return utils.get_model_parameters(global_model)
 
+    def score_predictions(self, predictions):
+        """
+        ### Função:
+        Calcular todas as métricas a partir de uma única predição no conjunto de teste.
+        ### Returns:
+        - Absolute Error, Squared Error e (Pearson, p-value).
+        """
+        return (
+            mean_absolute_error(self.y_test, predictions),
+            mean_squared_error(self.y_test, predictions),
+            pearsonr(self.y_test, predictions)
+        )
+
     def evaluate(self, global_model: RandomForestRegressor):
         global_model_trees = self.get_global_parameters(global_model)
-        
-        local_absolute_error = mean_absolute_error(self.y_test, self.local_model.predict(self.X_test))
-        global_model_absolute_error = mean_absolute_error(self.y_test, global_model.predict(self.X_test))
+        global_forest = FlatForest(global_model_trees)
 
-        local_squared_error = mean_squared_error(self.y_test, self.local_model.predict(self.X_test))
-        global_model_squared_error = mean_squared_error(self.y_test, global_model.predict(self.X_test))
+        if self.local_predictions is None:
+            self.local_predictions = self.local_forest.predict(self.X_test)
+        global_model_predictions = global_forest.predict(self.X_test)
 
-        local_pearson_corr, local_p_value = pearsonr(self.y_test, self.local_model.predict(self.X_test))
-        global_model_pearson_corr, global_model_p_value = pearsonr(self.y_test, global_model.predict(self.X_test))
+        local_absolute_error, local_squared_error, (local_pearson_corr, local_p_value) = self.score_predictions(self.local_predictions)
+        global_model_absolute_error, global_model_squared_error, (global_model_pearson_corr, global_model_p_value) = self.score_predictions(global_model_predictions)
 
         if local_absolute_error < global_model_absolute_error:
              absolute_error = local_absolute_error
@@ -51,8 +90,10 @@ class HouseClient():
              pearson_corr, p_value = global_model_pearson_corr, global_model_p_value
              self.trees = global_model_trees
              utils.set_model_params(self.local_model, self.trees)
+             self.local_forest = global_forest
+             self.local_predictions = global_model_predictions
 
         return absolute_error, squared_error, (pearson_corr, p_value), self.trees
 
     def evaluate_inference_time(self, number_of_samples):
-        self.local_model.predict(self.X_test[-number_of_samples:])
\ No newline at end of file
+        self.local_forest.predict(self.X_test[-number_of_samples:])
\ No newline at end of file
@@ -0,0 +1,284 @@
+from fedt.settings import (
+    dataset_path, prepared_dataset_path, validate_dataset_size, dataset_seed,
+    percentage_value_of_samples_per_client, number_of_clients
+)
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+from multiprocessing import shared_memory, resource_tracker
+from functools import lru_cache
+import json
+import math
+
+FEATURE_COLUMNS = (
+    [f"T{i}" for i in range(1, 10)]
+    + [f"RH_{i}" for i in range(1, 10)]
+    + ["T_out", "RH_out", "Press_mm_hg", "Visibility"]
+)
+LABEL_COLUMN = "Appliances"
+
+# Dtypes usados nos arrays: as árvores do sklearn trabalham com features em float32.
+FEATURE_DTYPE = np.float32
+LABEL_DTYPE = np.float64
+
+CLIENT_TEST_SIZE = 0.2
+
+# Layout do dataset preparado (`fedt dataset prepare`):
+FEATURES_FILE = "features.npy"
+LABELS_FILE = "labels.npy"
+METADATA_FILE = "metadata.json"
+SHARDS_FOLDER = "shards"
+
+
+def read_csv_dataset(path=dataset_path):
+    """
+    ### Função:
+    Ler o CSV do dataset apenas com as colunas usadas no treinamento.
+    ### Returns:
+    - Data: DataFrame com as features.
+    - Label: Series com os targets.
+    """
+    energy_data_complete = pd.read_csv(path, usecols=FEATURE_COLUMNS + [LABEL_COLUMN])
+    return energy_data_complete[FEATURE_COLUMNS], energy_data_complete[LABEL_COLUMN]
+
+
+class ServerDataset():
+    """
+    Dataset do servidor mantido em memória como arrays contíguos.
+    O split de validação é sorteado uma única vez (com a seed do config) e reutilizado
+    por todas as agregações, de modo que os scores são comparáveis entre os rounds.
+    """
+
+    def __init__(self, features, labels, seed=dataset_seed) -> None:
+        self.features = np.ascontiguousarray(features, dtype=FEATURE_DTYPE)
+        self.labels = np.ascontiguousarray(labels, dtype=LABEL_DTYPE)
+
+        train_indices, valid_indices = train_test_split(
+            np.arange(len(self.labels)), test_size=0.2, random_state=seed
+        )
+        valid_indices = valid_indices[-validate_dataset_size:]
+        init_indices = train_indices[0:2]
+
+        self.X_valid = self.features[valid_indices]
+        self.y_valid = self.labels[valid_indices]
+        self.X_init = self.features[init_indices]
+        self.y_init = self.labels[init_indices]
+
+    @classmethod
+    def from_csv(cls, path=dataset_path, seed=dataset_seed):
+        data, label = read_csv_dataset(path)
+        return cls(data.to_numpy(), label.to_numpy(), seed)
+
+    @classmethod
+    def from_prepared(cls, path=prepared_dataset_path, seed=dataset_seed):
+        return cls(np.load(path / FEATURES_FILE), np.load(path / LABELS_FILE), seed)
+
+
+def load_dataset_arrays():
+    """
+    ### Função:
+    Carregar o dataset completo como arrays, a partir do dataset preparado quando ele existir.
+    ### Returns:
+    - Features (float32) e Labels (float64).
+    """
+    if (prepared_dataset_path / FEATURES_FILE).exists():
+        return np.load(prepared_dataset_path / FEATURES_FILE), np.load(prepared_dataset_path / LABELS_FILE)
+    data, label = read_csv_dataset()
+    return data.to_numpy(FEATURE_DTYPE), label.to_numpy(LABEL_DTYPE)
+
+
+@lru_cache(maxsize=1)
+def load_server_dataset() -> ServerDataset:
+    """
+    ### Função:
+    Carregar o dataset do servidor apenas uma vez por processo,
+    a partir do dataset preparado quando ele existir.
+    """
+    if (prepared_dataset_path / FEATURES_FILE).exists():
+        return ServerDataset.from_prepared()
+    return ServerDataset.from_csv()
+
+
+def client_shard_indices(client_ID, number_of_rows, seed=dataset_seed,
+                         percentage=percentage_value_of_samples_per_client):
+    """
+    ### Função:
+    Sortear, de forma determinística para cada (seed, client_ID), as linhas de um cliente
+    e dividi-las entre treino e teste.
+    ### Args:
+    - client_ID: ID do cliente.
+    - number_of_rows: Número de linhas do dataset.
+    - seed: Seed do sorteio.
+    - percentage: Porcentagem das linhas do dataset que o cliente recebe.
+    ### Returns:
+    - Train Indices: Linhas de treino.
+    - Test Indices: Linhas de teste.
+    """
+    rng = np.random.default_rng([seed, client_ID])
+    number_of_samples = int((number_of_rows * percentage) / 100)
+    indices = rng.choice(number_of_rows, size=number_of_samples, replace=False)
+
+    number_of_test_samples = math.ceil(number_of_samples * CLIENT_TEST_SIZE)
+    return np.sort(indices[number_of_test_samples:]), np.sort(indices[:number_of_test_samples])
+
+
+def prepare_dataset(output_path=prepared_dataset_path, clients=number_of_clients, seed=dataset_seed):
+    """
+    ### Função:
+    Converter o CSV do dataset para arrays .npy (lidos com memmap) e gravar
+    os índices de treino e teste de cada cliente em shards/client_{ID}.npz.
+    ### Args:
+    - output_path: Pasta de saída.
+    - clients: Número de clientes com shard.
+    - seed: Seed do sorteio dos shards.
+    """
+    data, label = read_csv_dataset()
+    features = np.ascontiguousarray(data.to_numpy(), dtype=FEATURE_DTYPE)
+    labels = np.ascontiguousarray(label.to_numpy(), dtype=LABEL_DTYPE)
+
+    shards_path = output_path / SHARDS_FOLDER
+    shards_path.mkdir(parents=True, exist_ok=True)
+
+    np.save(output_path / FEATURES_FILE, features)
+    np.save(output_path / LABELS_FILE, labels)
+
+    for client_ID in range(clients):
+        train_indices, test_indices = client_shard_indices(client_ID, len(labels), seed)
+        np.savez(shards_path / f"client_{client_ID}.npz", train=train_indices, test=test_indices)
+
+    metadata = {
+        "source": str(dataset_path),
+        "rows": len(labels),
+        "feature_columns": FEATURE_COLUMNS,
+        "label_column": LABEL_COLUMN,
+        "clients": clients,
+        "seed": seed,
+        "percentage_value_of_samples_per_client": percentage_value_of_samples_per_client,
+    }
+    with open(output_path / METADATA_FILE, "w", encoding="utf-8") as file:
+        json.dump(metadata, file, indent=4)
+
+    print(f"Dataset preparado em {output_path}: {len(labels)} linhas, {clients} shards (seed {seed}).")
+
+
+def has_client_shard(client_ID, path=prepared_dataset_path) -> bool:
+    return (path / SHARDS_FOLDER / f"client_{client_ID}.npz").exists()
+
+
+def load_client_shard(client_ID, path=prepared_dataset_path):
+    """
+    ### Função:
+    Carregar apenas as linhas do cliente a partir do dataset preparado.
+    Os arrays completos são abertos com memmap, então só as páginas das linhas do shard são lidas.
+    ### Returns:
+    - X_train, y_train, X_test, y_test.
+    """
+    features = np.load(path / FEATURES_FILE, mmap_mode="r")
+    labels = np.load(path / LABELS_FILE, mmap_mode="r")
+
+    with np.load(path / SHARDS_FOLDER / f"client_{client_ID}.npz") as shard:
+        train_indices = shard["train"]
+        test_indices = shard["test"]
+
+    return features[train_indices], labels[train_indices], features[test_indices], labels[test_indices]
+
+
+class SharedDataset():
+    """
+    Dataset completo num bloco de memória compartilhada, para os clientes simulados na mesma máquina.
+    O processo que cria o bloco é o dono (e faz o unlink); os clientes apenas se conectam pelo nome
+    e enxergam features e labels como views NumPy, sem cópia.
+
+    Layout do bloco: rows (int64) | columns (int64) | features float32[rows, columns] | labels float64[rows]
+    """
+
+    _HEADER = np.dtype([("rows", "<i8"), ("columns", "<i8")])
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool) -> None:
+        self.shm = shm
+        self.owner = owner
+
+        header = np.frombuffer(shm.buf, dtype=self._HEADER, count=1)[0]
+        rows, columns = int(header["rows"]), int(header["columns"])
+        features_offset = self._HEADER.itemsize
+        labels_offset = self._labels_offset(rows, columns)
+
+        self.features = np.ndarray((rows, columns), dtype=FEATURE_DTYPE, buffer=shm.buf, offset=features_offset)
+        self.labels = np.ndarray((rows,), dtype=LABEL_DTYPE, buffer=shm.buf, offset=labels_offset)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @classmethod
+    def _labels_offset(cls, rows, columns):
+        features_end = cls._HEADER.itemsize + rows * columns * np.dtype(FEATURE_DTYPE).itemsize
+        alignment = np.dtype(LABEL_DTYPE).itemsize
+        return -(-features_end // alignment) * alignment
+
+    @classmethod
+    def create(cls, features, labels):
+        """
+        ### Função:
+        Criar o bloco compartilhado e copiar o dataset para ele (feito uma única vez, no launcher).
+        """
+        rows, columns = features.shape
+        size = cls._labels_offset(rows, columns) + rows * np.dtype(LABEL_DTYPE).itemsize
+        shm = shared_memory.SharedMemory(create=True, size=size)
+
+        header = np.frombuffer(shm.buf, dtype=cls._HEADER, count=1)
+        header[0] = (rows, columns)
+        del header
+
+        shared_dataset = cls(shm, owner=True)
+        shared_dataset.features[:] = features
+        shared_dataset.labels[:] = labels
+        return shared_dataset
+
+    @classmethod
+    def attach(cls, name):
+        """
+        ### Função:
+        Conectar a um bloco já criado, sem registrá-lo no resource_tracker
+        (senão o bloco seria removido quando o cliente terminasse).
+        """
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError: # Python < 3.13
+            shm = shared_memory.SharedMemory(name=name)
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return cls(shm, owner=False)
+
+    def close(self) -> None:
+        del self.features, self.labels
+        self.shm.close()
+        if self.owner:
+            # Clientes no mesmo processo (fedt simulate) ou em processos filhos compartilham o
+            # resource_tracker do dono, e o attach deles pode ter apagado o registro do bloco.
+            resource_tracker.register(self.shm._name, "shared_memory")
+            self.shm.unlink()
+
+
+def load_client_from_shared_memory(client_ID, name):
+    """
+    ### Função:
+    Montar os dados do cliente a partir do dataset em memória compartilhada.
+    As linhas do cliente são as mesmas do shard de `fedt dataset prepare` (mesma seed).
+    ### Returns:
+    - X_train, y_train, X_test, y_test.
+    """
+    shared_dataset = SharedDataset.attach(name)
+    if has_client_shard(client_ID):
+        with np.load(prepared_dataset_path / SHARDS_FOLDER / f"client_{client_ID}.npz") as shard:
+            train_indices, test_indices = shard["train"], shard["test"]
+    else:
+        train_indices, test_indices = client_shard_indices(client_ID, len(shared_dataset.labels))
+
+    client_data = (
+        shared_dataset.features[train_indices], shared_dataset.labels[train_indices],
+        shared_dataset.features[test_indices], shared_dataset.labels[test_indices],
+    )
+    shared_dataset.close()
+    return client_data
@@ -0,0 +1,178 @@
+import asyncio
+import time
+
+import numpy as np
+
+from fedt.settings import server_config, edge_config, imported_aggregation_strategy, transport_config, number_of_rounds
+from fedt import server
+from fedt.server import FedT, serve
+from fedt import utils
+from fedt.transport import create_channel
+from fedt.traffic import RpcTraffic, client_interceptors
+from fedt.tracing import EDGE_TRACE_PID_OFFSET
+from fedt import fedT_pb2
+from fedt import fedT_pb2_grpc
+
+
+class EdgeFedT(FedT):
+    """
+    Agregador intermediário (edge). Para os clientes ligados a ele, é um servidor FedT comum:
+    recebe as florestas do round e roda a estratégia do FedForest localmente.
+    Em vez de publicar o resultado, envia apenas as árvores pré-selecionadas ao servidor root,
+    como se fosse um único cliente, e devolve aos seus clientes o modelo global do root.
+    """
+
+    def __init__(self, edge_ID, upstream_stub: fedT_pb2_grpc.FedTStub,
+                 input_aggregation_strategy=imported_aggregation_strategy,
+                 expected_clients=edge_config["number_of_clients"],
+                 upstream_traffic: RpcTraffic = None, log=None) -> None:
+        super().__init__(input_aggregation_strategy, expected_clients, f"edge-{edge_ID}", log or edge_logger(edge_ID))
+        self.edge_ID = edge_ID
+        self.upstream_stub = upstream_stub
+        self.forwarded_trees = 0
+        # Round do root em que as árvores do edge entram: o do edge, ou um posterior se o root
+        # fechou rounds sem ele (quorum ou prazo).
+        self.upstream_round = 0
+        # Tráfego do canal com o root, contado pelos interceptors do canal no round do edge.
+        self.upstream_traffic = upstream_traffic or RpcTraffic()
+        self.upstream_traffic.current_round = lambda: self.round
+        self.tracer.pid = EDGE_TRACE_PID_OFFSET + edge_ID
+
+    def get_number_of_trees_per_client(self, valor_alvo=900, ponto_de_convergencia=30):
+        if self.round > 0 and edge_config["trees_by_client"] > 0:
+            return edge_config["trees_by_client"]
+        return super().get_number_of_trees_per_client(valor_alvo, ponto_de_convergencia)
+
+    async def _wait_for_upstream_round(self):
+        """
+        ### Função:
+        Esperar o root chegar no round do edge (os outros edges podem estar atrasados).
+        Se o root já passou do round do edge, o edge pula para o round do root, como os clientes.
+        ### Returns:
+        - Configurações do root.
+        """
+        request = fedT_pb2.Request_Server(client_ID=self.edge_ID)
+        wait_start = time.time()
+        upstream_settings = await self.upstream_stub.get_server_settings(request)
+        while upstream_settings.current_round < self.round:
+            if time.time() - wait_start > server_config["timeout"]:
+                raise RuntimeError(f"Timeout esperando o root avançar do round {upstream_settings.current_round} para {self.round}")
+            await asyncio.sleep(1)
+            upstream_settings = await self.upstream_stub.get_server_settings(request)
+
+        self.upstream_round = self.round
+        if upstream_settings.current_round > self.round:
+            self.logger.warning(f"Root já está no round {upstream_settings.current_round}, pulando do round {self.round}.")
+            self.upstream_round = upstream_settings.current_round
+        return upstream_settings
+
+    def _select_forwarded_trees(self, trees, number_of_trees):
+        """
+        ### Função:
+        Manter, entre as árvores selecionadas pela estratégia local, as `number_of_trees` com menor erro.
+        """
+        if len(trees) <= number_of_trees:
+            return list(trees)
+
+        X_valid, y_valid = utils.load_server_side_validation_data()
+        scores = self.strategy.score_forests([trees], X_valid, y_valid)[0]
+        selected = np.sort(np.argsort(scores.absolute_error, kind="stable")[:number_of_trees])
+        return [trees[index] for index in selected]
+
+    def _serialise_forwarded_trees(self, trees):
+        return [self.tree_store.get_serialised(self.tree_store.add_tree(tree)) for tree in trees]
+
+    async def _after_aggregation(self) -> None:
+        """
+        ### Função:
+        Enviar as árvores da agregação local ao root e trocar o modelo do edge pelo modelo global do root.
+        """
+        loop = asyncio.get_running_loop()
+        upstream_settings = await self._wait_for_upstream_round()
+        if self.upstream_round >= number_of_rounds:
+            self.logger.warning(f"Root já encerrou o treinamento; o modelo local do round {self.round} não é enviado.")
+            return
+        number_of_trees = edge_config["forwarded_trees"] or upstream_settings.trees_by_client
+
+        forwarded_trees = await loop.run_in_executor(
+            self.executor,
+            self._select_forwarded_trees,
+            self.model.estimators_,
+            number_of_trees
+        )
+        serialised_trees = await loop.run_in_executor(
+            self.executor,
+            self._serialise_forwarded_trees,
+            forwarded_trees
+        )
+        self.forwarded_trees = len(serialised_trees)
+        self.logger.info(f"Enviando {len(serialised_trees)} árvores ao root, round {self.upstream_round}.")
+
+        chunk_size = max(upstream_settings.chunk_size, 1)
+        edge_ID, edge_round = self.edge_ID, self.upstream_round
+
+        async def _chunks():
+            for chunk in utils.chunk_serialised_trees(serialised_trees, chunk_size):
+                yield fedT_pb2.Forest_Chunk_Client(client_ID=edge_ID, round=edge_round, serialised_trees=chunk)
+
+        # O root responde com hashes as árvores que o edge enviou e que entraram no modelo global.
+        global_model_hashes = []
+        with self.tracer.span("upstream_upload_and_wait_aggregation", round=self.round, trees=len(serialised_trees)):
+            async for reply in self.upstream_stub.aggregate_trees_packed(_chunks()):
+                global_model_hashes.extend(self.tree_store.add_serialised(tree) for tree in reply.serialised_trees)
+                global_model_hashes.extend(reply.tree_hashes)
+
+        self.model.estimators_ = await loop.run_in_executor(
+            self.executor,
+            self.tree_store.get_several_trees,
+            global_model_hashes
+        )
+        self.logger.info(f"Modelo global do root recebido: {len(global_model_hashes)} árvores.")
+
+    def _round_metrics(self):
+        metrics = super()._round_metrics()
+        metrics["upstream_rpc_traffic"] = self.upstream_traffic.take_client(self.round, self.edge_ID)
+        return metrics
+
+    async def _after_round(self, closed_round) -> None:
+        if self.upstream_round >= number_of_rounds:
+            return
+        await self.upstream_stub.end_of_transmission(
+            fedT_pb2.Request_Server(client_ID=self.edge_ID, round=self.upstream_round)
+        )
+
+    def _next_round(self):
+        return max(self.round, self.upstream_round) + 1
+
+
+def edge_logger(edge_ID):
+    """Logger de um edge (EDGE <id>, em fedt_edge_<id>.log), com o mesmo nível do servidor."""
+    return utils.setup_logger(
+        name=f"EDGE {edge_ID}",
+        log_file=f"fedt_edge_{edge_ID}.log",
+        level=server.log_level
+    )
+
+
+async def run_edge(edge_ID, port=edge_config["port"], clients=edge_config["number_of_clients"],
+                   upstream=None, input_aggregation_strategy=imported_aggregation_strategy, host=edge_config["IP"]):
+    """
+    ### Função:
+    Rodar um edge: servidor FedT para os clientes e cliente do root.
+    ### Args:
+    - edge_ID: ID do edge (é o client_ID dele no root).
+    - port: Porta onde os clientes do edge se conectam.
+    - clients: Número de clientes ligados ao edge.
+    - upstream: Endereço do root (host:porta).
+    - input_aggregation_strategy: Estratégia usada na agregação local.
+    - host: Endereço local onde o edge escuta os clientes.
+    """
+    logger = edge_logger(edge_ID)
+    logger.info("Edge inicializando...")
+
+    upstream = upstream or f"{edge_config['upstream_IP']}:{edge_config['upstream_port']}"
+    upstream_traffic = RpcTraffic()
+    interceptors = client_interceptors(upstream_traffic, edge_ID) if transport_config["rpc_accounting"] else None
+    async with create_channel(upstream, interceptors=interceptors) as channel:
+        servicer = EdgeFedT(edge_ID, fedT_pb2_grpc.FedTStub(channel), input_aggregation_strategy, clients, upstream_traffic, logger)
+        await serve(servicer, f"{host}:{port}")
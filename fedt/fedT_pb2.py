@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\nfedT.proto\x12\x04\x66\x65\x64T\"#\n\x0eRequest_Server\x12\x11\n\tclient_ID\x18\x01 \x01(\x05\"A\n\x0fServer_Settings\x12\x17\n\x0ftrees_by_client\x18\x01 \x01(\x05\x12\x15\n\rcurrent_round\x18\x02 \x01(\x05\";\n\rForest_CLient\x12\x11\n\tclient_ID\x18\x01 \x01(\x05\x12\x17\n\x0fserialised_tree\x18\x02 \x01(\x0c\"(\n\rForest_Server\x12\x17\n\x0fserialised_tree\x18\x01 \x01(\x0c\"\x10\n\x02OK\x12\n\n\x02ok\x18\x01 \x01(\x05\x32\x83\x02\n\x04\x46\x65\x64T\x12?\n\x0f\x61ggregate_trees\x12\x13.fedT.Forest_CLient\x1a\x13.fedT.Forest_Server(\x01\x30\x01\x12?\n\x10get_server_model\x12\x14.fedT.Request_Server\x1a\x13.fedT.Forest_Server0\x01\x12\x42\n\x13get_server_settings\x12\x14.fedT.Request_Server\x1a\x15.fedT.Server_Settings\x12\x35\n\x13\x65nd_of_transmission\x12\x14.fedT.Request_Server\x1a\x08.fedT.OKb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\nfedT.proto\x12\x04\x66\x65\x64T\"W\n\x0eRequest_Server\x12\x11\n\tclient_ID\x18\x01 \x01(\x05\x12\x14\n\x0cknown_hashes\x18\x02 \x03(\x0c\x12\x12\n\x05round\x18\x03 \x01(\x05H\x00\x88\x01\x01\x42\x08\n\x06_round\"\xaa\x01\n\x0fServer_Settings\x12\x17\n\x0ftrees_by_client\x18\x01 \x01(\x05\x12\x15\n\rcurrent_round\x18\x02 \x01(\x05\x12\x12\n\nchunk_size\x18\x03 \x01(\x05\x12\x12\n\ntree_dedup\x18\x04 \x01(\x08\x12\x14\n\x0c\x61synchronous\x18\x05 \x01(\x08\x12\x15\n\rmodel_version\x18\x06 \x01(\x05\x12\x12\n\nupload_ack\x18\x07 \x01(\x08\"Y\n\rForest_CLient\x12\x11\n\tclient_ID\x18\x01 \x01(\x05\x12\x17\n\x0fserialised_tree\x18\x02 \x01(\x0c\x12\x12\n\x05round\x18\x03 \x01(\x05H\x00\x88\x01\x01\x42\x08\n\x06_round\"(\n\rForest_Server\x12\x17\n\x0fserialised_tree\x18\x01 \x01(\x0c\"\x8b\x01\n\x13\x46orest_Chunk_Client\x12\x11\n\tclient_ID\x18\x01 \x01(\x05\x12\x18\n\x10serialised_trees\x18\x02 \x03(\x0c\x12\x13\n\x0btree_hashes\x18\x03 \x03(\x0c\x12\x14\n\x0cknown_hashes\x18\x04 \x03(\x0c\x12\x12\n\x05round\x18\x05 \x01(\x05H\x00\x88\x01\x01\x42\x08\n\x06_round\"D\n\x13\x46orest_Chunk_Server\x12\x18\n\x10serialised_trees\x18\x01 \x03(\x0c\x12\x13\n\x0btree_hashes\x18\x02 \x03(\x0c\"4\n\nUpload_Ack\x12\r\n\x05round\x18\x01 \x01(\x05\x12\x17\n\x0fnumber_of_trees\x18\x02 \x01(\x05\"\x10\n\x02OK\x12\n\n\x02ok\x18\x01 \x01(\x05\"\x9e\x01\n\x0bRound_Event\x12$\n\x04kind\x18\x01 \x01(\x0e\x32\x16.fedT.Round_Event.Kind\x12\r\n\x05round\x18\x02 \x01(\x05\x12\x17\n\x0ftrees_by_client\x18\x03 \x01(\x05\"A\n\x04Kind\x12\x11\n\rROUND_STARTED\x10\x00\x12\x0f\n\x0bMODEL_READY\x10\x01\x12\x15\n\x11TRAINING_FINISHED\x10\x02\"\xb5\x01\n\tRpc_Stats\x12\x0e\n\x06method\x18\x01 \x01(\t\x12\r\n\x05\x63\x61lls\x18\x02 \x01(\x03\x12\x15\n\rrequest_bytes\x18\x03 \x01(\x03\x12\x16\n\x0eresponse_bytes\x18\x04 \x01(\x03\x12\x15\n\rtotal_seconds\x18\x05 \x01(\x01\x12\x13\n\x0bmax_seconds\x18\x06 \x01(\x01\x12\x16\n\x0elatency_bounds\x18\x07 \x03(\x01\x12\x16\n\x0elatency_counts\x18\x08 \x03(\x03\"\x89\x04\n\x0cServer_Stats\x12\r\n\x05round\x18\x01 \x01(\x05\x12\x15\n\rmodel_version\x18\x02 \x01(\x05\x12\x14\n\x0c\x61synchronous\x18\x03 \x01(\x08\x12\x18\n\x10\x65xpected_clients\x18\x04 \x01(\x05\x12\x19\n\x11\x63onnected_clients\x18\x05 \x01(\x05\x12\x19\n\x11responded_clients\x18\x06 \x01(\x05\x12\x1c\n\x14\x66orests_in_warehouse\x18\x07 \x01(\x05\x12\x1a\n\x12trees_in_warehouse\x18\x08 \x01(\x05\x12\x19\n\x11\x61ggregation_state\x18\t \x01(\x05\x12\x16\n\x0e\x62ytes_received\x18\n \x01(\x03\x12\x12\n\nbytes_sent\x18\x0b \x01(\x03\x12\x1c\n\x14\x65xecutor_queue_depth\x18\x0c \x01(\x05\x12 \n\x18process_pool_queue_depth\x18\r \x01(\x05\x12\x16\n\x0e\x65vent_loop_lag\x18\x0e \x01(\x01\x12\x1a\n\x12max_event_loop_lag\x18\x0f \x01(\x01\x12\x11\n\trss_bytes\x18\x10 \x01(\x03\x12\x0e\n\x06uptime\x18\x11 \x01(\x01\x12\x19\n\x11round_subscribers\x18\x12 \x01(\x05\x12\"\n\trpc_stats\x18\x13 \x03(\x0b\x32\x0f.fedT.Rpc_Stats\x12\x16\n\x0erpc_accounting\x18\x14 \x01(\x08\x32\xaa\x05\n\x04\x46\x65\x64T\x12?\n\x0f\x61ggregate_trees\x12\x13.fedT.Forest_CLient\x1a\x13.fedT.Forest_Server(\x01\x30\x01\x12?\n\x10get_server_model\x12\x14.fedT.Request_Server\x1a\x13.fedT.Forest_Server0\x01\x12\x42\n\x13get_server_settings\x12\x14.fedT.Request_Server\x1a\x15.fedT.Server_Settings\x12\x35\n\x13\x65nd_of_transmission\x12\x14.fedT.Request_Server\x1a\x08.fedT.OK\x12R\n\x16\x61ggregate_trees_packed\x12\x19.fedT.Forest_Chunk_Client\x1a\x19.fedT.Forest_Chunk_Server(\x01\x30\x01\x12L\n\x17get_server_model_packed\x12\x14.fedT.Request_Server\x1a\x19.fedT.Forest_Chunk_Server0\x01\x12=\n\x10subscribe_rounds\x12\x14.fedT.Request_Server\x1a\x11.fedT.Round_Event0\x01\x12=\n\x0cupload_trees\x12\x19.fedT.Forest_Chunk_Client\x1a\x10.fedT.Upload_Ack(\x01\x12G\n\x12\x66\x65tch_global_model\x12\x14.fedT.Request_Server\x1a\x19.fedT.Forest_Chunk_Server0\x01\x12<\n\x10get_server_stats\x12\x14.fedT.Request_Server\x1a\x12.fedT.Server_Statsb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -32,15 +32,29 @@ _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'fedT_pb2', _globals)
 if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
   _globals['_REQUEST_SERVER']._serialized_start=20
-  _globals['_REQUEST_SERVER']._serialized_end=55
-  _globals['_SERVER_SETTINGS']._serialized_start=57
-  _globals['_SERVER_SETTINGS']._serialized_end=122
-  _globals['_FOREST_CLIENT']._serialized_start=124
-  _globals['_FOREST_CLIENT']._serialized_end=183
-  _globals['_FOREST_SERVER']._serialized_start=185
-  _globals['_FOREST_SERVER']._serialized_end=225
-  _globals['_OK']._serialized_start=227
-  _globals['_OK']._serialized_end=243
-  _globals['_FEDT']._serialized_start=246
-  _globals['_FEDT']._serialized_end=505
+  _globals['_REQUEST_SERVER']._serialized_end=107
+  _globals['_SERVER_SETTINGS']._serialized_start=110
+  _globals['_SERVER_SETTINGS']._serialized_end=280
+  _globals['_FOREST_CLIENT']._serialized_start=282
+  _globals['_FOREST_CLIENT']._serialized_end=371
+  _globals['_FOREST_SERVER']._serialized_start=373
+  _globals['_FOREST_SERVER']._serialized_end=413
+  _globals['_FOREST_CHUNK_CLIENT']._serialized_start=416
+  _globals['_FOREST_CHUNK_CLIENT']._serialized_end=555
+  _globals['_FOREST_CHUNK_SERVER']._serialized_start=557
+  _globals['_FOREST_CHUNK_SERVER']._serialized_end=625
+  _globals['_UPLOAD_ACK']._serialized_start=627
+  _globals['_UPLOAD_ACK']._serialized_end=679
+  _globals['_OK']._serialized_start=681
+  _globals['_OK']._serialized_end=697
+  _globals['_ROUND_EVENT']._serialized_start=700
+  _globals['_ROUND_EVENT']._serialized_end=858
+  _globals['_ROUND_EVENT_KIND']._serialized_start=793
+  _globals['_ROUND_EVENT_KIND']._serialized_end=858
+  _globals['_RPC_STATS']._serialized_start=861
+  _globals['_RPC_STATS']._serialized_end=1042
+  _globals['_SERVER_STATS']._serialized_start=1045
+  _globals['_SERVER_STATS']._serialized_end=1566
+  _globals['_FEDT']._serialized_start=1569
+  _globals['_FEDT']._serialized_end=2251
 # @@protoc_insertion_point(module_scope)
@@ -4,10 +4,19 @@ isort:skip_file
 """
 
 import builtins
+import collections.abc
 import google.protobuf.descriptor
+import google.protobuf.internal.containers
+import google.protobuf.internal.enum_type_wrapper
 import google.protobuf.message
+import sys
 import typing
 
+if sys.version_info >= (3, 10):
+    import typing as typing_extensions
+else:
+    import typing_extensions
+
 DESCRIPTOR: google.protobuf.descriptor.FileDescriptor
 
 @typing.final
@@ -15,13 +24,23 @@ class Request_Server(google.protobuf.message.Message):
     DESCRIPTOR: google.protobuf.descriptor.Descriptor
 
     CLIENT_ID_FIELD_NUMBER: builtins.int
+    KNOWN_HASHES_FIELD_NUMBER: builtins.int
+    ROUND_FIELD_NUMBER: builtins.int
     client_ID: builtins.int
+    round: builtins.int
+    """optional: clientes anteriores ao campo não o enviam, e o servidor usa o round corrente."""
+    @property
+    def known_hashes(self) -> google.protobuf.internal.containers.RepeatedScalarFieldContainer[builtins.bytes]: ...
     def __init__(
         self,
         *,
         client_ID: builtins.int = ...,
+        known_hashes: collections.abc.Iterable[builtins.bytes] | None = ...,
+        round: builtins.int | None = ...,
     ) -> None: ...
-    def ClearField(self, field_name: typing.Literal["client_ID", b"client_ID"]) -> None: ...
+    def HasField(self, field_name: typing.Literal["_round", b"_round", "round", b"round"]) -> builtins.bool: ...
+    def ClearField(self, field_name: typing.Literal["_round", b"_round", "client_ID", b"client_ID", "known_hashes", b"known_hashes", "round", b"round"]) -> None: ...
+    def WhichOneof(self, oneof_group: typing.Literal["_round", b"_round"]) -> typing.Literal["round"] | None: ...
 
 global___Request_Server = Request_Server
 
@@ -31,15 +50,30 @@ class Server_Settings(google.protobuf.message.Message):
 
     TREES_BY_CLIENT_FIELD_NUMBER: builtins.int
     CURRENT_ROUND_FIELD_NUMBER: builtins.int
+    CHUNK_SIZE_FIELD_NUMBER: builtins.int
+    TREE_DEDUP_FIELD_NUMBER: builtins.int
+    ASYNCHRONOUS_FIELD_NUMBER: builtins.int
+    MODEL_VERSION_FIELD_NUMBER: builtins.int
+    UPLOAD_ACK_FIELD_NUMBER: builtins.int
     trees_by_client: builtins.int
     current_round: builtins.int
+    chunk_size: builtins.int
+    tree_dedup: builtins.bool
+    asynchronous: builtins.bool
+    model_version: builtins.int
+    upload_ack: builtins.bool
     def __init__(
         self,
         *,
         trees_by_client: builtins.int = ...,
         current_round: builtins.int = ...,
+        chunk_size: builtins.int = ...,
+        tree_dedup: builtins.bool = ...,
+        asynchronous: builtins.bool = ...,
+        model_version: builtins.int = ...,
+        upload_ack: builtins.bool = ...,
     ) -> None: ...
-    def ClearField(self, field_name: typing.Literal["current_round", b"current_round", "trees_by_client", b"trees_by_client"]) -> None: ...
+    def ClearField(self, field_name: typing.Literal["asynchronous", b"asynchronous", "chunk_size", b"chunk_size", "current_round", b"current_round", "model_version", b"model_version", "tree_dedup", b"tree_dedup", "trees_by_client", b"trees_by_client", "upload_ack", b"upload_ack"]) -> None: ...
 
 global___Server_Settings = Server_Settings
 
@@ -49,15 +83,20 @@ class Forest_CLient(google.protobuf.message.Message):
 
     CLIENT_ID_FIELD_NUMBER: builtins.int
     SERIALISED_TREE_FIELD_NUMBER: builtins.int
+    ROUND_FIELD_NUMBER: builtins.int
     client_ID: builtins.int
     serialised_tree: builtins.bytes
+    round: builtins.int
     def __init__(
         self,
         *,
         client_ID: builtins.int = ...,
         serialised_tree: builtins.bytes = ...,
+        round: builtins.int | None = ...,
     ) -> None: ...
-    def ClearField(self, field_name: typing.Literal["client_ID", b"client_ID", "serialised_tree", b"serialised_tree"]) -> None: ...
+    def HasField(self, field_name: typing.Literal["_round", b"_round", "round", b"round"]) -> builtins.bool: ...
+    def ClearField(self, field_name: typing.Literal["_round", b"_round", "client_ID", b"client_ID", "round", b"round", "serialised_tree", b"serialised_tree"]) -> None: ...
+    def WhichOneof(self, oneof_group: typing.Literal["_round", b"_round"]) -> typing.Literal["round"] | None: ...
 
 global___Forest_CLient = Forest_CLient
 
@@ -76,6 +115,76 @@ class Forest_Server(google.protobuf.message.Message):
 
 global___Forest_Server = Forest_Server
 
+@typing.final
+class Forest_Chunk_Client(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    CLIENT_ID_FIELD_NUMBER: builtins.int
+    SERIALISED_TREES_FIELD_NUMBER: builtins.int
+    TREE_HASHES_FIELD_NUMBER: builtins.int
+    KNOWN_HASHES_FIELD_NUMBER: builtins.int
+    ROUND_FIELD_NUMBER: builtins.int
+    client_ID: builtins.int
+    round: builtins.int
+    @property
+    def serialised_trees(self) -> google.protobuf.internal.containers.RepeatedScalarFieldContainer[builtins.bytes]: ...
+    @property
+    def tree_hashes(self) -> google.protobuf.internal.containers.RepeatedScalarFieldContainer[builtins.bytes]: ...
+    @property
+    def known_hashes(self) -> google.protobuf.internal.containers.RepeatedScalarFieldContainer[builtins.bytes]: ...
+    def __init__(
+        self,
+        *,
+        client_ID: builtins.int = ...,
+        serialised_trees: collections.abc.Iterable[builtins.bytes] | None = ...,
+        tree_hashes: collections.abc.Iterable[builtins.bytes] | None = ...,
+        known_hashes: collections.abc.Iterable[builtins.bytes] | None = ...,
+        round: builtins.int | None = ...,
+    ) -> None: ...
+    def HasField(self, field_name: typing.Literal["_round", b"_round", "round", b"round"]) -> builtins.bool: ...
+    def ClearField(self, field_name: typing.Literal["_round", b"_round", "client_ID", b"client_ID", "known_hashes", b"known_hashes", "round", b"round", "serialised_trees", b"serialised_trees", "tree_hashes", b"tree_hashes"]) -> None: ...
+    def WhichOneof(self, oneof_group: typing.Literal["_round", b"_round"]) -> typing.Literal["round"] | None: ...
+
+global___Forest_Chunk_Client = Forest_Chunk_Client
+
+@typing.final
+class Forest_Chunk_Server(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    SERIALISED_TREES_FIELD_NUMBER: builtins.int
+    TREE_HASHES_FIELD_NUMBER: builtins.int
+    @property
+    def serialised_trees(self) -> google.protobuf.internal.containers.RepeatedScalarFieldContainer[builtins.bytes]: ...
+    @property
+    def tree_hashes(self) -> google.protobuf.internal.containers.RepeatedScalarFieldContainer[builtins.bytes]: ...
+    def __init__(
+        self,
+        *,
+        serialised_trees: collections.abc.Iterable[builtins.bytes] | None = ...,
+        tree_hashes: collections.abc.Iterable[builtins.bytes] | None = ...,
+    ) -> None: ...
+    def ClearField(self, field_name: typing.Literal["serialised_trees", b"serialised_trees", "tree_hashes", b"tree_hashes"]) -> None: ...
+
+global___Forest_Chunk_Server = Forest_Chunk_Server
+
+@typing.final
+class Upload_Ack(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    ROUND_FIELD_NUMBER: builtins.int
+    NUMBER_OF_TREES_FIELD_NUMBER: builtins.int
+    round: builtins.int
+    number_of_trees: builtins.int
+    def __init__(
+        self,
+        *,
+        round: builtins.int = ...,
+        number_of_trees: builtins.int = ...,
+    ) -> None: ...
+    def ClearField(self, field_name: typing.Literal["number_of_trees", b"number_of_trees", "round", b"round"]) -> None: ...
+
+global___Upload_Ack = Upload_Ack
+
 @typing.final
 class OK(google.protobuf.message.Message):
     DESCRIPTOR: google.protobuf.descriptor.Descriptor
@@ -90,3 +199,156 @@ class OK(google.protobuf.message.Message):
     def ClearField(self, field_name: typing.Literal["ok", b"ok"]) -> None: ...
 
 global___OK = OK
+
+@typing.final
+class Round_Event(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    class _Kind:
+        ValueType = typing.NewType("ValueType", builtins.int)
+        V: typing_extensions.TypeAlias = ValueType
+
+    class _KindEnumTypeWrapper(google.protobuf.internal.enum_type_wrapper._EnumTypeWrapper[Round_Event._Kind.ValueType], builtins.type):
+        DESCRIPTOR: google.protobuf.descriptor.EnumDescriptor
+        ROUND_STARTED: Round_Event._Kind.ValueType  # 0
+        MODEL_READY: Round_Event._Kind.ValueType  # 1
+        TRAINING_FINISHED: Round_Event._Kind.ValueType  # 2
+
+    class Kind(_Kind, metaclass=_KindEnumTypeWrapper): ...
+    ROUND_STARTED: Round_Event.Kind.ValueType  # 0
+    MODEL_READY: Round_Event.Kind.ValueType  # 1
+    TRAINING_FINISHED: Round_Event.Kind.ValueType  # 2
+
+    KIND_FIELD_NUMBER: builtins.int
+    ROUND_FIELD_NUMBER: builtins.int
+    TREES_BY_CLIENT_FIELD_NUMBER: builtins.int
+    kind: global___Round_Event.Kind.ValueType
+    round: builtins.int
+    trees_by_client: builtins.int
+    def __init__(
+        self,
+        *,
+        kind: global___Round_Event.Kind.ValueType = ...,
+        round: builtins.int = ...,
+        trees_by_client: builtins.int = ...,
+    ) -> None: ...
+    def ClearField(self, field_name: typing.Literal["kind", b"kind", "round", b"round", "trees_by_client", b"trees_by_client"]) -> None: ...
+
+global___Round_Event = Round_Event
+
+@typing.final
+class Rpc_Stats(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    METHOD_FIELD_NUMBER: builtins.int
+    CALLS_FIELD_NUMBER: builtins.int
+    REQUEST_BYTES_FIELD_NUMBER: builtins.int
+    RESPONSE_BYTES_FIELD_NUMBER: builtins.int
+    TOTAL_SECONDS_FIELD_NUMBER: builtins.int
+    MAX_SECONDS_FIELD_NUMBER: builtins.int
+    LATENCY_BOUNDS_FIELD_NUMBER: builtins.int
+    LATENCY_COUNTS_FIELD_NUMBER: builtins.int
+    method: builtins.str
+    calls: builtins.int
+    request_bytes: builtins.int
+    response_bytes: builtins.int
+    total_seconds: builtins.float
+    max_seconds: builtins.float
+    @property
+    def latency_bounds(self) -> google.protobuf.internal.containers.RepeatedScalarFieldContainer[builtins.float]:
+        """limite superior de cada faixa do histograma, em segundos"""
+
+    @property
+    def latency_counts(self) -> google.protobuf.internal.containers.RepeatedScalarFieldContainer[builtins.int]:
+        """chamadas por faixa; a última conta as acima do último limite"""
+
+    def __init__(
+        self,
+        *,
+        method: builtins.str = ...,
+        calls: builtins.int = ...,
+        request_bytes: builtins.int = ...,
+        response_bytes: builtins.int = ...,
+        total_seconds: builtins.float = ...,
+        max_seconds: builtins.float = ...,
+        latency_bounds: collections.abc.Iterable[builtins.float] | None = ...,
+        latency_counts: collections.abc.Iterable[builtins.int] | None = ...,
+    ) -> None: ...
+    def ClearField(self, field_name: typing.Literal["calls", b"calls", "latency_bounds", b"latency_bounds", "latency_counts", b"latency_counts", "max_seconds", b"max_seconds", "method", b"method", "request_bytes", b"request_bytes", "response_bytes", b"response_bytes", "total_seconds", b"total_seconds"]) -> None: ...
+
+global___Rpc_Stats = Rpc_Stats
+
+@typing.final
+class Server_Stats(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    ROUND_FIELD_NUMBER: builtins.int
+    MODEL_VERSION_FIELD_NUMBER: builtins.int
+    ASYNCHRONOUS_FIELD_NUMBER: builtins.int
+    EXPECTED_CLIENTS_FIELD_NUMBER: builtins.int
+    CONNECTED_CLIENTS_FIELD_NUMBER: builtins.int
+    RESPONDED_CLIENTS_FIELD_NUMBER: builtins.int
+    FORESTS_IN_WAREHOUSE_FIELD_NUMBER: builtins.int
+    TREES_IN_WAREHOUSE_FIELD_NUMBER: builtins.int
+    AGGREGATION_STATE_FIELD_NUMBER: builtins.int
+    BYTES_RECEIVED_FIELD_NUMBER: builtins.int
+    BYTES_SENT_FIELD_NUMBER: builtins.int
+    EXECUTOR_QUEUE_DEPTH_FIELD_NUMBER: builtins.int
+    PROCESS_POOL_QUEUE_DEPTH_FIELD_NUMBER: builtins.int
+    EVENT_LOOP_LAG_FIELD_NUMBER: builtins.int
+    MAX_EVENT_LOOP_LAG_FIELD_NUMBER: builtins.int
+    RSS_BYTES_FIELD_NUMBER: builtins.int
+    UPTIME_FIELD_NUMBER: builtins.int
+    ROUND_SUBSCRIBERS_FIELD_NUMBER: builtins.int
+    RPC_STATS_FIELD_NUMBER: builtins.int
+    RPC_ACCOUNTING_FIELD_NUMBER: builtins.int
+    round: builtins.int
+    model_version: builtins.int
+    asynchronous: builtins.bool
+    expected_clients: builtins.int
+    connected_clients: builtins.int
+    responded_clients: builtins.int
+    forests_in_warehouse: builtins.int
+    trees_in_warehouse: builtins.int
+    aggregation_state: builtins.int
+    bytes_received: builtins.int
+    bytes_sent: builtins.int
+    executor_queue_depth: builtins.int
+    """tarefas pendentes (na fila ou rodando)"""
+    process_pool_queue_depth: builtins.int
+    event_loop_lag: builtins.float
+    max_event_loop_lag: builtins.float
+    rss_bytes: builtins.int
+    uptime: builtins.float
+    round_subscribers: builtins.int
+    rpc_accounting: builtins.bool
+    """false: tráfego e latências das RPCs não são contados"""
+    @property
+    def rpc_stats(self) -> google.protobuf.internal.containers.RepeatedCompositeFieldContainer[global___Rpc_Stats]: ...
+    def __init__(
+        self,
+        *,
+        round: builtins.int = ...,
+        model_version: builtins.int = ...,
+        asynchronous: builtins.bool = ...,
+        expected_clients: builtins.int = ...,
+        connected_clients: builtins.int = ...,
+        responded_clients: builtins.int = ...,
+        forests_in_warehouse: builtins.int = ...,
+        trees_in_warehouse: builtins.int = ...,
+        aggregation_state: builtins.int = ...,
+        bytes_received: builtins.int = ...,
+        bytes_sent: builtins.int = ...,
+        executor_queue_depth: builtins.int = ...,
+        process_pool_queue_depth: builtins.int = ...,
+        event_loop_lag: builtins.float = ...,
+        max_event_loop_lag: builtins.float = ...,
+        rss_bytes: builtins.int = ...,
+        uptime: builtins.float = ...,
+        round_subscribers: builtins.int = ...,
+        rpc_stats: collections.abc.Iterable[global___Rpc_Stats] | None = ...,
+        rpc_accounting: builtins.bool = ...,
+    ) -> None: ...
+    def ClearField(self, field_name: typing.Literal["aggregation_state", b"aggregation_state", "asynchronous", b"asynchronous", "bytes_received", b"bytes_received", "bytes_sent", b"bytes_sent", "connected_clients", b"connected_clients", "event_loop_lag", b"event_loop_lag", "executor_queue_depth", b"executor_queue_depth", "expected_clients", b"expected_clients", "forests_in_warehouse", b"forests_in_warehouse", "max_event_loop_lag", b"max_event_loop_lag", "model_version", b"model_version", "process_pool_queue_depth", b"process_pool_queue_depth", "responded_clients", b"responded_clients", "round", b"round", "round_subscribers", b"round_subscribers", "rpc_accounting", b"rpc_accounting", "rpc_stats", b"rpc_stats", "rss_bytes", b"rss_bytes", "trees_in_warehouse", b"trees_in_warehouse", "uptime", b"uptime"]) -> None: ...
+
+global___Server_Stats = Server_Stats
@@ -54,6 +54,36 @@ class FedTStub(object):
                 request_serializer=fedT__pb2.Request_Server.SerializeToString,
                 response_deserializer=fedT__pb2.OK.FromString,
                 _registered_method=True)
+        self.aggregate_trees_packed = channel.stream_stream(
+                '/fedT.FedT/aggregate_trees_packed',
+                request_serializer=fedT__pb2.Forest_Chunk_Client.SerializeToString,
+                response_deserializer=fedT__pb2.Forest_Chunk_Server.FromString,
+                _registered_method=True)
+        self.get_server_model_packed = channel.unary_stream(
+                '/fedT.FedT/get_server_model_packed',
+                request_serializer=fedT__pb2.Request_Server.SerializeToString,
+                response_deserializer=fedT__pb2.Forest_Chunk_Server.FromString,
+                _registered_method=True)
+        self.subscribe_rounds = channel.unary_stream(
+                '/fedT.FedT/subscribe_rounds',
+                request_serializer=fedT__pb2.Request_Server.SerializeToString,
+                response_deserializer=fedT__pb2.Round_Event.FromString,
+                _registered_method=True)
+        self.upload_trees = channel.stream_unary(
+                '/fedT.FedT/upload_trees',
+                request_serializer=fedT__pb2.Forest_Chunk_Client.SerializeToString,
+                response_deserializer=fedT__pb2.Upload_Ack.FromString,
+                _registered_method=True)
+        self.fetch_global_model = channel.unary_stream(
+                '/fedT.FedT/fetch_global_model',
+                request_serializer=fedT__pb2.Request_Server.SerializeToString,
+                response_deserializer=fedT__pb2.Forest_Chunk_Server.FromString,
+                _registered_method=True)
+        self.get_server_stats = channel.unary_unary(
+                '/fedT.FedT/get_server_stats',
+                request_serializer=fedT__pb2.Request_Server.SerializeToString,
+                response_deserializer=fedT__pb2.Server_Stats.FromString,
+                _registered_method=True)
 
 
 class FedTServicer(object):
@@ -83,6 +113,42 @@ class FedTServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def aggregate_trees_packed(self, request_iterator, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def get_server_model_packed(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def subscribe_rounds(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def upload_trees(self, request_iterator, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def fetch_global_model(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def get_server_stats(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_FedTServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -106,6 +172,36 @@ def add_FedTServicer_to_server(servicer, server):
                     request_deserializer=fedT__pb2.Request_Server.FromString,
                     response_serializer=fedT__pb2.OK.SerializeToString,
             ),
+            'aggregate_trees_packed': grpc.stream_stream_rpc_method_handler(
+                    servicer.aggregate_trees_packed,
+                    request_deserializer=fedT__pb2.Forest_Chunk_Client.FromString,
+                    response_serializer=fedT__pb2.Forest_Chunk_Server.SerializeToString,
+            ),
+            'get_server_model_packed': grpc.unary_stream_rpc_method_handler(
+                    servicer.get_server_model_packed,
+                    request_deserializer=fedT__pb2.Request_Server.FromString,
+                    response_serializer=fedT__pb2.Forest_Chunk_Server.SerializeToString,
+            ),
+            'subscribe_rounds': grpc.unary_stream_rpc_method_handler(
+                    servicer.subscribe_rounds,
+                    request_deserializer=fedT__pb2.Request_Server.FromString,
+                    response_serializer=fedT__pb2.Round_Event.SerializeToString,
+            ),
+            'upload_trees': grpc.stream_unary_rpc_method_handler(
+                    servicer.upload_trees,
+                    request_deserializer=fedT__pb2.Forest_Chunk_Client.FromString,
+                    response_serializer=fedT__pb2.Upload_Ack.SerializeToString,
+            ),
+            'fetch_global_model': grpc.unary_stream_rpc_method_handler(
+                    servicer.fetch_global_model,
+                    request_deserializer=fedT__pb2.Request_Server.FromString,
+                    response_serializer=fedT__pb2.Forest_Chunk_Server.SerializeToString,
+            ),
+            'get_server_stats': grpc.unary_unary_rpc_method_handler(
+                    servicer.get_server_stats,
+                    request_deserializer=fedT__pb2.Request_Server.FromString,
+                    response_serializer=fedT__pb2.Server_Stats.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'fedT.FedT', rpc_method_handlers)
@@ -224,3 +320,165 @@ class FedT(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def aggregate_trees_packed(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(
+            request_iterator,
+            target,
+            '/fedT.FedT/aggregate_trees_packed',
+            fedT__pb2.Forest_Chunk_Client.SerializeToString,
+            fedT__pb2.Forest_Chunk_Server.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def get_server_model_packed(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/fedT.FedT/get_server_model_packed',
+            fedT__pb2.Request_Server.SerializeToString,
+            fedT__pb2.Forest_Chunk_Server.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def subscribe_rounds(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/fedT.FedT/subscribe_rounds',
+            fedT__pb2.Request_Server.SerializeToString,
+            fedT__pb2.Round_Event.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def upload_trees(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(
+            request_iterator,
+            target,
+            '/fedT.FedT/upload_trees',
+            fedT__pb2.Forest_Chunk_Client.SerializeToString,
+            fedT__pb2.Upload_Ack.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def fetch_global_model(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/fedT.FedT/fetch_global_model',
+            fedT__pb2.Request_Server.SerializeToString,
+            fedT__pb2.Forest_Chunk_Server.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def get_server_stats(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/fedT.FedT/get_server_stats',
+            fedT__pb2.Request_Server.SerializeToString,
+            fedT__pb2.Server_Stats.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
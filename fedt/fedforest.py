@@ -1,42 +1,114 @@
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.tree import DecisionTreeRegressor
-from sklearn.metrics import mean_absolute_error
-
-from scipy.stats import pearsonr
 
 import numpy as np
 
 import random
 
-import warnings
-from scipy.stats import ConstantInputWarning
-
-warnings.filterwarnings("ignore", category=ConstantInputWarning)
+from collections import namedtuple
 
 from fedt import utils
+from fedt.forest import FlatForest
+from fedt.settings import number_of_jobs
+
+# Métricas de cada árvore de uma floresta no conjunto de validação, alinhadas com a ordem das árvores,
+# e a predição da floresta (média das predições das suas árvores).
+TreeScores = namedtuple("TreeScores", ["absolute_error", "squared_error", "pearson", "mean_prediction"])
+
+def build_prediction_matrix(trees: list[DecisionTreeRegressor], X, n_jobs=number_of_jobs):
+    """
+    ### Função:
+    Montar a matriz de predições (n_árvores x n_amostras) das árvores no conjunto X,
+    com todas as árvores compiladas numa FlatForest e divididas entre threads.
+    ### Args:
+    - trees: Lista de árvores.
+    - X: Features de validação.
+    - n_jobs: Número de threads.
+    ### Returns:
+    - Matriz float64 com uma linha de predições por árvore.
+    """
+    return FlatForest(trees, n_jobs).predict_matrix(X)
+
+def score_prediction_matrix(prediction_matrix, y):
+    """
+    ### Função:
+    Calcular MAE, MSE e correlação de Pearson de todas as linhas da matriz de predições de uma vez.
+    Linhas com predição constante ficam com Pearson NaN, como no scipy.
+    ### Args:
+    - prediction_matrix: Matriz (n_árvores x n_amostras).
+    - y: Targets de validação.
+    ### Returns:
+    - TreeScores com um array por métrica e a predição média das linhas.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    errors = prediction_matrix - y
+
+    absolute_error = np.abs(errors).mean(axis=1)
+    squared_error = np.square(errors).mean(axis=1)
+
+    centered_predictions = prediction_matrix - prediction_matrix.mean(axis=1, keepdims=True)
+    centered_y = y - y.mean()
+    covariance = centered_predictions @ centered_y
+    norm = np.sqrt(np.square(centered_predictions).sum(axis=1) * np.square(centered_y).sum())
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pearson = np.where(norm > 0, covariance / norm, np.nan)
+
+    return TreeScores(absolute_error, squared_error, np.clip(pearson, -1.0, 1.0), prediction_matrix.mean(axis=0))
 
 class FedForest():
-    def __init__(self, model: RandomForestRegressor) -> None:
+    def __init__(self, model: RandomForestRegressor, n_jobs=number_of_jobs, scorer=None) -> None:
         self.model = model
+        self.n_jobs = n_jobs
+        # Avaliação fora do processo (ProcessPoolScorer). Com ela, as florestas podem ser listas de hashes
+        # do tree_store, e as estratégias devolvem os itens selecionados (hashes ou árvores) pelo índice.
+        self.scorer = scorer
+
+    def score_forests(self, best_forests: list[list[DecisionTreeRegressor]], X_valid, y_valid) -> list[TreeScores]:
+        """
+        ### Função:
+        Avaliar todas as árvores de todas as florestas com uma única matriz de predições.
+        ### Returns:
+        - Lista de TreeScores, uma por floresta.
+        """
+        if self.scorer is not None:
+            return self.scorer.score_forests(best_forests)
+
+        trees = [tree for forest in best_forests for tree in forest]
+        prediction_matrix = build_prediction_matrix(trees, X_valid, self.n_jobs)
+        scores = score_prediction_matrix(prediction_matrix, y_valid)
+
+        forests_scores = []
+        start = 0
+        for forest in best_forests:
+            end = start + len(forest)
+            forests_scores.append(TreeScores(
+                scores.absolute_error[start:end],
+                scores.squared_error[start:end],
+                scores.pearson[start:end],
+                prediction_matrix[start:end].mean(axis=0)
+            ))
+            start = end
+        return forests_scores
 
     def aggregate_fit_best_forest_strategy(self, best_forests: list[list[DecisionTreeRegressor]]):
         """
         ### Função:
-        Essa estratégia percorre as árvores retornadas por cada um dos clientes salvando 
-        as que possuem o menor mean absolute error. 
+        Essa estratégia percorre as árvores retornadas por cada um dos clientes salvando
+        as que possuem o menor mean absolute error.
         A floresta com o menor erro é definida como a melhor, e se torna a versão global.
         """
         data_valid, label_valid = utils.load_server_side_validation_data()
+        label_valid = np.asarray(label_valid, dtype=np.float64)
         best_forest_error = float('inf') # float('inf') denota um número muito grande
-        for forest in best_forests:
-            utils.set_model_params(self.model, forest)
-            forest_error = mean_absolute_error(label_valid, self.model.predict(data_valid))
+        for forest, scores in zip(best_forests, self.score_forests(best_forests, data_valid, label_valid)):
+            # A predição da floresta é a média das predições das suas árvores.
+            forest_error = np.abs(scores.mean_prediction - label_valid).mean()
             if forest_error < best_forest_error:
                 best_forest = forest
                 best_forest_error = forest_error
         utils.set_model_params(self.model, best_forest)
         return best_forest
-    
+
     def aggregate_fit_best_trees_strategy(self, best_forests: list[list[DecisionTreeRegressor]]):
         """
         Essa estratégia ordena as árvores de cada floresta com base no seu erro quadrático médio.
@@ -50,11 +122,10 @@ class FedForest():
 
         print(f'Numero de melhores arvores por floresta é: {best_trees_ratio}')
 
-        for forest in best_forests:
-            forest_trees = forest
-            trees_sorted = sorted(forest_trees, key=lambda tree: mean_absolute_error(y_valid, tree.predict(X_valid)))
-            best_trees.extend(trees_sorted[:best_trees_ratio])
-            
+        for forest, scores in zip(best_forests, self.score_forests(best_forests, X_valid, y_valid)):
+            order = np.argsort(scores.absolute_error, kind="stable")
+            best_trees.extend(forest[index] for index in order[:best_trees_ratio])
+
         return best_trees
 
     def aggregate_fit_best_trees_threshold_strategy(self, best_forests: list[list[DecisionTreeRegressor]], threshold: float):
@@ -66,15 +137,14 @@ class FedForest():
         X_valid, y_valid = utils.load_server_side_validation_data()
         best_trees = []
 
-        for forest in best_forests:
-            forest_trees = forest
-            trees_sorted = sorted(forest_trees, key=lambda tree: pearsonr(y_valid, tree.predict(X_valid)))
-            
+        for forest, scores in zip(best_forests, self.score_forests(best_forests, X_valid, y_valid)):
+            order = np.argsort(scores.pearson, kind="stable")
+
             # Filtra as árvores com pearson maior que o threshold
-            selected_trees = [tree for tree in trees_sorted if pearsonr(y_valid, tree.predict(X_valid))[0] > threshold]
-    
+            selected_trees = [forest[index] for index in order if scores.pearson[index] > threshold]
+
             print(f"\n######################\nNúmero de Florestas: {len(best_forests)}\nNúmero de Árvores por Floresta: {len(best_forests[0])}\n######################\n")
-            
+
             best_trees.extend(selected_trees)
 
         return best_trees
@@ -84,14 +154,13 @@ class FedForest():
         best_trees_ratio = int(len(best_forests[0]) * 0.5)
 
         for forest in best_forests:
-            forest_trees = np.array(forest)
-            num_trees = len(forest_trees)
+            num_trees = len(forest)
 
             if best_trees_ratio >= num_trees:
-                best_trees.extend(forest_trees)
+                best_trees.extend(forest)
             else:
                 selected_indices = np.random.choice(num_trees, best_trees_ratio, replace=False)
-                selected_trees = forest_trees[selected_indices]
+                selected_trees = [forest[index] for index in selected_indices]
                 best_trees.extend(selected_trees)
 
         return best_trees
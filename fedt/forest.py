@@ -0,0 +1,187 @@
+import numpy as np
+from sklearn.tree import DecisionTreeRegressor
+
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ForestContainer():
+    """
+    Floresta montada diretamente a partir de árvores já treinadas (por exemplo, as desserializadas
+    do modelo global), sem precisar treinar um RandomForestRegressor só para ter o objeto.
+    Expõe `estimators_` e `predict` como o RandomForestRegressor, então funciona com
+    `utils.get_model_parameters`, `utils.set_model_params` e o `HouseClient.evaluate`.
+    """
+
+    def __init__(self, trees: list[DecisionTreeRegressor] = None) -> None:
+        self.estimators_ = list(trees) if trees is not None else []
+
+    def __len__(self) -> int:
+        return len(self.estimators_)
+
+    def predict(self, X):
+        """
+        ### Função:
+        Prever com a média das predições das árvores, como o RandomForestRegressor.
+        A entrada é convertida uma única vez para float32 contíguo e as árvores pulam a validação.
+        ### Args:
+        - X: Features (array ou DataFrame).
+        ### Returns:
+        - Array com as predições.
+        """
+        if not self.estimators_:
+            raise ValueError("A floresta não possui árvores.")
+
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        predictions = np.zeros(X.shape[0], dtype=np.float64)
+        for tree in self.estimators_:
+            predictions += tree.predict(X, check_input=False)
+        predictions /= len(self.estimators_)
+        return predictions
+
+
+class FlatForest():
+    """
+    Floresta "compilada": os nós de todas as árvores ficam em arrays contíguos
+    (filhos, feature, threshold e valor), com os índices dos filhos já deslocados
+    para o array global. Para lotes pequenos, a inferência percorre todas as árvores
+    de uma vez com operações vetorizadas do NumPy, em vez de pagar o custo fixo de
+    chamar o predict de cada árvore. Para lotes grandes, o percurso compilado de cada
+    árvore do sklearn é mais rápido, então as árvores são avaliadas uma a uma (sem
+    validação de entrada). Nos dois casos as árvores podem ser divididas entre threads.
+    """
+
+    # Acima desse número de amostras, o predict de cada árvore é mais rápido que o percurso vetorizado.
+    VECTORISED_MAX_SAMPLES = 512
+    # Máximo de pares (árvore, amostra) percorridos de uma vez, para limitar a memória.
+    BATCH_SIZE = 1 << 21
+
+    def __init__(self, trees: list[DecisionTreeRegressor], n_jobs: int = 1) -> None:
+        if not trees:
+            raise ValueError("A floresta não possui árvores.")
+
+        self.trees = list(trees)
+        self.n_trees = len(self.trees)
+        self.n_jobs = max(1, n_jobs)
+        self.n_features = self.trees[0].n_features_in_
+        self.children = None
+
+    def __len__(self) -> int:
+        return self.n_trees
+
+    def compile(self) -> None:
+        """
+        ### Função:
+        Montar os arrays contíguos dos nós de todas as árvores (feito uma única vez, no primeiro uso).
+        """
+        if self.children is not None:
+            return
+
+        tree_structures = [tree.tree_ for tree in self.trees]
+        node_counts = np.array([tree_.node_count for tree_ in tree_structures], dtype=np.intp)
+        self.roots = np.zeros(self.n_trees, dtype=np.intp)
+        self.roots[1:] = np.cumsum(node_counts)[:-1]
+        offsets = np.repeat(self.roots, node_counts)
+
+        children_left = np.concatenate([tree_.children_left for tree_ in tree_structures])
+        children_right = np.concatenate([tree_.children_right for tree_ in tree_structures])
+        self.is_leaf = children_left == -1
+
+        # Filhos intercalados: children[2 * nó] é o filho direito e children[2 * nó + 1] o esquerdo,
+        # de modo que o próximo nó sai de um único acesso indexado pelo resultado da comparação.
+        # Nas folhas, feature fica 0 e os filhos ficam inválidos (elas saem do percurso antes).
+        children = np.empty(2 * len(children_left), dtype=np.intp)
+        children[0::2] = children_right + offsets
+        children[1::2] = children_left + offsets
+
+        self.feature = np.concatenate([tree_.feature for tree_ in tree_structures]).astype(np.intp)
+        self.feature[self.is_leaf] = 0
+        self.threshold = np.concatenate([tree_.threshold for tree_ in tree_structures])
+        self.value = np.concatenate([tree_.value[:, 0, 0] for tree_ in tree_structures])
+        self.missing_go_to_left = np.concatenate([
+            np.asarray(getattr(tree_, "missing_go_to_left", np.zeros(tree_.node_count, dtype=np.uint8)))
+            for tree_ in tree_structures
+        ]).astype(bool)
+        self.children = children
+
+    def _predict_block(self, X, roots):
+        """
+        ### Função:
+        Descer todas as amostras de X em todas as árvores de `roots` até as folhas.
+        A cada nível, os pares (árvore, amostra) que chegaram numa folha recebem o valor dela
+        e saem do lote, então só os pares ainda ativos são processados.
+        ### Returns:
+        - Predições com formato (n_árvores, n_amostras).
+        """
+        number_of_samples = X.shape[0]
+        flat_X = X.ravel()
+        has_missing = np.isnan(flat_X).any()
+
+        nodes = np.repeat(roots, number_of_samples)
+        sample_offsets = np.tile(np.arange(number_of_samples, dtype=np.intp) * self.n_features, len(roots))
+        positions = np.arange(nodes.size, dtype=np.intp)
+        predictions = np.empty(nodes.size, dtype=np.float64)
+
+        while nodes.size:
+            at_leaf = self.is_leaf[nodes]
+            if at_leaf.any():
+                predictions[positions[at_leaf]] = self.value[nodes[at_leaf]]
+                active = ~at_leaf
+                nodes, sample_offsets, positions = nodes[active], sample_offsets[active], positions[active]
+
+            x = flat_X[sample_offsets + self.feature[nodes]]
+            go_left = x <= self.threshold[nodes]
+            if has_missing:
+                go_left |= np.isnan(x) & self.missing_go_to_left[nodes]
+            nodes = self.children[2 * nodes + go_left]
+
+        return predictions.reshape(len(roots), number_of_samples)
+
+    def _predict_trees(self, X, first_tree, last_tree, output) -> None:
+        if X.shape[0] > self.VECTORISED_MAX_SAMPLES:
+            for index in range(first_tree, last_tree):
+                output[index] = self.trees[index].predict(X, check_input=False)
+            return
+
+        roots = self.roots[first_tree:last_tree]
+        samples_per_batch = max(1, self.BATCH_SIZE // max(1, len(roots)))
+        for start in range(0, X.shape[0], samples_per_batch):
+            end = start + samples_per_batch
+            output[first_tree:last_tree, start:end] = self._predict_block(X[start:end], roots)
+
+    def predict_matrix(self, X):
+        """
+        ### Função:
+        Calcular a predição de cada árvore para cada amostra.
+        ### Args:
+        - X: Features.
+        ### Returns:
+        - Matriz float64 (n_árvores x n_amostras).
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        prediction_matrix = np.empty((self.n_trees, X.shape[0]), dtype=np.float64)
+        if X.shape[0] <= self.VECTORISED_MAX_SAMPLES:
+            self.compile()
+
+        n_jobs = min(self.n_jobs, self.n_trees)
+        if n_jobs == 1:
+            self._predict_trees(X, 0, self.n_trees, prediction_matrix)
+            return prediction_matrix
+
+        bounds = np.linspace(0, self.n_trees, n_jobs + 1).astype(int)
+        with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+            list(pool.map(
+                lambda job: self._predict_trees(X, bounds[job], bounds[job + 1], prediction_matrix),
+                range(n_jobs)
+            ))
+        return prediction_matrix
+
+    def predict(self, X):
+        """
+        ### Função:
+        Prever com a média das predições das árvores, como o RandomForestRegressor.
+        ### Args:
+        - X: Features.
+        ### Returns:
+        - Array com as predições.
+        """
+        return self.predict_matrix(X).mean(axis=0)
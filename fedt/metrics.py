@@ -0,0 +1,120 @@
+import asyncio
+import json
+import os
+from pathlib import Path
+
+from fedt.settings import metrics_config
+
+FLUSH_POLICIES = ("record", "batch")
+FSYNC_POLICIES = ("never", "batch", "close")
+METRICS_SUFFIXES = (".jsonl", ".json")
+
+
+class MetricsWriter():
+    """
+    Grava as métricas num arquivo JSONL, uma linha por registro ({"key": round, ...métricas}),
+    sempre acrescentando ao final: o custo de cada round não cresce com o tamanho do arquivo.
+    `write` só enfileira o registro; a escrita roda numa tarefa em segundo plano, fora do event loop.
+    """
+
+    def __init__(self, path, flush=metrics_config["flush"], fsync=metrics_config["fsync"]) -> None:
+        if flush not in FLUSH_POLICIES:
+            raise ValueError(f"flush inválido: {flush}. Opções: {FLUSH_POLICIES}")
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync inválido: {fsync}. Opções: {FSYNC_POLICIES}")
+
+        self.path = Path(path)
+        self.flush = flush
+        self.fsync = fsync
+        self.queue = None
+        self._task = None
+        self._file = None
+
+    def write(self, key, metrics) -> None:
+        """Enfileirar as métricas de um round (chamado no event loop, não bloqueia)."""
+        self.write_record({"key": key, **metrics})
+
+    def write_record(self, record) -> None:
+        """Enfileirar um registro qualquer, gravado como uma linha de JSON."""
+        if self._task is None:
+            self.queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+        self.queue.put_nowait(json.dumps(record, ensure_ascii=False))
+
+    async def close(self) -> None:
+        """Gravar os registros pendentes e fechar o arquivo."""
+        if self._task is None:
+            return
+        self.queue.put_nowait(None)
+        await self._task
+        self._task = None
+
+    async def _run(self) -> None:
+        closing = False
+        while not closing:
+            lines = [await self.queue.get()]
+            while not self.queue.empty():
+                lines.append(self.queue.get_nowait())
+            closing = lines[-1] is None
+            lines = [line for line in lines if line is not None]
+            if lines:
+                await asyncio.to_thread(self._append, lines)
+        await asyncio.to_thread(self._close_file)
+
+    def _append(self, lines) -> None:
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        for line in lines:
+            self._file.write(line + "\n")
+            if self.flush == "record":
+                self._file.flush()
+        self._file.flush()
+        if self.fsync == "batch":
+            os.fsync(self._file.fileno())
+
+    def _close_file(self) -> None:
+        if self._file is None:
+            return
+        self._file.flush()
+        if self.fsync != "never":
+            os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = None
+
+
+def read_metrics(path) -> dict:
+    """
+    ### Função:
+    Ler um arquivo de resultados, no formato JSONL ou no JSON antigo.
+    ### Returns:
+    - Dicionário {chave (str): métricas}; registros repetidos valem pelo último.
+    """
+    path = Path(path)
+    with open(path, "r", encoding="utf-8") as file:
+        if path.suffix == ".json":
+            return json.load(file)
+
+        data = {}
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # Última linha incompleta (processo interrompido durante a escrita).
+                break
+            data[str(record.pop("key"))] = record
+        return data
+
+
+def next_metrics_file_path(folder, base_file_name):
+    """
+    ### Função:
+    Escolher o próximo arquivo de resultados da pasta (base_N.jsonl), contando também os .json antigos.
+    """
+    existing_files = [
+        file for file in os.listdir(folder)
+        if file.startswith(base_file_name) and file.endswith(METRICS_SUFFIXES)
+    ]
+    return (Path(folder) / f"{base_file_name}_{len(existing_files) + 1}.jsonl").resolve()
@@ -0,0 +1,94 @@
+from fedt import utils
+from fedt.fedforest import TreeScores, build_prediction_matrix, score_prediction_matrix
+from fedt.tree_store import TreeStore
+
+import numpy as np
+
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+
+def create_process_pool(max_workers):
+    """
+    ### Função:
+    Criar o pool de processos da agregação. Os processos são criados com "spawn",
+    porque fazer fork de um processo com o gRPC rodando não é seguro.
+    Cada processo carrega a validação do servidor uma única vez, ao iniciar.
+    ### Args:
+    - max_workers: Número de processos.
+    ### Returns:
+    - ProcessPoolExecutor.
+    """
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=utils.load_server_side_validation_data
+    )
+
+
+def score_serialised_trees(serialised_trees):
+    """
+    ### Função:
+    Executada nos processos do pool: desserializar um lote de árvores e avaliá-las na validação do servidor.
+    ### Args:
+    - serialised_trees: Árvores em bytes.
+    ### Returns:
+    - Arrays de MAE, MSE e Pearson por árvore e a soma das predições das árvores (por amostra).
+    """
+    X_valid, y_valid = utils.load_server_side_validation_data()
+    trees = utils.deserialise_several_trees(serialised_trees)
+    prediction_matrix = build_prediction_matrix(trees, X_valid, n_jobs=1)
+    scores = score_prediction_matrix(prediction_matrix, y_valid)
+    return scores.absolute_error, scores.squared_error, scores.pearson, prediction_matrix.sum(axis=0)
+
+
+class ProcessPoolScorer():
+    """
+    Avalia as florestas num pool de processos, fora do GIL do servidor.
+    As árvores vão para os processos em bytes (as do tree_store, sem serializar de novo),
+    divididas em lotes, e voltam apenas como arrays de métricas: a seleção é feita pelo índice.
+    """
+
+    SHARD_SIZE = 64
+
+    def __init__(self, pool: Executor, tree_store: TreeStore, shard_size=SHARD_SIZE) -> None:
+        self.pool = pool
+        self.tree_store = tree_store
+        self.shard_size = shard_size
+
+    def _serialised(self, item) -> bytes:
+        """Bytes de um item da floresta: hash do tree_store ou árvore (objeto)."""
+        if isinstance(item, bytes):
+            return self.tree_store.get_serialised(item)
+        digest = self.tree_store.hash_of(item)
+        if digest is None:
+            return utils.serialise_tree(item)
+        return self.tree_store.get_serialised(digest)
+
+    def score_forests(self, best_forests) -> list[TreeScores]:
+        """
+        ### Função:
+        Avaliar todas as árvores de todas as florestas, com os lotes distribuídos entre os processos.
+        ### Args:
+        - best_forests: Lista de florestas (listas de hashes ou de árvores).
+        ### Returns:
+        - Lista de TreeScores, uma por floresta.
+        """
+        futures = []
+        for forest in best_forests:
+            serialised_trees = [self._serialised(item) for item in forest]
+            futures.append([
+                self.pool.submit(score_serialised_trees, serialised_trees[start:start + self.shard_size])
+                for start in range(0, len(serialised_trees), self.shard_size)
+            ])
+
+        forests_scores = []
+        for forest, forest_futures in zip(best_forests, futures):
+            results = [future.result() for future in forest_futures]
+            forests_scores.append(TreeScores(
+                np.concatenate([result[0] for result in results]),
+                np.concatenate([result[1] for result in results]),
+                np.concatenate([result[2] for result in results]),
+                np.sum([result[3] for result in results], axis=0) / len(forest)
+            ))
+        return forests_scores
@@ -1,19 +1,28 @@
-from fedt.settings import number_of_clients, client_script_path
+from fedt.settings import number_of_clients, client_script_path, client_shared_memory
+from fedt.dataset import SharedDataset, load_dataset_arrays
 
 import subprocess
 import time
 import os
 
-def run_clients():
+def create_shared_dataset(shared_memory):
+    """Carrega o dataset uma única vez num bloco de memória compartilhada para todos os clientes."""
+    if not shared_memory:
+        return None, []
+    shared_dataset = SharedDataset.create(*load_dataset_arrays())
+    return shared_dataset, ["--shm-name", shared_dataset.name]
+
+def run_clients(shared_memory=client_shared_memory):
     processes = []
-    
+    shared_dataset, shm_args = create_shared_dataset(shared_memory)
+
     for i in range(number_of_clients):
-        cmd = ["python3", client_script_path, "--client-id", str(i)]
-        
+        cmd = ["python3", client_script_path, "--client-id", str(i)] + shm_args
+
         # inicia o processo no diretório especificado
         p = subprocess.Popen(cmd)
         processes.append(p)
-        
+
         # espera 5 segundos antes de iniciar o próximo
         time.sleep(5)
 
@@ -21,16 +30,20 @@ def run_clients():
     for p in processes:
         p.wait()
 
-def run_clients_with_a_specific_strategy(input_aggregation_strategy):
+    if shared_dataset is not None:
+        shared_dataset.close()
+
+def run_clients_with_a_specific_strategy(input_aggregation_strategy, shared_memory=client_shared_memory):
     processes = []
-    
+    shared_dataset, shm_args = create_shared_dataset(shared_memory)
+
     for i in range(number_of_clients):
-        cmd = ["python3", client_script_path, "--client-id", str(i), "--strategy", input_aggregation_strategy]
-        
+        cmd = ["python3", client_script_path, "--client-id", str(i), "--strategy", input_aggregation_strategy] + shm_args
+
         # inicia o processo no diretório especificado
         p = subprocess.Popen(cmd)
         processes.append(p)
-        
+
         # espera 5 segundos antes de iniciar o próximo
         time.sleep(5)
 
@@ -38,5 +51,8 @@ def run_clients_with_a_specific_strategy(input_aggregation_strategy):
     for p in processes:
         p.wait()
 
+    if shared_dataset is not None:
+        shared_dataset.close()
+
 if __name__ == "__main__":
-    run_clients()
\ No newline at end of file
+    run_clients()
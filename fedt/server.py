@@ -1,21 +1,26 @@
 import asyncio
 import logging
 import time
-import json
-import os
 import gc
 
 import grpc
-import grpc.aio as grpc_aio
 
-from sklearn.ensemble import RandomForestRegressor
+import numpy as np
 
 from fedt.settings import (
     server_config, number_of_jobs, number_of_clients, 
     imported_aggregation_strategy, number_of_rounds,
-    results_folder
+    results_folder, transport_config
 )
 from fedt.fedforest import FedForest
+from fedt.forest import ForestContainer
+from fedt.tree_store import TreeStore
+from fedt.process_pool import ProcessPoolScorer, create_process_pool
+from fedt.transport import create_server
+from fedt.traffic import RpcTraffic, TrafficServerInterceptor
+from fedt.tracing import Tracer, trace_file_path, SERVER_TRACE_PID
+from fedt.stats import CountingExecutor, LoopLagMonitor, rpc_stats_messages, rss_bytes
+from fedt.metrics import MetricsWriter, next_metrics_file_path
 from fedt import utils
 from fedt.utils import create_specific_result_folder
 from fedt import fedT_pb2
@@ -46,64 +51,141 @@ def add_end_time(runtime_clients, ID, end_time):
             break
     return runtime_clients
 
+def finished_runtimes(runtime_clients):
+    """Retorna (client_id, (início, fim)) apenas dos clientes que finalizaram o round."""
+    return [(client_id, times) for (client_id, times) in runtime_clients if isinstance(times, tuple)]
+
 def average_runtime(runtime_clients):
-    """Calcula o tempo médio de execução."""
-    runtime_list = [(end - start) for (_, (start, end)) in runtime_clients]
+    """Calcula o tempo médio de execução dos clientes que finalizaram o round."""
+    runtime_list = [(end - start) for (_, (start, end)) in finished_runtimes(runtime_clients)]
+    if not runtime_list:
+        return 0.0
     runtime_sum = sum(runtime_list)
-    runtime_average = runtime_sum / number_of_clients
+    runtime_average = runtime_sum / len(runtime_list)
     return runtime_average
 
+ROUND_POLICIES = ("all", "quorum", "deadline")
+LATE_UPLOAD_POLICIES = ("drop", "next_round")
+
 
 class FedT(fedT_pb2_grpc.FedTServicer):
-    def __init__(self, input_aggregation_strategy=imported_aggregation_strategy) -> None:
+    def __init__(self, input_aggregation_strategy=imported_aggregation_strategy, expected_clients=number_of_clients, results_name="server", log=logger) -> None:
         super().__init__()
 
+        # Os edges passam um logger próprio (EDGE <id>), com o mesmo nível do servidor.
+        self.logger = log
+
         self.aggregation_strategy = input_aggregation_strategy
 
-        base_file_name = f"{self.aggregation_strategy}_server"
-        self.results_folder = create_specific_result_folder(results_folder, self.aggregation_strategy, "server")
-        existing_files = [
-            file for file in os.listdir(self.results_folder)
-            if file.startswith(base_file_name) and file.endswith(".json")
-        ]
-        next_file_index = len(existing_files) + 1
-        result_file_name = f"{base_file_name}_{next_file_index}.json"
-        self.result_file_path = (self.results_folder / result_file_name).resolve()
+        base_file_name = f"{self.aggregation_strategy}_{results_name}"
+        self.results_folder = create_specific_result_folder(results_folder, self.aggregation_strategy, results_name)
+        self.result_file_path = next_metrics_file_path(self.results_folder, base_file_name)
+        self.metrics_writer = MetricsWriter(self.result_file_path)
+
+        self.logger.warning(f"Result path: {self.result_file_path}")
 
-        logger.warning(f"Result path: {self.result_file_path}")
+        # Spans das fases do round: linha 0 para o round, uma linha por cliente para as RPCs dele.
+        self.tracer = Tracer(trace_file_path(self.aggregation_strategy, self.result_file_path), results_name, SERVER_TRACE_PID)
 
         self.lock = asyncio.Lock()
+        # Sinalizado pelo upload que completa o quorum; o supervisor do round espera por ele.
+        self.quorum_reached = asyncio.Event()
         self.aggregation_done = asyncio.Event()
+        self.serialisation_lock = asyncio.Lock()
 
         self.round = 0
+        self.round_start_time = time.time()
+        self.first_upload_time = None
         self.aggregation_realised = 0 # 0 waiting, 1 aggregating, 2 done.
 
         self.clientes_conectados = []
-        self.clientes_esperados = number_of_clients
+        self.clientes_esperados = expected_clients
         self.clientes_respondidos = 0
         self.trees_warehouse = []
+
+        # Política de fechamento do round:
+        self.round_policy = server_config["round_policy"]
+        self.round_quorum = min(server_config["round_quorum"] or expected_clients, expected_clients)
+        self.round_deadline = server_config["round_deadline"]
+        self.late_uploads = server_config["late_uploads"]
+        if self.round_policy not in ROUND_POLICIES:
+            raise ValueError(f"round_policy inválida: {self.round_policy}. Opções: {ROUND_POLICIES}")
+        if self.late_uploads not in LATE_UPLOAD_POLICIES:
+            raise ValueError(f"late_uploads inválido: {self.late_uploads}. Opções: {LATE_UPLOAD_POLICIES}")
+
+        self.deadline_passed = False
+        self.participants = [] # clientes cujas árvores entraram na agregação do round
+        self.late_clients = [] # clientes que enviaram as árvores do round depois da agregação
+        self.carried_forests = [] # (client_ID, árvores) atrasadas que entram na agregação do round atual
+        self.pending_forests = [] # (client_ID, árvores) atrasadas guardadas para o próximo round
         self.runtime_clients = []
         self.aggregation_time = 0.0
+        self.quorum_time = None
+        self.quorum_to_aggregation_time = 0.0
+        # Modelo global serializado uma única vez por round e compartilhado entre os clientes:
+        # os hashes das árvores ficam aqui e os bytes no tree_store.
+        self.tree_store = TreeStore()
+        self.global_model_hashes = None
+        self.last_aggregated_hashes = ()
 
         self._supervisor_started = False
         self.shutdown_event = None
+        # Uma fila por cliente inscrito em subscribe_rounds.
+        self.round_subscribers = []
+        # Bytes, mensagens e duração das RPCs, por round e por cliente (preenchido pelo TrafficServerInterceptor).
+        self.traffic = RpcTraffic(lambda: self.round)
+        # Estado ao vivo para o get_server_stats (fedt stats).
+        self.start_time = time.time()
+        self.loop_lag = LoopLagMonitor()
+
+        # Os executors contam as tarefas pendentes para o get_server_stats.
+        self.executor = CountingExecutor(ThreadPoolExecutor(max_workers=number_of_jobs))
+        # No modo "process", a avaliação das árvores roda num pool de processos e o trees_warehouse
+        # guarda apenas os hashes: só as árvores selecionadas são desserializadas no servidor.
+        self.process_pool = None
+        self.scorer = None
+        if server_config["aggregation_executor"] == "process":
+            self.process_pool = CountingExecutor(create_process_pool(number_of_jobs))
+            self.scorer = ProcessPoolScorer(self.process_pool, self.tree_store)
 
-        self.executor = ThreadPoolExecutor(max_workers=number_of_jobs)
-
-        self.model = RandomForestRegressor(
-            n_estimators=self.get_number_of_trees_per_client(),
-            max_depth=3,
-            warm_start=True
-        )
         data_train, label_train = utils.load_dataset_for_server()
-        utils.set_initial_params(self.model, data_train, label_train)
+        self.model = ForestContainer(utils.build_initial_trees(
+            self.get_number_of_trees_per_client(),
+            data_train,
+            label_train,
+            max_depth=3
+        ))
 
         self.global_trees = self.model.estimators_
-        self.strategy = FedForest(self.model)
+        self.strategy = FedForest(self.model, scorer=self.scorer)
 
     def attach_shutdown_event(self, event):
         self.shutdown_event = event
 
+    def _round_event(self, kind):
+        return fedT_pb2.Round_Event(
+            kind=kind,
+            round=self.round,
+            trees_by_client=self.get_number_of_trees_per_client()
+        )
+
+    def _client_tid(self, client_ID):
+        """Linha do timeline com as RPCs de um cliente (a linha 0 fica com as fases do round)."""
+        if client_ID is None:
+            return 0
+        self.tracer.name_thread(client_ID + 1, f"client-id-{client_ID}")
+        return client_ID + 1
+
+    def _request_round(self, message):
+        """Round de uma mensagem do cliente; clientes anteriores ao campo `round` não o enviam e ficam no round corrente."""
+        return message.round if message.HasField("round") else self.round
+
+    def _publish_round_event(self, kind) -> None:
+        """Enviar um evento de round a todos os clientes inscritos em subscribe_rounds."""
+        event = self._round_event(kind)
+        for queue in self.round_subscribers:
+            queue.put_nowait(event)
+
     def get_number_of_trees_per_client(self, valor_alvo=900, ponto_de_convergencia=30):
         f, _ = utils.gerar_funcao_logaritmica(ponto_de_convergencia, valor_alvo)
         
@@ -113,7 +195,7 @@ class FedT(fedT_pb2_grpc.FedTServicer):
         number_of_trees_per_client = int(f(self.round)/self.clientes_esperados)
         return number_of_trees_per_client if number_of_trees_per_client > 1 else 2
 
-    def aggregate_strategy(self, best_forests: list[RandomForestRegressor], threshold=server_config["pearson_threshold"]):
+    def aggregate_strategy(self, best_forests: list[list], threshold=server_config["pearson_threshold"]):
         match self.aggregation_strategy:
             case 'random':
                 self.model.estimators_ = self.strategy.aggregate_fit_random_trees_strategy(best_forests)
@@ -126,73 +208,232 @@ class FedT(fedT_pb2_grpc.FedTServicer):
             case _:
                 self.model.estimators_ = self.strategy.aggregate_fit_random_trees_strategy(best_forests)
 
-    async def _supervisor_task(self):
-        while True:
-            await asyncio.sleep(0.2)
+        if self.scorer is not None:
+            # As estratégias devolveram os itens selecionados; hashes viram árvores só agora.
+            self.model.estimators_ = [
+                self.tree_store.get_tree(item) if isinstance(item, bytes) else item
+                for item in self.model.estimators_
+            ]
 
-            async with self.lock:
-                enough = ( len(self.trees_warehouse) >= self.clientes_esperados )
-                should_start = ( self.aggregation_realised == 0 and enough )
+    def _add_global_model_to_store(self):
+        trees = utils.get_model_parameters(self.model)
+        return tuple(self.tree_store.add_tree(tree) for tree in trees)
+
+    async def get_global_model_hashes(self):
+        """
+        ### Função:
+        Obter os hashes do modelo global do round atual, serializando as árvores apenas na primeira chamada.
+        Árvores que já estão no tree_store (vindas dos clientes) não são serializadas de novo.
+        ### Returns:
+        - Tupla imutável com os hashes das árvores do modelo global.
+        """
+        async with self.serialisation_lock:
+            if self.global_model_hashes is None:
+                loop = asyncio.get_running_loop()
+                self.global_model_hashes = await loop.run_in_executor(
+                    self.executor,
+                    self._add_global_model_to_store
+                )
+            return self.global_model_hashes
+
+    async def get_serialised_global_model(self):
+        """
+        ### Função:
+        Obter o modelo global serializado do round atual.
+        ### Returns:
+        - Lista com as árvores do modelo global em bytes.
+        """
+        hashes = await self.get_global_model_hashes()
+        return [self.tree_store.get_serialised(digest) for digest in hashes]
+
+    def _global_model_chunks(self, hashes, known_hashes):
+        """
+        ### Função:
+        Montar as mensagens em lotes do modelo global, enviando só o hash das árvores que o cliente já possui.
+        """
+        references = [digest for digest in hashes if digest in known_hashes]
+        missing_trees = [self.tree_store.get_serialised(digest) for digest in hashes if digest not in known_hashes]
+
+        chunks = list(utils.chunk_serialised_trees(missing_trees, server_config["chunk_size"])) or [[]]
+        yield fedT_pb2.Forest_Chunk_Server(serialised_trees=chunks[0], tree_hashes=references)
+        for chunk in chunks[1:]:
+            yield fedT_pb2.Forest_Chunk_Server(serialised_trees=chunk)
+
+    def _quorum_met(self) -> bool:
+        """Verifica, segundo a política do round, se a agregação já pode começar (chamado com o lock)."""
+        uploads = len(self.trees_warehouse)
+        if uploads >= self.clientes_esperados:
+            return True
+
+        match self.round_policy:
+            case "quorum":
+                return uploads >= self.round_quorum
+            case "deadline":
+                return self.deadline_passed and uploads >= self.round_quorum
+            case _:
+                return False
 
-                if should_start:
-                    self.aggregation_realised = 1
-                    break
+    def _check_quorum(self) -> None:
+        if not self.quorum_reached.is_set() and self._quorum_met():
+            self.quorum_time = time.time()
+            self.tracer.complete("wait_quorum", self.first_upload_time, self.quorum_time,
+                                 round=self.round, uploads=len(self.trees_warehouse))
+            self.quorum_reached.set()
 
-        logger.info(f"Supervisor iniciando agregação, round {self.round}")
+    async def _supervisor_task(self):
+        if self.round_policy == "deadline":
+            try:
+                await asyncio.wait_for(self.quorum_reached.wait(), self.round_deadline)
+            except asyncio.TimeoutError:
+                async with self.lock:
+                    self.deadline_passed = True
+                    self.tracer.instant("deadline_passed", round=self.round, uploads=len(self.trees_warehouse))
+                    self.logger.warning(f"Prazo do round {self.round} esgotado com {len(self.trees_warehouse)}/{self.clientes_esperados} clientes (mínimo {self.round_quorum}).")
+                    self._check_quorum()
+
+        await self.quorum_reached.wait()
+
+        async with self.lock:
+            if self.aggregation_realised != 0:
+                return
+            self.aggregation_realised = 1
+            self.participants = [client_ID for (client_ID, _) in self.trees_warehouse]
+            forests = [trees for (_, trees) in self.trees_warehouse]
+            # Árvores atrasadas de clientes que não enviaram um modelo mais novo neste round.
+            forests.extend(trees for (client_ID, trees) in self.carried_forests if client_ID not in self.participants)
 
-        forests = [trees for (_, trees) in self.trees_warehouse]
         start_time = time.time()
+        self.quorum_to_aggregation_time = start_time - self.quorum_time
+        self.logger.info(f"Supervisor iniciando agregação, round {self.round}")
+
+        loop = asyncio.get_running_loop()
 
         try:
-            loop = asyncio.get_running_loop()
-            await loop.run_in_executor(self.executor, self.aggregate_strategy, forests)
+            with self.tracer.span("aggregation", round=self.round, forests=len(forests), strategy=self.aggregation_strategy):
+                await loop.run_in_executor(self.executor, self.aggregate_strategy, forests)
+                await self._after_aggregation()
 
             self.aggregation_time = time.time() - start_time
-            logger.info(f"Agregação finalizada para o round {self.round}")
+            self.logger.info(f"Agregação finalizada para o round {self.round}")
         except Exception as error:
-            logger.critical(f"Erro na agregação: {error}")
+            self.logger.critical(f"Erro na agregação: {error}")
+
+        async with self.serialisation_lock:
+            with self.tracer.span("serialise_global_model", round=self.round):
+                self.global_model_hashes = await loop.run_in_executor(
+                    self.executor,
+                    self._add_global_model_to_store
+                )
+            self.last_aggregated_hashes = self.global_model_hashes
 
         async with self.lock:
             self.aggregation_realised = 2
             self.aggregation_done.set()
-
-
-    async def aggregate_trees(self, request_iterator, context):
-        client_serialised_trees = []
-        client_ID = None
-
-        logger.info(f"Recebendo as árvores dos clientes, Round: {self.round}, Árvores por Cliente: {self.get_number_of_trees_per_client()}")
-
-        async for request in request_iterator:
-            client_ID = request.client_ID
-            client_serialised_trees.append(request.serialised_tree)
-
+            self._publish_round_event(fedT_pb2.Round_Event.MODEL_READY)
+
+
+    def _add_client_trees_to_store(self, client_serialised_trees, client_tree_hashes, deserialise=True):
+        hashes = [self.tree_store.add_serialised(tree) for tree in client_serialised_trees]
+        hashes.extend(client_tree_hashes)
+        if not deserialise:
+            return hashes, list(hashes)
+        return hashes, self.tree_store.get_several_trees(hashes)
+
+    def _store_late_forest(self, client_ID, client_round, client_trees) -> None:
+        """
+        ### Função:
+        Tratar as árvores que chegaram depois da agregação do round do cliente (chamado com o lock):
+        descartá-las ou guardá-las para a próxima agregação, conforme `late_uploads`.
+        """
+        if client_round == self.round:
+            self.late_clients.append(client_ID)
+
+        if self.late_uploads == "drop":
+            self.logger.warning(f"O cliente {client_ID} enviou as árvores do round {client_round} atrasado. Árvores descartadas.")
+            return
+
+        if self.aggregation_realised == 0:
+            self.carried_forests.append((client_ID, client_trees))
+            self.logger.warning(f"O cliente {client_ID} enviou as árvores do round {client_round} atrasado. Árvores incluídas no round {self.round}.")
+        else:
+            self.pending_forests.append((client_ID, client_trees))
+            self.logger.warning(f"O cliente {client_ID} enviou as árvores do round {client_round} atrasado. Árvores incluídas no round {self.round + 1}.")
+
+    async def _store_client_trees(self, client_ID, client_round, client_serialised_trees, client_tree_hashes=()):
+        """
+        ### Função:
+        Desserializar as árvores enviadas por um cliente e guardá-las no trees_warehouse,
+        iniciando o supervisor da agregação se necessário.
+        Árvores enviadas apenas pelo hash já estão no tree_store e não são desserializadas de novo.
+        Uploads de rounds anteriores, ou que chegam depois do início da agregação, são tratados como atrasados.
+        ### Returns:
+        - Hashes de todas as árvores do cliente.
+        """
         loop = asyncio.get_running_loop()
-        client_trees = await loop.run_in_executor(
-            self.executor,
-            utils.deserialise_several_trees,
-            client_serialised_trees
-        )
+        with self.tracer.span("store_trees", self._client_tid(client_ID), round=client_round, trees=len(client_serialised_trees)):
+            hashes, client_trees = await loop.run_in_executor(
+                self.executor,
+                self._add_client_trees_to_store,
+                client_serialised_trees,
+                client_tree_hashes,
+                self.scorer is None
+            )
         
         async with self.lock:
+            if client_round < self.round or self.aggregation_realised != 0:
+                self._store_late_forest(client_ID, client_round, client_trees)
+                return hashes
+
             if client_ID not in self.clientes_conectados:
                 self.clientes_conectados.append(client_ID)
+            if not self.trees_warehouse:
+                self.first_upload_time = time.time()
             self.trees_warehouse.append((client_ID, client_trees))
 
-            logger.debug(f"O cliente {client_ID} enviou {len(client_trees)} árvores.")
-            logger.info(f"Clientes conectados {len(self.clientes_conectados)}/{self.clientes_esperados}")
+            self.logger.debug(f"O cliente {client_ID} enviou {len(client_serialised_trees)} árvores e {len(client_tree_hashes)} hashes.")
+            self.logger.info(f"Clientes conectados {len(self.clientes_conectados)}/{self.clientes_esperados}")
 
             if not self._supervisor_started:
                 self._supervisor_started = True
                 asyncio.create_task(self._supervisor_task())
 
-        await self.aggregation_done.wait()
+            self._check_quorum()
 
-        serialised_global_trees = await loop.run_in_executor(
-            self.executor, 
-            utils.serialise_several_trees, 
-            self.model.estimators_
-        )
+        return hashes
+
+    async def _wait_for_global_model(self, client_round, client_ID=None):
+        """
+        ### Função:
+        Esperar a agregação do round atual (uploads de rounds anteriores não esperam).
+        ### Returns:
+        - Hashes do último modelo global agregado.
+        """
+        if client_round >= self.round and not self.aggregation_done.is_set():
+            with self.tracer.span("wait_aggregation", self._client_tid(client_ID), round=client_round):
+                await self.aggregation_done.wait()
+        return self.last_aggregated_hashes
+
+    async def aggregate_trees(self, request_iterator, context):
+        client_serialised_trees = []
+        client_ID = None
+        client_round = self.round
+
+        self.logger.info(f"Recebendo as árvores dos clientes, Round: {self.round}, Árvores por Cliente: {self.get_number_of_trees_per_client()}")
+
+        receive_start_time = time.time()
+        async for request in request_iterator:
+            client_ID = request.client_ID
+            client_round = self._request_round(request)
+            client_serialised_trees.append(request.serialised_tree)
+        self.tracer.complete("receive_upload", receive_start_time, time.time(), self._client_tid(client_ID),
+                             round=client_round, trees=len(client_serialised_trees))
+        self._record_start_time(client_ID, client_round, receive_start_time)
+
+        await self._store_client_trees(client_ID, client_round, client_serialised_trees)
+
+        global_model_hashes = await self._wait_for_global_model(client_round, client_ID)
+
+        serialised_global_trees = [self.tree_store.get_serialised(digest) for digest in global_model_hashes]
         number_of_trees = len(serialised_global_trees)
         number_of_sended_trees = 0
 
@@ -200,107 +441,293 @@ class FedT(fedT_pb2_grpc.FedTServicer):
         for tree in serialised_global_trees:
             number_of_sended_trees += 1
             if number_of_sended_trees % server_config["print_every_trees_sent"] == 0:
-                logger.info(f"Client ID: {client_ID}. Àrvore {number_of_sended_trees} de {number_of_trees} enviada.")
+                self.logger.info(f"Client ID: {client_ID}. Àrvore {number_of_sended_trees} de {number_of_trees} enviada.")
             server_reply.serialised_tree = tree
             yield server_reply
 
+    def _record_start_time(self, client_ID, client_round, start_time) -> None:
+        """
+        Início do cliente no round pelo upload, quando ele não pediu o modelo do servidor
+        (os edges só enviam as árvores): sem isso o avg_execution_time do round fica zerado.
+        """
+        if client_round == self.round and all(entry[0] != client_ID for entry in self.runtime_clients):
+            self.runtime_clients.append([client_ID, start_time])
+
+    async def _receive_client_chunks(self, request_iterator, context):
+        """
+        ### Função:
+        Receber o upload em lotes de um cliente, recusando hashes de árvores que o servidor não possui.
+        ### Returns:
+        - client_ID, round do upload, árvores em bytes, hashes das árvores e hashes conhecidos pelo cliente.
+        """
+        client_serialised_trees = []
+        client_tree_hashes = []
+        known_hashes = set()
+        client_ID = None
+        client_round = self.round
+
+        self.logger.info(f"Recebendo as árvores dos clientes em lotes, Round: {self.round}, Árvores por Cliente: {self.get_number_of_trees_per_client()}")
+
+        receive_start_time = time.time()
+        async for request in request_iterator:
+            client_ID = request.client_ID
+            client_round = self._request_round(request)
+            client_serialised_trees.extend(request.serialised_trees)
+            client_tree_hashes.extend(request.tree_hashes)
+            known_hashes.update(request.known_hashes)
+        self.tracer.complete("receive_upload", receive_start_time, time.time(), self._client_tid(client_ID),
+                             round=client_round, trees=len(client_serialised_trees), hashes=len(client_tree_hashes))
+        self._record_start_time(client_ID, client_round, receive_start_time)
+
+        unknown_hashes = [digest for digest in client_tree_hashes if digest not in self.tree_store]
+        if unknown_hashes:
+            self.logger.error(f"Client ID: {client_ID}. {len(unknown_hashes)} hashes desconhecidos.")
+            await context.abort(grpc.StatusCode.FAILED_PRECONDITION, "Árvores referenciadas por hash não estão no servidor.")
+
+        return client_ID, client_round, client_serialised_trees, client_tree_hashes, known_hashes
+
+    async def aggregate_trees_packed(self, request_iterator, context):
+        client_ID, client_round, client_serialised_trees, client_tree_hashes, known_hashes = await self._receive_client_chunks(
+            request_iterator, context
+        )
+
+        client_hashes = await self._store_client_trees(client_ID, client_round, client_serialised_trees, client_tree_hashes)
+        known_hashes.update(client_hashes)
+
+        global_model_hashes = await self._wait_for_global_model(client_round, client_ID)
+        self.logger.info(f"Client ID: {client_ID}. Enviando {len(global_model_hashes)} árvores em lotes.")
+
+        with self.tracer.span("send_global_model", self._client_tid(client_ID), round=client_round):
+            for message in self._global_model_chunks(global_model_hashes, known_hashes):
+                yield message
+
+    async def upload_trees(self, request_iterator, context):
+        """
+        ### Função:
+        Guardar as árvores do cliente e confirmar na hora, sem esperar a agregação:
+        o modelo global é baixado depois com fetch_global_model.
+        """
+        client_ID, client_round, client_serialised_trees, client_tree_hashes, _ = await self._receive_client_chunks(
+            request_iterator, context
+        )
+        await self._store_client_trees(client_ID, client_round, client_serialised_trees, client_tree_hashes)
+        return fedT_pb2.Upload_Ack(
+            round=client_round,
+            number_of_trees=len(client_serialised_trees) + len(client_tree_hashes)
+        )
+
+    async def fetch_global_model(self, request, context):
+        """
+        ### Função:
+        Long-poll do modelo global do round do cliente: responde quando a agregação do round terminar.
+        Pode ser repetido sem reenviar as árvores.
+        """
+        client_round = self._request_round(request)
+        global_model_hashes = await self._wait_for_global_model(client_round, request.client_ID)
+        self.logger.info(f"Client ID: {request.client_ID}. Enviando {len(global_model_hashes)} árvores do round {client_round} em lotes.")
+
+        with self.tracer.span("send_global_model", self._client_tid(request.client_ID), round=client_round):
+            for message in self._global_model_chunks(global_model_hashes, set(request.known_hashes)):
+                yield message
+
     async def get_server_model(self, request, context):
         start_time = time.time()
 
         self.runtime_clients.append([request.client_ID, start_time])
-        logger.info(f"Client ID: {request.client_ID}, requisitando o modelo do servidor.")
+        self.logger.info(f"Client ID: {request.client_ID}, requisitando o modelo do servidor.")
         
-        loop = asyncio.get_running_loop()
-        trees = utils.get_model_parameters(self.model)
-        serialised_trees = await loop.run_in_executor(
-            self.executor, 
-            utils.serialise_several_trees, 
-            trees
-        )
+        serialised_trees = await self.get_serialised_global_model()
         
         server_message = fedT_pb2.Forest_Server()
-        for serialise_tree in serialised_trees:
-            server_message.serialised_tree = serialise_tree
-            yield server_message
+        with self.tracer.span("send_model", self._client_tid(request.client_ID), round=self.round):
+            for serialise_tree in serialised_trees:
+                server_message.serialised_tree = serialise_tree
+                yield server_message
+
+    async def get_server_model_packed(self, request, context):
+        start_time = time.time()
+
+        self.runtime_clients.append([request.client_ID, start_time])
+        self.logger.info(f"Client ID: {request.client_ID}, requisitando o modelo do servidor em lotes.")
+
+        global_model_hashes = await self.get_global_model_hashes()
+
+        with self.tracer.span("send_model", self._client_tid(request.client_ID), round=self.round):
+            for message in self._global_model_chunks(global_model_hashes, set(request.known_hashes)):
+                yield message
 
     async def get_server_settings(self, request, context):
-        logger.debug(f"Client ID: {request.client_ID}, solicitando as configurações.")
+        self.logger.debug(f"Client ID: {request.client_ID}, solicitando as configurações.")
         return fedT_pb2.Server_Settings(
             trees_by_client=self.get_number_of_trees_per_client(), 
-            current_round=self.round
+            current_round=self.round,
+            chunk_size=server_config["chunk_size"],
+            tree_dedup=True,
+            upload_ack=True
+        )
+
+    async def subscribe_rounds(self, request, context):
+        """
+        ### Função:
+        Manter o cliente informado do início dos rounds, do modelo global pronto e do fim do treinamento,
+        no lugar do polling de get_server_settings.
+        """
+        self.logger.debug(f"Client ID: {request.client_ID}, inscrito nos eventos de round.")
+        queue = asyncio.Queue()
+        self.round_subscribers.append(queue)
+        try:
+            # Estado atual primeiro: o cliente não depende de eventos anteriores à inscrição.
+            if self.round >= number_of_rounds:
+                yield self._round_event(fedT_pb2.Round_Event.TRAINING_FINISHED)
+                return
+            yield self._round_event(fedT_pb2.Round_Event.ROUND_STARTED)
+            if self.aggregation_realised == 2:
+                yield self._round_event(fedT_pb2.Round_Event.MODEL_READY)
+
+            while True:
+                event = await queue.get()
+                yield event
+                if event.kind == fedT_pb2.Round_Event.TRAINING_FINISHED:
+                    return
+        finally:
+            self.round_subscribers.remove(queue)
+
+    def _server_stats(self):
+        """
+        ### Função:
+        Montar o retrato atual do servidor: clientes, trees_warehouse, filas, event loop, memória e RPCs.
+        """
+        rpc_stats, bytes_received, bytes_sent = rpc_stats_messages(self.traffic)
+        return fedT_pb2.Server_Stats(
+            round=self.round,
+            expected_clients=self.clientes_esperados,
+            connected_clients=len(self.clientes_conectados),
+            responded_clients=self.clientes_respondidos,
+            forests_in_warehouse=len(self.trees_warehouse),
+            trees_in_warehouse=sum(len(trees) for (_, trees) in self.trees_warehouse),
+            aggregation_state=self.aggregation_realised,
+            bytes_received=bytes_received,
+            bytes_sent=bytes_sent,
+            executor_queue_depth=self.executor.pending,
+            process_pool_queue_depth=self.process_pool.pending if self.process_pool is not None else 0,
+            event_loop_lag=self.loop_lag.lag,
+            max_event_loop_lag=self.loop_lag.max_lag,
+            rss_bytes=rss_bytes(),
+            uptime=time.time() - self.start_time,
+            round_subscribers=len(self.round_subscribers),
+            rpc_stats=rpc_stats,
+            rpc_accounting=transport_config["rpc_accounting"]
         )
 
+    async def get_server_stats(self, request, context):
+        return self._server_stats()
+
     async def end_of_transmission(self, request, context):
         end_time = time.time()
         async with self.lock:
+            client_round = self._request_round(request)
+            if client_round != self.round or request.client_ID not in self.participants:
+                self.logger.info(f"O cliente {request.client_ID} finalizou o round {client_round} fora do quorum do round {self.round}.")
+                return fedT_pb2.OK(ok=1)
+
             self.runtime_clients = add_end_time(
                 self.runtime_clients, 
                 request.client_ID, 
                 end_time
             )
             self.clientes_respondidos += 1
-            logger.info(f"O cliente {request.client_ID} finalizou round. Clientes respondidos: {self.clientes_respondidos}/{number_of_clients}")
-
-            if self.clientes_respondidos == number_of_clients:
-                logger.info("Todos os clientes finalizaram.")
-
-                for i in self.runtime_clients:
-                    logger.debug(f"Client ID: {i[0]} → tempo de execução: {utils.format_time(i[1][1] - i[1][0])}")
-
-                logger.info(f"Tempo de Execução Médio: {utils.format_time(average_runtime(self.runtime_clients))}")
+            self.logger.info(f"O cliente {request.client_ID} finalizou round. Clientes respondidos: {self.clientes_respondidos}/{len(self.participants)}")
 
-                self.metrics = {
-                    "trees_by_client": self.get_number_of_trees_per_client(),
-                    "aggregation_time": self.aggregation_time,
-                    "avg_execution_time": average_runtime(self.runtime_clients)
-                }
+            if self.clientes_respondidos == len(self.participants):
+                self.logger.info("Todos os clientes do quorum finalizaram.")
 
+                for i in finished_runtimes(self.runtime_clients):
+                    self.logger.debug(f"Client ID: {i[0]} → tempo de execução: {utils.format_time(i[1][1] - i[1][0])}")
 
-                if self.result_file_path.exists():
-                    with open(self.result_file_path, "r", encoding="utf-8") as file:
-                        data = json.load(file)
-                else:
-                    data = {}
+                self.logger.info(f"Tempo de Execução Médio: {utils.format_time(average_runtime(self.runtime_clients))}")
 
-                data[self.round] = self.metrics
+                self.metrics = self._round_metrics()
+                self.metrics_writer.write(self.round, self.metrics)
 
-                with open(self.result_file_path, "w", encoding="utf-8") as f:
-                    json.dump(data, f, indent=4, ensure_ascii=False)
+                with self.tracer.span("reset", round=self.round):
+                    await self._reset_server_async()
+                # Guarda só as árvores da última agregação, que os clientes podem reenviar pelo hash,
+                # e as das florestas atrasadas que entram no próximo round (no modo "process" elas são hashes).
+                self.tree_store.retain(self._hashes_to_retain())
+                self.global_model_hashes = None
 
-                await self._reset_server_async()
-
-                logger.warning(f"Round {self.round} finalizado")
-                self.round += 1
+                self.logger.warning(f"Round {self.round} finalizado")
+                await self._after_round(self.round)
+                self.tracer.complete("round", self.round_start_time, time.time(), round=self.round,
+                                     participants=len(self.participants))
+                self.round = self._next_round()
+                self.round_start_time = time.time()
 
                 if self.round >= number_of_rounds:
-                    logger.warning(f"Encerrando treinamento em 5 segundos...")
+                    self.logger.warning(f"Encerrando treinamento em 5 segundos...")
+                    self._publish_round_event(fedT_pb2.Round_Event.TRAINING_FINISHED)
                     self.shutdown_event.set()
                     return fedT_pb2.OK(ok=1)
                 else: 
                     self.aggregation_realised = 0
+                    self.quorum_reached = asyncio.Event()
                     self.aggregation_done = asyncio.Event()
                     self._supervisor_started = False
 
-                    logger.warning(f"Round {self.round} iniciado")
+                    self.logger.warning(f"Round {self.round} iniciado")
+                    self._publish_round_event(fedT_pb2.Round_Event.ROUND_STARTED)
 
         return fedT_pb2.OK(ok=1)
 
+    def _round_metrics(self):
+        """Métricas do round que está fechando (chamado com o lock)."""
+        return {
+            "trees_by_client": self.get_number_of_trees_per_client(),
+            "aggregation_time": self.aggregation_time,
+            "quorum_to_aggregation_time": self.quorum_to_aggregation_time,
+            "avg_execution_time": average_runtime(self.runtime_clients),
+            "round_policy": self.round_policy,
+            "participants": sorted(self.participants),
+            "late_clients": sorted(set(self.late_clients)),
+            "carried_clients": sorted({client_ID for (client_ID, _) in self.carried_forests} - set(self.participants)),
+            "rpc_traffic": self.traffic.take(self.round)
+        }
+
+    async def _after_aggregation(self) -> None:
+        """Executado depois da agregação local e antes de publicar o modelo global (usado pelo EdgeFedT)."""
+
+    async def _after_round(self, closed_round) -> None:
+        """Executado quando todos os clientes do quorum finalizaram o round (usado pelo EdgeFedT)."""
+
+    def _next_round(self):
+        """Round seguinte ao que fechou (o EdgeFedT pula para o round do root se ele estiver adiantado)."""
+        return self.round + 1
+
+    def _hashes_to_retain(self):
+        hashes = list(self.last_aggregated_hashes)
+        for (_, forest) in self.carried_forests:
+            hashes.extend(item for item in forest if isinstance(item, bytes))
+        return hashes
+
     async def _reset_server_async(self):
         loop = asyncio.get_running_loop()
         await loop.run_in_executor(self.executor, self._reset_server_sync)
 
     def _reset_server_sync(self):
-        logger.warning("Resetando estado do servidor...")
+        self.logger.warning("Resetando estado do servidor...")
         
         del self.model, self.global_trees, self.strategy
         gc.collect()
 
-        self.model = RandomForestRegressor(n_estimators=self.get_number_of_trees_per_client())
         data_train, label_train = utils.load_dataset_for_server()
-        utils.set_initial_params(self.model, data_train, label_train)
+        self.model = ForestContainer(utils.build_initial_trees(
+            self.get_number_of_trees_per_client(),
+            data_train,
+            label_train
+        ))
 
         self.global_trees = self.model.estimators_
-        self.strategy = FedForest(self.model)
+        self.strategy = FedForest(self.model, scorer=self.scorer)
 
         self.clientes_conectados = []
         self.clientes_respondidos = 0
@@ -308,32 +735,208 @@ class FedT(fedT_pb2_grpc.FedTServicer):
         self.aggregation_realised = 0
         self.runtime_clients = []
         self.aggregation_time = 0.0
+        self.quorum_time = None
+        self.quorum_to_aggregation_time = 0.0
+        self.first_upload_time = None
+
+        self.deadline_passed = False
+        self.participants = []
+        self.late_clients = []
+        self.carried_forests = self.pending_forests
+        self.pending_forests = []
+
+
+class AsyncFedT(FedT):
+    """
+    Modo assíncrono: não há barreira de round. Cada upload é incorporado ao modelo global assim
+    que chega e os clientes baixam a versão mais recente quando estiverem prontos.
+    As árvores recebidas são avaliadas com o scoring do FedForest (MAE na validação do servidor);
+    o erro é penalizado pelo atraso (versões do modelo global desde o download do cliente) e
+    a floresta global mantém as `async_max_trees` árvores com menor erro.
+    """
+
+    def __init__(self, input_aggregation_strategy=imported_aggregation_strategy, expected_clients=number_of_clients, results_name="server") -> None:
+        super().__init__(input_aggregation_strategy, expected_clients, results_name)
+
+        self.model_version = 0
+        # Sem rounds no servidor, o tráfego é contado por versão do modelo global.
+        self.traffic.current_round = lambda: self.model_version
+        self.max_trees = server_config["async_max_trees"]
+        self.staleness_penalty = server_config["async_staleness_penalty"]
+
+        X_valid, y_valid = utils.load_server_side_validation_data()
+        self.tree_errors = self.strategy.score_forests([self.model.estimators_], X_valid, y_valid)[0].absolute_error
+
+        self.logger.warning(f"Modo assíncrono: floresta global com até {self.max_trees} árvores, a estratégia {self.aggregation_strategy} não é usada.")
+
+    def _merge_client_trees(self, client_serialised_trees, client_tree_hashes, staleness):
+        """
+        ### Função:
+        Incorporar as árvores de um cliente ao modelo global, mantendo as árvores com menor erro.
+        ### Args:
+        - client_serialised_trees: Árvores do cliente em bytes.
+        - client_tree_hashes: Hashes das árvores que o servidor já possui.
+        - staleness: Número de versões do modelo global desde o download do cliente.
+        ### Returns:
+        - Número de árvores do cliente que entraram no modelo global e os hashes do novo modelo.
+        """
+        client_hashes, client_trees = self._add_client_trees_to_store(client_serialised_trees, client_tree_hashes)
+
+        # Árvores do modelo global que o cliente adotou e reenviou não entram de novo.
+        global_model_hashes = self._add_global_model_to_store()
+        known_hashes = set(global_model_hashes)
+        client_trees = [tree for digest, tree in zip(client_hashes, client_trees) if digest not in known_hashes]
+        if not client_trees:
+            return 0, global_model_hashes
+
+        global_trees = self.model.estimators_
+
+        X_valid, y_valid = utils.load_server_side_validation_data()
+        client_errors = self.strategy.score_forests([client_trees], X_valid, y_valid)[0].absolute_error
+        client_errors = client_errors * (1.0 + self.staleness_penalty * staleness)
+
+        trees = list(global_trees) + client_trees
+        errors = np.concatenate([self.tree_errors, client_errors])
+
+        # Mantém a ordem original das árvores selecionadas.
+        selected = np.sort(np.argsort(errors, kind="stable")[:self.max_trees])
+        self.model.estimators_ = [trees[index] for index in selected]
+        self.tree_errors = errors[selected]
+
+        hashes = self._add_global_model_to_store()
+        # Só as árvores do modelo global continuam no tree_store.
+        self.tree_store.retain(hashes)
+        return int(np.count_nonzero(selected >= len(global_trees))), hashes
+
+    async def _store_client_trees(self, client_ID, client_round, client_serialised_trees, client_tree_hashes=()):
+        """
+        ### Função:
+        Incorporar o upload do cliente ao modelo global e publicar a nova versão.
+        No modo assíncrono, o campo `round` do upload é a versão do modelo global baixada pelo cliente.
+        ### Returns:
+        - Lista vazia: sem deduplicação, a resposta leva o modelo global completo.
+        """
+        loop = asyncio.get_running_loop()
+        start_time = time.time()
 
+        async with self.serialisation_lock:
+            staleness = max(0, self.model_version - client_round)
+            with self.tracer.span("merge", self._client_tid(client_ID), version=self.model_version + 1, staleness=staleness):
+                trees_accepted, hashes = await loop.run_in_executor(
+                    self.executor,
+                    self._merge_client_trees,
+                    client_serialised_trees,
+                    client_tree_hashes,
+                    staleness
+                )
+            self.global_model_hashes = hashes
+            self.last_aggregated_hashes = hashes
+            self.model_version += 1
+            self.round = self.model_version // self.clientes_esperados
+            model_version = self.model_version
+            self._publish_round_event(fedT_pb2.Round_Event.MODEL_READY)
+
+        merge_time = time.time() - start_time
+        number_of_trees = len(client_serialised_trees) + len(client_tree_hashes)
+        self.logger.info(f"Versão {model_version}: cliente {client_ID} (atraso {staleness}) teve {trees_accepted}/{number_of_trees} árvores aceitas. Modelo global com {len(hashes)} árvores.")
+
+        self.save_metrics(model_version, {
+            "client_ID": client_ID,
+            "base_version": client_round,
+            "staleness": staleness,
+            "trees_received": number_of_trees,
+            "trees_accepted": trees_accepted,
+            "global_trees": len(hashes),
+            "global_mean_tree_absolute_error": float(np.mean(self.tree_errors)),
+            "merge_time": merge_time,
+            # Tráfego de todos os clientes desde a versão anterior do modelo global.
+            "rpc_traffic": self.traffic.take(model_version - 1)
+        })
+        return []
+
+    async def _wait_for_global_model(self, client_round, client_ID=None):
+        return self.last_aggregated_hashes
+
+    def _request_round(self, message):
+        # Aqui o round do cliente é a versão do modelo global em que ele se baseou.
+        return message.round if message.HasField("round") else self.model_version
+
+    def save_metrics(self, key, metrics) -> None:
+        self.metrics_writer.write(key, metrics)
 
-async def run_server(input_aggregation_strategy=None):
-    logger.info("Servidor inicializando...")
+    async def get_server_settings(self, request, context):
+        self.logger.debug(f"Client ID: {request.client_ID}, solicitando as configurações.")
+        return fedT_pb2.Server_Settings(
+            trees_by_client=self.get_number_of_trees_per_client(),
+            current_round=self.round,
+            chunk_size=server_config["chunk_size"],
+            # O tree_store só guarda o modelo global atual, que muda a cada upload.
+            tree_dedup=False,
+            asynchronous=True,
+            model_version=self.model_version,
+            upload_ack=True
+        )
+
+    def _server_stats(self):
+        stats = super()._server_stats()
+        stats.model_version = self.model_version
+        stats.asynchronous = True
+        return stats
+
+    async def end_of_transmission(self, request, context):
+        async with self.lock:
+            self.clientes_respondidos += 1
+            self.logger.info(f"O cliente {request.client_ID} finalizou uma atualização. Atualizações: {self.clientes_respondidos}/{self.clientes_esperados * number_of_rounds}")
+
+            if self.clientes_respondidos >= self.clientes_esperados * number_of_rounds:
+                self.logger.warning(f"Todas as atualizações recebidas. Encerrando treinamento em 5 segundos...")
+                self._publish_round_event(fedT_pb2.Round_Event.TRAINING_FINISHED)
+                self.shutdown_event.set()
+
+        return fedT_pb2.OK(ok=1)
 
-    server = grpc_aio.server()
-    servicer = FedT(input_aggregation_strategy)
+
+async def serve(servicer: FedT, address):
+    """
+    ### Função:
+    Servir o FedTServicer no endereço até o fim do treinamento.
+    """
+    interceptors = [TrafficServerInterceptor(servicer.traffic)] if transport_config["rpc_accounting"] else None
+    server = create_server(interceptors=interceptors)
 
     shutdown_event = asyncio.Event()
     servicer.attach_shutdown_event(shutdown_event)
 
     fedT_pb2_grpc.add_FedTServicer_to_server(servicer, server)
 
-    server.add_insecure_port(f"{server_config['IP']}:{server_config['port']}")
+    server.add_insecure_port(address)
     
     await server.start()
-    logger.info(f"Servidor ativo - {server_config['IP']}:{server_config['port']}")
+    servicer.loop_lag.start()
+    servicer.logger.info(f"Servidor ativo - {address}")
 
     await shutdown_event.wait()
-    logger.warning("Shutdown event recebido, desligando o servidor...")
+    servicer.logger.warning("Shutdown event recebido, desligando o servidor...")
 
     await server.stop(grace=10)
     await server.wait_for_termination()
 
+    await servicer.loop_lag.close()
+    await servicer.metrics_writer.close()
+    await servicer.tracer.close()
     servicer.executor.shutdown(wait=True)
-    logger.warning("Servidor encerrado.")
+    if servicer.process_pool is not None:
+        servicer.process_pool.shutdown(wait=True)
+    servicer.logger.warning("Servidor encerrado.")
+
+
+async def run_server(input_aggregation_strategy=None, expected_clients=number_of_clients, address=None):
+    logger.info("Servidor inicializando...")
+
+    server_class = AsyncFedT if server_config["mode"] == "async" else FedT
+    servicer = server_class(input_aggregation_strategy, expected_clients)
+
+    await serve(servicer, address or f"{server_config['IP']}:{server_config['port']}")
 
 
 if __name__ == "__main__":
@@ -16,24 +16,36 @@ logs_folder = (base_path / config["paths"]["logs_folder"]).resolve()
 scripts_folder = (base_path / config["paths"]["scripts_path"]).resolve()
 client_script_path = (base_path / config["paths"]["client_script_path"]).resolve()
 dataset_path = (base_path / config["paths"]["dataset_path"]).resolve()
+prepared_dataset_path = (base_path / config["paths"]["prepared_dataset_path"]).resolve()
 
 number_of_jobs = config["settings"]["number_of_jobs"]
 number_of_clients = config["settings"]["number_of_clients"]
 number_of_rounds = config["settings"]["number_of_rounds"]
 imported_aggregation_strategy = config["settings"]["aggregation_strategy"]
+tree_compression_level = config["settings"]["tree_compression_level"]
 
 number_of_simulations = config["settings"]["sequence"]["number_of_simulations"]
 aggregation_strategies = config["settings"]["sequence"]["aggregation_strategies"]
 
 client_timeout = config["settings"]["client"]["timeout"]
+client_fetch_timeout = config["settings"]["client"]["fetch_timeout"]
 client_debug = config["settings"]["client"]["debug"]
+client_shared_memory = config["settings"]["client"]["shared_memory"]
+
+simulation_config = config["settings"]["simulation"]
 
 server_config = config["settings"]["server"]
 server_ip = config["settings"]["server"]["IP"]
 server_port = config["settings"]["server"]["port"]
 validate_dataset_size = config["settings"]["server"]["validate_dataset_size"]
 
+edge_config = config["settings"]["edge"]
+transport_config = config["settings"]["transport"]
+metrics_config = config["settings"]["metrics"]
+tracing_config = config["settings"]["tracing"]
+
 train_test_split_size = config["dataset"]["train_test_split_size"]
 percentage_value_of_samples_per_client = config["dataset"]["percentage_value_of_samples_per_client"]
+dataset_seed = config["dataset"]["seed"]
 
 network_interface = config["scripts"]["network_interface"]
\ No newline at end of file
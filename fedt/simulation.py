@@ -0,0 +1,87 @@
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Process, get_context
+
+from fedt.settings import (
+    number_of_clients, imported_aggregation_strategy,
+    server_ip, server_port, simulation_config
+)
+from fedt import client
+from fedt import utils
+from fedt.dataset import SharedDataset, load_dataset_arrays
+from fedt.server import run_server
+
+logger = utils.setup_logger(
+    name="SIMULATION",
+    log_file="fedt_simulation.log"
+)
+
+
+async def simulate_clients(number_of_clients=number_of_clients, aggregation_strategy=imported_aggregation_strategy,
+                           server_address=f"{server_ip}:{server_port}", fit_workers=simulation_config["fit_workers"],
+                           launch_interval=simulation_config["launch_interval"]):
+    """
+    ### Função:
+    Rodar vários clientes como tarefas asyncio num único processo.
+    O dataset é carregado uma vez em memória compartilhada e o treino das florestas locais,
+    que é CPU-bound, vai para um pool de processos.
+    ### Args:
+    - number_of_clients: Número de clientes simulados.
+    - aggregation_strategy: Estratégia usada no servidor.
+    - server_address: Endereço do servidor (host:porta).
+    - fit_workers: Processos do pool de treino (0 = um por CPU).
+    - launch_interval: Segundos entre o início de dois clientes.
+    """
+    shared_dataset = SharedDataset.create(*load_dataset_arrays())
+    # spawn: o processo principal já tem canais gRPC abertos, que não sobrevivem a um fork.
+    fit_executor = ProcessPoolExecutor(max_workers=fit_workers or None, mp_context=get_context("spawn"))
+
+    try:
+        tasks = []
+        for client_ID in range(number_of_clients):
+            tasks.append(asyncio.create_task(
+                client.run(client_ID, aggregation_strategy, server_address, shared_dataset.name, fit_executor)
+            ))
+            await asyncio.sleep(launch_interval)
+        logger.info(f"{number_of_clients} clientes iniciados.")
+
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        for client_ID, result in enumerate(results):
+            if isinstance(result, Exception):
+                logger.error(f"Cliente {client_ID} terminou com erro: {result!r}")
+    finally:
+        fit_executor.shutdown(wait=True)
+        client.executor.shutdown(wait=True)
+        shared_dataset.close()
+
+
+def _run_simulated_server(aggregation_strategy, expected_clients):
+    asyncio.run(run_server(aggregation_strategy, expected_clients))
+
+
+def simulate(clients=number_of_clients, strategy=imported_aggregation_strategy,
+             fit_workers=simulation_config["fit_workers"], launch_interval=simulation_config["launch_interval"],
+             server=True):
+    """
+    ### Função:
+    Rodar a simulação completa: o servidor num processo e todos os clientes em outro.
+    ### Args:
+    - clients: Número de clientes simulados.
+    - strategy: Estratégia de agregação.
+    - fit_workers: Processos do pool de treino dos clientes (0 = um por CPU).
+    - launch_interval: Segundos entre o início de dois clientes.
+    - server: Se False, os clientes se conectam a um servidor já em execução.
+    """
+    start_time = time.time()
+    server_proc = None
+    if server:
+        server_proc = Process(target=_run_simulated_server, args=(strategy, clients))
+        server_proc.start()
+        time.sleep(3)
+
+    asyncio.run(simulate_clients(clients, strategy, fit_workers=fit_workers, launch_interval=launch_interval))
+
+    if server_proc is not None:
+        server_proc.join()
+    logger.info(f"Simulação com {clients} clientes finalizada em {utils.format_time(time.time() - start_time)}.")
@@ -0,0 +1,180 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor
+
+import psutil
+
+from fedt.settings import server_config
+from fedt.traffic import LATENCY_BOUNDS, RpcTraffic
+from fedt.transport import create_channel
+from fedt import fedT_pb2
+from fedt import fedT_pb2_grpc
+
+_process = psutil.Process()
+
+
+class LoopLagMonitor():
+    """
+    Mede o atraso do event loop: uma tarefa dorme `interval` segundos e o excesso sobre o
+    esperado é o tempo em que o loop ficou ocupado (callbacks longos, código síncrono nas RPCs).
+    """
+
+    def __init__(self, interval=0.25) -> None:
+        self.interval = interval
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self._task = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.lag = max(loop.time() - start - self.interval, 0.0)
+            self.max_lag = max(self.max_lag, self.lag)
+
+
+class CountingExecutor(Executor):
+    """
+    Repassa as tarefas a outro executor (pool de threads ou de processos) e conta as pendentes,
+    submetidas e ainda não concluídas (na fila ou rodando): é a profundidade de fila do get_server_stats.
+    Serve tanto para o loop.run_in_executor quanto para chamadas diretas ao submit.
+    """
+
+    def __init__(self, executor: Executor) -> None:
+        self.executor = executor
+        self.pending = 0
+        # O submit e os callbacks de conclusão acontecem em threads diferentes.
+        self._lock = threading.Lock()
+
+    def submit(self, fn, /, *args, **kwargs):
+        with self._lock:
+            self.pending += 1
+        try:
+            future = self.executor.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._done(None)
+            raise
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future) -> None:
+        with self._lock:
+            self.pending -= 1
+
+    def shutdown(self, wait=True, *, cancel_futures=False) -> None:
+        self.executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+
+def rss_bytes() -> int:
+    return _process.memory_info().rss
+
+
+def rpc_stats_messages(traffic: RpcTraffic):
+    """
+    ### Função:
+    Converter os totais do RpcTraffic em mensagens Rpc_Stats.
+    ### Returns:
+    - Lista de Rpc_Stats, uma por RPC, e os bytes recebidos e enviados somados.
+    """
+    messages = []
+    bytes_received = bytes_sent = 0
+    for method, total in sorted(traffic.totals.items()):
+        bytes_received += total["request_bytes"]
+        bytes_sent += total["response_bytes"]
+        messages.append(fedT_pb2.Rpc_Stats(
+            method=method,
+            calls=total["calls"],
+            request_bytes=total["request_bytes"],
+            response_bytes=total["response_bytes"],
+            total_seconds=total["total_seconds"],
+            max_seconds=total["max_seconds"],
+            latency_bounds=LATENCY_BOUNDS,
+            latency_counts=total["latency_counts"]
+        ))
+    return messages, bytes_received, bytes_sent
+
+
+def latency_quantile(rpc_stats, quantile):
+    """
+    Estimativa do quantil pelo histograma: o limite superior da faixa onde ele cai, sem passar da
+    maior duração observada (por isso o valor da última faixa, sem limite, é a própria duração máxima).
+    """
+    target = quantile * rpc_stats.calls
+    accumulated = 0
+    for bound, count in zip(rpc_stats.latency_bounds, rpc_stats.latency_counts):
+        accumulated += count
+        if accumulated >= target:
+            return min(bound, rpc_stats.max_seconds)
+    return rpc_stats.max_seconds
+
+
+def _format_seconds(seconds):
+    if seconds is None:
+        return "-"
+    return f"{seconds * 1000:.1f}ms" if seconds < 1 else f"{seconds:.2f}s"
+
+
+def format_server_stats(stats) -> str:
+    mode = f"async, versão {stats.model_version}" if stats.asynchronous else f"round {stats.round}"
+    lines = [
+        f"Servidor ({mode}), ativo há {stats.uptime:.0f} s",
+        f"Clientes: {stats.connected_clients}/{stats.expected_clients} conectados, {stats.responded_clients} responderam, "
+        f"{stats.round_subscribers} inscritos nos eventos",
+        f"trees_warehouse: {stats.forests_in_warehouse} florestas, {stats.trees_in_warehouse} árvores; agregação: {stats.aggregation_state}",
+        f"Tarefas pendentes (na fila ou rodando): executor {stats.executor_queue_depth}, pool de processos {stats.process_pool_queue_depth}",
+        f"Atraso do event loop: {_format_seconds(stats.event_loop_lag)} (máximo {_format_seconds(stats.max_event_loop_lag)})",
+        f"RSS: {stats.rss_bytes / 1024**2:.1f} MB",
+    ]
+    if not stats.rpc_accounting:
+        lines.append("Tráfego e latência das RPCs: desativados (rpc_accounting = false)")
+        return "\n".join(lines)
+
+    lines.append(f"Tráfego: {stats.bytes_received / 1024**2:.2f} MB recebidos, {stats.bytes_sent / 1024**2:.2f} MB enviados")
+    if stats.rpc_stats:
+        lines.append(f"{'RPC':<26}{'chamadas':>10}{'média':>11}{'p50':>11}{'p95':>11}{'máx':>11}{'MB rec.':>10}{'MB env.':>10}")
+    for rpc in stats.rpc_stats:
+        # Uma RPC ainda sem chamadas finalizadas (por exemplo, um stream aberto) não tem latências.
+        mean = rpc.total_seconds / rpc.calls if rpc.calls else None
+        p50 = latency_quantile(rpc, 0.5) if rpc.calls else None
+        p95 = latency_quantile(rpc, 0.95) if rpc.calls else None
+        max_seconds = rpc.max_seconds if rpc.calls else None
+        lines.append(
+            f"{rpc.method:<26}{rpc.calls:>10}{_format_seconds(mean):>11}"
+            f"{_format_seconds(p50):>11}{_format_seconds(p95):>11}"
+            f"{_format_seconds(max_seconds):>11}"
+            f"{rpc.request_bytes / 1024**2:>10.2f}{rpc.response_bytes / 1024**2:>10.2f}"
+        )
+    return "\n".join(lines)
+
+
+async def fetch_server_stats(address):
+    async with create_channel(address) as channel:
+        stub = fedT_pb2_grpc.FedTStub(channel)
+        return await stub.get_server_stats(fedT_pb2.Request_Server(), timeout=10)
+
+
+def show_server_stats(address=None, watch=0.0):
+    """
+    ### Função:
+    Mostrar as estatísticas de um servidor (ou edge) em execução (`fedt stats`).
+    ### Args:
+    - address: Endereço do servidor (host:porta).
+    - watch: Se maior que zero, repete a consulta a cada `watch` segundos.
+    """
+    address = address or f"{server_config['IP']}:{server_config['port']}"
+    while True:
+        print(format_server_stats(asyncio.run(fetch_server_stats(address))))
+        if watch <= 0:
+            return
+        print()
+        time.sleep(watch)
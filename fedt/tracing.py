@@ -0,0 +1,121 @@
+import os
+import json
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from fedt.settings import tracing_config, logs_folder
+from fedt.metrics import MetricsWriter
+
+TRACE_SUFFIX = ".trace.jsonl"
+
+# Identificadores de processo no trace: o servidor é 0, os edges e os clientes ficam em faixas separadas,
+# assim os timelines continuam distintos mesmo com vários clientes num único processo (fedt simulate).
+SERVER_TRACE_PID = 0
+EDGE_TRACE_PID_OFFSET = 1_000_000
+CLIENT_TRACE_PID_OFFSET = 1
+
+
+def traces_folder(strategy):
+    folder = logs_folder / "traces" / strategy
+    folder.mkdir(parents=True, exist_ok=True)
+    return folder
+
+
+def trace_file_path(strategy, result_file_path):
+    """
+    ### Função:
+    Caminho do trace de um servidor, edge ou cliente: logs/traces/<estratégia>/<nome do arquivo de resultados>.trace.jsonl.
+    """
+    return (traces_folder(strategy) / f"{Path(result_file_path).stem}{TRACE_SUFFIX}").resolve()
+
+
+def read_trace_events(path) -> list:
+    """
+    ### Função:
+    Ler os eventos de um arquivo de trace (um evento por linha).
+    ### Returns:
+    - Lista de eventos; uma última linha incompleta (processo interrompido) é ignorada.
+    """
+    events = []
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                events.append(json.loads(line))
+            except json.JSONDecodeError:
+                break
+    return events
+
+
+class Tracer():
+    """
+    Registra spans das fases do round no formato de eventos do Chrome trace (ph "X", tempos em microssegundos).
+    Os eventos são gravados um por linha pelo MetricsWriter; o scripts/merge_traces.py junta os arquivos
+    do servidor e dos clientes num único JSON para o chrome://tracing ou o Perfetto.
+    O relógio é o time.time() de cada máquina, para os timelines de processos diferentes ficarem alinhados.
+    """
+
+    def __init__(self, path, process_name, pid, enabled=tracing_config["enabled"]) -> None:
+        self.enabled = enabled
+        self.pid = pid
+        self.writer = MetricsWriter(path) if enabled else None
+        self._named = False
+        self._named_threads = set()
+        self.process_name = process_name
+
+    def _write(self, event) -> None:
+        if not self._named:
+            self._named = True
+            self.writer.write_record({
+                "name": "process_name", "ph": "M", "pid": self.pid, "tid": 0,
+                "args": {"name": self.process_name, "os_pid": os.getpid()}
+            })
+        self.writer.write_record(event)
+
+    def name_thread(self, tid, name) -> None:
+        """Dar nome a uma linha do timeline (registrado uma vez por tid)."""
+        if self.enabled and tid not in self._named_threads:
+            self._named_threads.add(tid)
+            self._write({"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid, "args": {"name": name}})
+
+    @contextmanager
+    def span(self, name, tid=0, **args):
+        """
+        ### Função:
+        Medir um trecho de código (síncrono ou com awaits) como um span.
+        ### Args:
+        - name: Nome da fase.
+        - tid: Linha do timeline dentro do processo (no servidor, o client_ID das RPCs de cada cliente).
+        - args: Valores extras mostrados no visualizador; podem ser completados dentro do `with`.
+        """
+        if not self.enabled:
+            yield args
+            return
+        start = time.time()
+        try:
+            yield args
+        finally:
+            self.complete(name, start, time.time(), tid, **args)
+
+    def complete(self, name, start_time, end_time, tid=0, **args) -> None:
+        """Registrar um span já medido, a partir dos instantes de início e fim (time.time())."""
+        if self.enabled:
+            self._write({
+                "name": name, "ph": "X", "pid": self.pid, "tid": tid,
+                "ts": start_time * 1e6, "dur": (end_time - start_time) * 1e6, "args": args
+            })
+
+    def instant(self, name, tid=0, **args) -> None:
+        """Registrar um evento pontual (por exemplo, o prazo do round esgotado)."""
+        if self.enabled:
+            self._write({
+                "name": name, "ph": "i", "s": "p", "pid": self.pid, "tid": tid,
+                "ts": time.time() * 1e6, "args": args
+            })
+
+    async def close(self) -> None:
+        if self.enabled:
+            await self.writer.close()
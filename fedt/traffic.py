@@ -0,0 +1,272 @@
+import bisect
+import inspect
+import time
+
+import grpc
+import grpc.aio as grpc_aio
+
+# Campos de cada método em RpcTraffic.take():
+# calls: chamadas finalizadas; *_messages: mensagens; *_bytes: bytes do protobuf (sem compressão,
+# sem o prefixo de 5 bytes do gRPC e sem os cabeçalhos HTTP/2); duration: soma da duração das chamadas.
+TRAFFIC_FIELDS = ("calls", "request_messages", "request_bytes", "response_messages", "response_bytes", "duration")
+# Limites superiores (segundos) das faixas do histograma de latência acumulado por RPC.
+LATENCY_BOUNDS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 60.0)
+# RPCs de monitoramento (fedt stats): entram só nos totais, para não somar ao tráfego dos rounds e dos clientes.
+TOTALS_ONLY_METHODS = frozenset({"get_server_stats"})
+
+
+def _method_name(full_method):
+    # "/fedT.FedT/upload_trees" -> "upload_trees" (no cliente, o nome chega em bytes)
+    if isinstance(full_method, bytes):
+        full_method = full_method.decode()
+    return full_method.rsplit("/", 1)[-1]
+
+
+class RpcTraffic():
+    """
+    Contabiliza, por round, por client_ID e por RPC, as mensagens e os bytes trocados e a duração das chamadas.
+    Cada evento entra no round corrente no momento em que acontece (`current_round()`): streams longos,
+    como o subscribe_rounds, têm as mensagens distribuídas pelos rounds em que foram enviadas.
+    """
+
+    def __init__(self, current_round=lambda: 0) -> None:
+        self.current_round = current_round
+        self.rounds = {} # round -> {client_ID: {método: {campo: valor}}}
+        # Totais desde o início, por método, com o histograma de latência (usados pelo get_server_stats).
+        self.totals = {}
+
+    def _total(self, method):
+        total = self.totals.get(method)
+        if total is None:
+            total = self.totals[method] = {
+                "calls": 0, "request_bytes": 0, "response_bytes": 0,
+                "total_seconds": 0.0, "max_seconds": 0.0,
+                "latency_counts": [0] * (len(LATENCY_BOUNDS) + 1)
+            }
+        return total
+
+    def _entry(self, client_ID, method):
+        clients = self.rounds.setdefault(self.current_round(), {})
+        methods = clients.setdefault(client_ID, {})
+        entry = methods.get(method)
+        if entry is None:
+            entry = methods[method] = dict.fromkeys(TRAFFIC_FIELDS, 0)
+        return entry
+
+    def add_request(self, client_ID, method, message) -> None:
+        size = message.ByteSize()
+        if method not in TOTALS_ONLY_METHODS:
+            entry = self._entry(client_ID, method)
+            entry["request_messages"] += 1
+            entry["request_bytes"] += size
+        self._total(method)["request_bytes"] += size
+
+    def add_response(self, client_ID, method, message) -> None:
+        size = message.ByteSize()
+        if method not in TOTALS_ONLY_METHODS:
+            entry = self._entry(client_ID, method)
+            entry["response_messages"] += 1
+            entry["response_bytes"] += size
+        self._total(method)["response_bytes"] += size
+
+    def add_call(self, client_ID, method, duration) -> None:
+        if method not in TOTALS_ONLY_METHODS:
+            entry = self._entry(client_ID, method)
+            entry["calls"] += 1
+            entry["duration"] += duration
+
+        total = self._total(method)
+        total["calls"] += 1
+        total["total_seconds"] += duration
+        total["max_seconds"] = max(total["max_seconds"], duration)
+        total["latency_counts"][bisect.bisect_left(LATENCY_BOUNDS, duration)] += 1
+
+    def take(self, round_number):
+        """
+        ### Função:
+        Retirar a contabilidade de um round (e descartar a de rounds anteriores que ficaram para trás).
+        ### Returns:
+        - Dicionário {client_ID: {método: {campo: valor}}}.
+        """
+        traffic = self.rounds.pop(round_number, {})
+        for stale_round in [r for r in self.rounds if r < round_number]:
+            del self.rounds[stale_round]
+        return traffic
+
+    def take_client(self, round_number, client_ID):
+        """Retirar a contabilidade de um round para um único cliente: {método: {campo: valor}}."""
+        return self.take(round_number).get(client_ID, {})
+
+
+class _RpcCall():
+    """Uma chamada em andamento: guarda o client_ID, conhecido só na primeira mensagem do cliente."""
+
+    def __init__(self, traffic: RpcTraffic, method, client_ID=None) -> None:
+        self.traffic = traffic
+        self.method = method
+        self.client_ID = client_ID
+        self.start_time = time.perf_counter()
+
+    def request(self, message) -> None:
+        if self.client_ID is None:
+            self.client_ID = getattr(message, "client_ID", None)
+        self.traffic.add_request(self.client_ID, self.method, message)
+
+    def response(self, message) -> None:
+        self.traffic.add_response(self.client_ID, self.method, message)
+
+    def finish(self) -> None:
+        self.traffic.add_call(self.client_ID, self.method, time.perf_counter() - self.start_time)
+
+    async def count_requests(self, request_iterator):
+        async for request in request_iterator:
+            self.request(request)
+            yield request
+
+
+class TrafficServerInterceptor(grpc_aio.ServerInterceptor):
+    """Interceptor do servidor (root ou edge): contabiliza as RPCs recebidas no RpcTraffic."""
+
+    def __init__(self, traffic: RpcTraffic) -> None:
+        self.traffic = traffic
+
+    async def intercept_service(self, continuation, handler_call_details):
+        handler = await continuation(handler_call_details)
+        if handler is None:
+            return None
+
+        traffic = self.traffic
+        method = _method_name(handler_call_details.method)
+        serialisers = {
+            "request_deserializer": handler.request_deserializer,
+            "response_serializer": handler.response_serializer,
+        }
+
+        if handler.request_streaming and handler.response_streaming:
+            async def stream_stream(request_iterator, context):
+                call = _RpcCall(traffic, method)
+                try:
+                    async for response in handler.stream_stream(call.count_requests(request_iterator), context):
+                        call.response(response)
+                        yield response
+                finally:
+                    call.finish()
+            return grpc.stream_stream_rpc_method_handler(stream_stream, **serialisers)
+
+        if handler.request_streaming:
+            async def stream_unary(request_iterator, context):
+                call = _RpcCall(traffic, method)
+                try:
+                    response = handler.stream_unary(call.count_requests(request_iterator), context)
+                    if inspect.isawaitable(response):
+                        response = await response
+                    call.response(response)
+                    return response
+                finally:
+                    call.finish()
+            return grpc.stream_unary_rpc_method_handler(stream_unary, **serialisers)
+
+        if handler.response_streaming:
+            async def unary_stream(request, context):
+                call = _RpcCall(traffic, method)
+                call.request(request)
+                try:
+                    async for response in handler.unary_stream(request, context):
+                        call.response(response)
+                        yield response
+                finally:
+                    call.finish()
+            return grpc.unary_stream_rpc_method_handler(unary_stream, **serialisers)
+
+        async def unary_unary(request, context):
+            call = _RpcCall(traffic, method)
+            call.request(request)
+            try:
+                response = handler.unary_unary(request, context)
+                if inspect.isawaitable(response):
+                    response = await response
+                call.response(response)
+                return response
+            finally:
+                call.finish()
+        return grpc.unary_unary_rpc_method_handler(unary_unary, **serialisers)
+
+
+class _TrafficClientInterceptor():
+    def __init__(self, traffic: RpcTraffic, client_ID=None) -> None:
+        self.traffic = traffic
+        self.client_ID = client_ID
+
+    def _call(self, client_call_details):
+        return _RpcCall(self.traffic, _method_name(client_call_details.method), self.client_ID)
+
+
+class _UnaryUnaryTrafficInterceptor(_TrafficClientInterceptor, grpc_aio.UnaryUnaryClientInterceptor):
+    async def intercept_unary_unary(self, continuation, client_call_details, request):
+        call = self._call(client_call_details)
+        call.request(request)
+        try:
+            rpc = await continuation(client_call_details, request)
+            # Aguardar a mesma chamada de novo devolve a resposta guardada.
+            call.response(await rpc)
+            return rpc
+        finally:
+            call.finish()
+
+
+class _UnaryStreamTrafficInterceptor(_TrafficClientInterceptor, grpc_aio.UnaryStreamClientInterceptor):
+    async def intercept_unary_stream(self, continuation, client_call_details, request):
+        call = self._call(client_call_details)
+        call.request(request)
+        rpc = await continuation(client_call_details, request)
+
+        async def _responses():
+            try:
+                async for response in rpc:
+                    call.response(response)
+                    yield response
+            finally:
+                call.finish()
+        return _responses()
+
+
+class _StreamUnaryTrafficInterceptor(_TrafficClientInterceptor, grpc_aio.StreamUnaryClientInterceptor):
+    async def intercept_stream_unary(self, continuation, client_call_details, request_iterator):
+        call = self._call(client_call_details)
+        try:
+            rpc = await continuation(client_call_details, call.count_requests(request_iterator))
+            call.response(await rpc)
+            return rpc
+        finally:
+            call.finish()
+
+
+class _StreamStreamTrafficInterceptor(_TrafficClientInterceptor, grpc_aio.StreamStreamClientInterceptor):
+    async def intercept_stream_stream(self, continuation, client_call_details, request_iterator):
+        call = self._call(client_call_details)
+        rpc = await continuation(client_call_details, call.count_requests(request_iterator))
+
+        async def _responses():
+            try:
+                async for response in rpc:
+                    call.response(response)
+                    yield response
+            finally:
+                call.finish()
+        return _responses()
+
+
+def client_interceptors(traffic: RpcTraffic, client_ID=None):
+    """
+    ### Função:
+    Criar os interceptors de um canal do cliente (ou do edge, no canal para o root).
+    O grpc.aio separa os interceptors por tipo de chamada, então há um para cada tipo.
+    ### Returns:
+    - Lista de interceptors para o `create_channel`.
+    """
+    return [
+        _UnaryUnaryTrafficInterceptor(traffic, client_ID),
+        _UnaryStreamTrafficInterceptor(traffic, client_ID),
+        _StreamUnaryTrafficInterceptor(traffic, client_ID),
+        _StreamStreamTrafficInterceptor(traffic, client_ID),
+    ]
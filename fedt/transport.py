@@ -0,0 +1,84 @@
+import grpc
+import grpc.aio as grpc_aio
+
+from fedt.settings import transport_config
+
+COMPRESSION_ALGORITHMS = {
+    "none": grpc.Compression.NoCompression,
+    "gzip": grpc.Compression.Gzip,
+    "deflate": grpc.Compression.Deflate,
+}
+
+
+def compression_algorithm(config=transport_config):
+    """
+    ### Função:
+    Traduzir o `compression` do config para o algoritmo do gRPC.
+    O gRPC negocia o algoritmo com o outro lado (grpc-accept-encoding) e volta para "identity"
+    se ele não for aceito.
+    """
+    if config["compression"] not in COMPRESSION_ALGORITHMS:
+        raise ValueError(f"compression inválida: {config['compression']}. Opções: {tuple(COMPRESSION_ALGORITHMS)}")
+    return COMPRESSION_ALGORITHMS[config["compression"]]
+
+
+def _common_options(config):
+    options = []
+    if config["max_message_length"] > 0:
+        options.append(("grpc.max_send_message_length", config["max_message_length"]))
+        options.append(("grpc.max_receive_message_length", config["max_message_length"]))
+    if config["keepalive_time_ms"] > 0:
+        options.append(("grpc.keepalive_time_ms", config["keepalive_time_ms"]))
+        options.append(("grpc.keepalive_timeout_ms", config["keepalive_timeout_ms"]))
+        options.append(("grpc.keepalive_permit_without_calls", 1))
+        options.append(("grpc.http2.max_pings_without_data", 0))
+    options.append(("grpc.http2.bdp_probe", int(config["http2_bdp_probe"])))
+    if config["http2_lookahead_bytes"] > 0:
+        options.append(("grpc.http2.lookahead_bytes", config["http2_lookahead_bytes"]))
+    if config["http2_max_frame_size"] > 0:
+        options.append(("grpc.http2.max_frame_size", config["http2_max_frame_size"]))
+    return options
+
+
+def server_options(config=transport_config):
+    """
+    ### Função:
+    Montar as opções do servidor gRPC a partir da seção [settings.transport].
+    ### Returns:
+    - Lista de (opção, valor).
+    """
+    options = _common_options(config)
+    if config["keepalive_time_ms"] > 0:
+        # Aceita os pings de keepalive dos clientes no mesmo intervalo.
+        options.append(("grpc.http2.min_ping_interval_without_data_ms", config["keepalive_time_ms"]))
+        options.append(("grpc.http2.max_ping_strikes", 0))
+    return options
+
+
+def channel_options(config=transport_config):
+    """
+    ### Função:
+    Montar as opções dos canais gRPC (clientes e edges) a partir da seção [settings.transport].
+    ### Returns:
+    - Lista de (opção, valor).
+    """
+    return _common_options(config)
+
+
+def create_server(config=transport_config, interceptors=None):
+    """Criar o servidor gRPC com as opções e a compressão do config."""
+    return grpc_aio.server(
+        options=server_options(config),
+        compression=compression_algorithm(config),
+        interceptors=interceptors
+    )
+
+
+def create_channel(address, config=transport_config, interceptors=None):
+    """Abrir um canal gRPC (sem TLS) com as opções e a compressão do config."""
+    return grpc_aio.insecure_channel(
+        address,
+        options=channel_options(config),
+        compression=compression_algorithm(config),
+        interceptors=interceptors
+    )
@@ -0,0 +1,174 @@
+"""
+Formato binário das árvores trocadas entre servidor e clientes.
+
+Cada árvore é gravada como um cabeçalho fixo seguido apenas dos arrays de nós
+do `tree_`, em little-endian. Nada de pickle: o estimador é reconstruído a partir dos arrays.
+Folhas são identificadas por children_right == -1, então feature, threshold e
+missing_go_to_left só são gravados para os nós internos. Com FLAG_ZLIB, tudo que
+vem depois do cabeçalho é comprimido com zlib.
+
+Layout (versão 1):
+    magic (4s) | version (B) | flags (B) | n_outputs (H) | n_features (I) | node_count (I) | max_depth (I)
+    children_right     int32[node_count]
+    children_left      int32[node_count]           (ausente com FLAG_PREORDER)
+    feature            uint16|int32[n_internal]    (uint16 com FLAG_FEATURE_U16)
+    threshold          float64[n_internal]
+    missing_go_to_left bits[n_internal]            (np.packbits)
+    value              float64[node_count * n_outputs]
+    n_node_samples     uint16|int32[node_count]    (uint16 com FLAG_SAMPLES_U16)
+"""
+
+import struct
+import zlib
+
+import numpy as np
+from sklearn.tree import DecisionTreeRegressor
+from sklearn.tree._tree import Tree, NODE_DTYPE, TREE_LEAF, TREE_UNDEFINED
+
+MAGIC = b"FDTT"
+VERSION = 1
+
+# O filho esquerdo de todo nó interno é o nó seguinte (construção em profundidade do sklearn).
+FLAG_PREORDER = 1
+FLAG_FEATURE_U16 = 2
+FLAG_SAMPLES_U16 = 4
+FLAG_ZLIB = 8
+
+_HEADER = struct.Struct("<4sBBHIII")
+
+_INT = np.dtype("<i4")
+_U16 = np.dtype("<u2")
+_FLOAT = np.dtype("<f8")
+_BYTE = np.dtype("u1")
+
+_U16_MAX = np.iinfo(np.uint16).max
+
+
+def is_packed_tree(data) -> bool:
+    """
+    ### Função:
+    Verificar se os bytes estão no formato binário de árvore (e não em pickle/joblib).
+    """
+    return bytes(data[:len(MAGIC)]) == MAGIC
+
+
+def pack_tree(tree_model: DecisionTreeRegressor, compress_level: int = 1) -> bytes:
+    """
+    ### Função:
+    Converter uma árvore de regressão treinada para o formato binário.
+    ### Args:
+    - tree_model: Árvore treinada (DecisionTreeRegressor).
+    - compress_level: Nível do zlib aplicado aos arrays (0 desliga a compressão).
+    ### Returns:
+    - Bytes com o cabeçalho e os arrays de nós.
+    """
+    tree = tree_model.tree_
+    node_count = tree.node_count
+    n_outputs = tree.n_outputs
+
+    if tree.max_n_classes != 1:
+        raise ValueError("Somente árvores de regressão são suportadas pelo formato binário.")
+
+    children_left = tree.children_left
+    children_right = tree.children_right
+    internal = children_right != TREE_LEAF
+    n_node_samples = tree.n_node_samples
+
+    flags = 0
+    if np.array_equal(children_left[internal], np.flatnonzero(internal) + 1):
+        flags |= FLAG_PREORDER
+    if tree.n_features <= _U16_MAX:
+        flags |= FLAG_FEATURE_U16
+    if node_count == 0 or n_node_samples.max() <= _U16_MAX:
+        flags |= FLAG_SAMPLES_U16
+
+    parts = [children_right.astype(_INT).tobytes()]
+    if not flags & FLAG_PREORDER:
+        parts.append(children_left.astype(_INT).tobytes())
+    parts.extend((
+        tree.feature[internal].astype(_U16 if flags & FLAG_FEATURE_U16 else _INT).tobytes(),
+        tree.threshold[internal].astype(_FLOAT).tobytes(),
+        np.packbits(tree.missing_go_to_left[internal]).tobytes(),
+        tree.value.reshape(node_count * n_outputs).astype(_FLOAT).tobytes(),
+        n_node_samples.astype(_U16 if flags & FLAG_SAMPLES_U16 else _INT).tobytes(),
+    ))
+    body = b"".join(parts)
+
+    if compress_level > 0:
+        flags |= FLAG_ZLIB
+        body = zlib.compress(body, compress_level)
+
+    header = _HEADER.pack(MAGIC, VERSION, flags, n_outputs, tree.n_features, node_count, tree.max_depth)
+    return header + body
+
+
+def unpack_tree(data) -> DecisionTreeRegressor:
+    """
+    ### Função:
+    Reconstruir uma árvore de regressão a partir do formato binário.
+    A impureza dos nós não é transmitida (fica zerada), e o peso de cada nó
+    é o próprio n_node_samples; nenhum dos dois é usado no predict.
+    ### Args:
+    - data: Bytes gerados pelo `pack_tree`.
+    ### Returns:
+    - Árvore pronta para o predict.
+    """
+    magic, version, flags, n_outputs, n_features, node_count, max_depth = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("Os bytes não estão no formato binário de árvore.")
+    if version != VERSION:
+        raise ValueError(f"Versão do formato de árvore não suportada: {version}")
+
+    offset = _HEADER.size
+    if flags & FLAG_ZLIB:
+        data = zlib.decompress(memoryview(data)[offset:])
+        offset = 0
+
+    def read(dtype, count):
+        nonlocal offset
+        array = np.frombuffer(data, dtype=dtype, count=count, offset=offset)
+        offset += dtype.itemsize * count
+        return array
+
+    children_right = read(_INT, node_count)
+    internal = children_right != TREE_LEAF
+    internal_idx = np.flatnonzero(internal)
+    n_internal = len(internal_idx)
+
+    if flags & FLAG_PREORDER:
+        children_left = np.full(node_count, TREE_LEAF, dtype=np.intp)
+        children_left[internal_idx] = internal_idx + 1
+    else:
+        children_left = read(_INT, node_count)
+
+    feature = read(_U16 if flags & FLAG_FEATURE_U16 else _INT, n_internal)
+    threshold = read(_FLOAT, n_internal)
+    missing_go_to_left = np.unpackbits(read(_BYTE, (n_internal + 7) // 8), count=n_internal)
+    value = read(_FLOAT, node_count * n_outputs)
+    n_node_samples = read(_U16 if flags & FLAG_SAMPLES_U16 else _INT, node_count)
+
+    nodes = np.zeros(node_count, dtype=NODE_DTYPE)
+    nodes["left_child"] = children_left
+    nodes["right_child"] = children_right
+    nodes["feature"] = TREE_UNDEFINED
+    nodes["feature"][internal_idx] = feature
+    nodes["threshold"] = TREE_UNDEFINED
+    nodes["threshold"][internal_idx] = threshold
+    nodes["missing_go_to_left"][internal_idx] = missing_go_to_left
+    nodes["n_node_samples"] = n_node_samples
+    nodes["weighted_n_node_samples"] = n_node_samples
+
+    tree = Tree(n_features, np.ones(n_outputs, dtype=np.intp), n_outputs)
+    tree.__setstate__({
+        "max_depth": max_depth,
+        "node_count": node_count,
+        "nodes": nodes,
+        "values": value.reshape(node_count, n_outputs, 1).copy(),
+    })
+
+    tree_model = DecisionTreeRegressor()
+    tree_model.tree_ = tree
+    tree_model.n_features_in_ = n_features
+    tree_model.n_outputs_ = n_outputs
+    tree_model.max_features_ = n_features
+    return tree_model
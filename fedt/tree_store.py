@@ -0,0 +1,120 @@
+import hashlib
+import threading
+
+from fedt import utils
+
+HASH_SIZE = 16
+
+
+def tree_hash(serialised_tree) -> bytes:
+    """
+    ### Função:
+    Calcular o hash do conteúdo de uma árvore serializada.
+    ### Args:
+    - serialised_tree: Árvore em bytes.
+    ### Returns:
+    - Hash de 16 bytes (blake2b).
+    """
+    return hashlib.blake2b(serialised_tree, digest_size=HASH_SIZE).digest()
+
+
+class TreeStore():
+    """
+    Armazena as árvores pelo hash do conteúdo serializado.
+    Cada árvore é guardada em bytes e desserializada apenas uma vez, na primeira vez em que é pedida,
+    de modo que árvores repetidas entre rounds e entre clientes não são reenviadas nem desserializadas de novo.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._serialised = {}
+        self._trees = {}
+        self._hash_by_id = {}
+
+    def __contains__(self, digest) -> bool:
+        return digest in self._serialised
+
+    def __len__(self) -> int:
+        return len(self._serialised)
+
+    def hashes(self) -> list[bytes]:
+        return list(self._serialised)
+
+    def add_serialised(self, serialised_tree) -> bytes:
+        """
+        ### Função:
+        Guardar uma árvore em bytes.
+        ### Returns:
+        - Hash da árvore.
+        """
+        digest = tree_hash(serialised_tree)
+        with self._lock:
+            self._serialised.setdefault(digest, bytes(serialised_tree))
+        return digest
+
+    def add_tree(self, tree) -> bytes:
+        """
+        ### Função:
+        Guardar uma árvore em formato de objeto, serializando-a somente se ela ainda não estiver no store.
+        ### Returns:
+        - Hash da árvore.
+        """
+        digest = self.hash_of(tree)
+        if digest is not None:
+            return digest
+
+        serialised_tree = utils.serialise_tree(tree)
+        digest = tree_hash(serialised_tree)
+        with self._lock:
+            self._serialised.setdefault(digest, serialised_tree)
+            if digest not in self._trees:
+                self._trees[digest] = tree
+                self._hash_by_id[id(tree)] = digest
+        return digest
+
+    def hash_of(self, tree):
+        """
+        ### Função:
+        Obter o hash de uma árvore (objeto) que veio do store.
+        ### Returns:
+        - Hash da árvore, ou None se ela não estiver no store.
+        """
+        return self._hash_by_id.get(id(tree))
+
+    def get_serialised(self, digest) -> bytes:
+        return self._serialised[digest]
+
+    def get_tree(self, digest):
+        """
+        ### Função:
+        Obter a árvore em formato de objeto, desserializando-a apenas na primeira chamada.
+        """
+        tree = self._trees.get(digest)
+        if tree is not None:
+            return tree
+
+        tree = utils.deserialise_tree(self._serialised[digest])
+        with self._lock:
+            if digest not in self._trees:
+                self._trees[digest] = tree
+                self._hash_by_id[id(tree)] = digest
+            return self._trees[digest]
+
+    def get_several_trees(self, hashes) -> list:
+        return [self.get_tree(digest) for digest in hashes]
+
+    def get_size_of_trees(self, hashes) -> int:
+        return sum(len(self._serialised[digest]) for digest in hashes)
+
+    def retain(self, hashes) -> None:
+        """
+        ### Função:
+        Descartar todas as árvores que não estão em `hashes`.
+        """
+        keep = set(hashes)
+        with self._lock:
+            for digest in [digest for digest in self._serialised if digest not in keep]:
+                del self._serialised[digest]
+                tree = self._trees.pop(digest, None)
+                if tree is not None:
+                    del self._hash_by_id[id(tree)]
@@ -1,11 +1,9 @@
 from fedt.settings import (
-    dataset_path, percentage_value_of_samples_per_client, 
-    validate_dataset_size, aggregation_strategies, 
-    logs_folder
+    percentage_value_of_samples_per_client, aggregation_strategies, 
+    logs_folder, tree_compression_level
     )
 
 import numpy as np
-import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestRegressor
 
@@ -13,6 +11,11 @@ import pickle
 import tempfile
 
 from fedt import fedT_pb2
+from fedt import tree_format
+from fedt.dataset import (
+    read_csv_dataset, load_server_dataset, has_client_shard, 
+    load_client_shard, load_client_from_shared_memory
+    )
 
 import logging
 import colorlog
@@ -42,6 +45,21 @@ def set_initial_params(model: RandomForestRegressor, X_train, y_train):
     """
     model.fit(X_train, y_train)
 
+def build_initial_trees(n_estimators, X_train, y_train, **forest_params) -> list:
+    """
+    ### Função:
+    Gerar as árvores do modelo global inicial, treinando uma floresta com poucas amostras.
+    ### Args:
+    - n_estimators: Número de árvores.
+    - Data: As features para treinar o modelo.
+    - Label: Os targets para treinar o modelo.
+    ### Returns:
+    - Lista de árvores.
+    """
+    model = RandomForestRegressor(n_estimators=n_estimators, **forest_params)
+    set_initial_params(model, X_train, y_train)
+    return model.estimators_
+
 def set_model_params(
     model: RandomForestRegressor, params: list
 ) -> RandomForestRegressor:
@@ -81,28 +99,27 @@ def load_dataset():
     - Data Test: As features para testar o modelo.
     - Label Test: Os targets para testar o modelo
     """
-    energy_data_complete = pd.read_csv(dataset_path)
-    columns_for_training = []
-    temperature_columns = [f"T{i}" for i in range(1, 10)]
-    humidity_columns = [f"RH_{i}" for i in range(1, 10)]
-
-    for temperature in temperature_columns:
-        columns_for_training.append(temperature)
-        
-    for humidity in humidity_columns:
-        columns_for_training.append(humidity)
-        
-    columns_for_training.append("T_out")
-    columns_for_training.append("RH_out")
-    columns_for_training.append("Press_mm_hg")
-    columns_for_training.append("Visibility")
-
-    data = energy_data_complete[columns_for_training]
-    label = energy_data_complete["Appliances"]
-    
-    return data, label
+    return read_csv_dataset()
+
+def load_house_client(client_ID=None, shm_name=None):
+    """
+    ### Função:
+    Carregar a amostra de dados de um cliente.
+    Com `shm_name`, os dados vêm do dataset em memória compartilhada criado pelo launcher.
+    Se existir um shard para o cliente (`fedt dataset prepare`), só as linhas dele são lidas;
+    caso contrário, o CSV inteiro é lido e a amostra é sorteada.
+    ### Args:
+    - client_ID: ID do cliente.
+    - shm_name: Nome do bloco de memória compartilhada (opcional).
+    ### Returns:
+    - X_train, y_train, X_test, y_test.
+    """
+    if client_ID is not None and shm_name is not None:
+        return load_client_from_shared_memory(client_ID, shm_name)
+
+    if client_ID is not None and has_client_shard(client_ID):
+        return load_client_shard(client_ID)
 
-def load_house_client():
     rng = np.random.default_rng()
 
     X, y = load_dataset()
@@ -119,51 +136,50 @@ def load_house_client():
 def load_dataset_for_server() -> list:
     """
     ### Função:
-    Carregar o dataset com apenas 3 amostras, 
+    Carregar o dataset com apenas 2 amostras, 
     servirá para inicializar o server e garantir que os parâmetros entre server e cliente serão compativeis.
+    O dataset fica em memória (`load_server_dataset`), então o CSV é lido uma única vez.
     ### Args:
     - None.
     ### Returns:
     - Data Train: As features.
     - Label Train: Os targets. 
     """
-    data, label  = load_dataset()
-
-    data_train, _, label_train, _ = train_test_split(data, label, test_size=0.2)
-
-    return data_train[0:2], label_train[0:2]
+    server_dataset = load_server_dataset()
+    return server_dataset.X_init, server_dataset.y_init
 
 def load_server_side_validation_data():
     """
     ### Função:
     Carregar o dataset com apenas 1000 amostras, 
     servirá para carregar os dados de validação para testar a performance do modelo.
+    O split de validação é fixo e reutilizado por todas as chamadas.
     ### Args:
     - None.
     ### Returns:
     - Data Valid: As features para validação.
     - Label Valid: Os targets para validação. 
     """
-    data, label  = load_dataset()
-
-    _, data_valid, _, label_valid = train_test_split(data, label, test_size=0.2)
-    return data_valid[-validate_dataset_size:], label_valid[-validate_dataset_size:]
+    server_dataset = load_server_dataset()
+    return server_dataset.X_valid, server_dataset.y_valid
 
 def serialise_tree(tree_model) -> bytes:
     """
     ### Função:
-    Serializa um modelo de árvore usando joblib com compressão leve.
+    Serializa um modelo de árvore no formato binário do `tree_format`,
+    que grava apenas os arrays de nós do `tree_`.
     Retorna os bytes resultantes.
     """
-    buffer = io.BytesIO()
-    joblib.dump(tree_model, buffer, compress=3)  # compress=3 → bom equilíbrio entre tamanho e CPU
-    return buffer.getvalue()
+    return tree_format.pack_tree(tree_model, tree_compression_level)
 
 def deserialise_tree(serialised_tree_model):
     """
     ### Função:
     Desserializa um modelo de árvore (em bytes) para um objeto Python.
+    Bytes que não estão no formato binário são tratados como joblib (formato antigo).
     """
+    if tree_format.is_packed_tree(serialised_tree_model):
+        return tree_format.unpack_tree(serialised_tree_model)
     buffer = io.BytesIO(serialised_tree_model)
     return joblib.load(buffer)
 
@@ -176,12 +192,7 @@ def serialise_several_trees(tree_models):
     ### Returns:
     - serialised_trees: Lista de modelos de árvore convertidos em bytes.
     """
-    serialised_trees = []
-    for tree in tree_models:
-        buffer = io.BytesIO()
-        joblib.dump(tree, buffer, compress=3)  # compress=3 → equilíbrio entre tamanho e CPU
-        serialised_trees.append(buffer.getvalue())
-    return serialised_trees
+    return [serialise_tree(tree) for tree in tree_models]
 
 def deserialise_several_trees(serialised_tree_models):
     """
@@ -192,11 +203,31 @@ def deserialise_several_trees(serialised_tree_models):
     ### Returns:
     - deserialised_trees: Lista com vários modelos de árvore em formato de objeto.
     """
-    deserialised_trees = []
-    for serialised_tree in serialised_tree_models:
-        buffer = io.BytesIO(serialised_tree)
-        deserialised_trees.append(joblib.load(buffer))
-    return deserialised_trees
+    return [deserialise_tree(serialised_tree) for serialised_tree in serialised_tree_models]
+
+def chunk_serialised_trees(serialised_trees, chunk_size):
+    """
+    ### Função:
+    Agrupar as árvores serializadas em lotes de até `chunk_size` bytes,
+    para enviar várias árvores numa única mensagem.
+    Uma árvore maior que o `chunk_size` vai sozinha no seu lote.
+    ### Args:
+    - serialised_trees: Lista de árvores em bytes.
+    - chunk_size: Tamanho máximo (aproximado) de cada lote em bytes.
+    ### Returns:
+    - Gerador de listas de árvores em bytes.
+    """
+    chunk = []
+    chunk_bytes = 0
+    for tree in serialised_trees:
+        if chunk and chunk_bytes + len(tree) > chunk_size:
+            yield chunk
+            chunk = []
+            chunk_bytes = 0
+        chunk.append(tree)
+        chunk_bytes += len(tree)
+    if chunk:
+        yield chunk
 
 def setup_logger(name, log_file, level=logging.INFO):
     """Cria logger colorido que também grava em arquivo."""
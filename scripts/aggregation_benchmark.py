@@ -0,0 +1,98 @@
+from fedt import utils
+from fedt.fedforest import FedForest
+from fedt.forest import ForestContainer
+from fedt.process_pool import ProcessPoolScorer, create_process_pool
+from fedt.tree_store import TreeStore
+
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+
+import argparse
+import time
+
+parse = argparse.ArgumentParser(description="Benchmark da agregação: pool de threads vs. pool de processos.")
+parse.add_argument(
+    "--clients",
+    type=int,
+    default=20,
+    help="Número de florestas (clientes) no round."
+)
+parse.add_argument(
+    "--trees",
+    type=int,
+    default=45,
+    help="Número de árvores por floresta."
+)
+parse.add_argument(
+    "--jobs",
+    type=int,
+    default=4,
+    help="Número de threads e de processos."
+)
+parse.add_argument(
+    "--repeat",
+    type=int,
+    default=3,
+    help="Quantas vezes cada agregação é repetida."
+)
+
+
+def build_serialised_forests(number_of_clients, number_of_trees, n_jobs):
+    """Treina uma floresta por cliente, com os dados de cada cliente, e serializa as árvores."""
+    forests = []
+    for client_ID in range(number_of_clients):
+        X_train, y_train, _, _ = utils.load_house_client(client_ID)
+        model = RandomForestRegressor(n_estimators=number_of_trees, n_jobs=n_jobs).fit(X_train, y_train)
+        forests.append(utils.serialise_several_trees(model.estimators_))
+    return forests
+
+
+def aggregate_with_threads(serialised_forests, n_jobs):
+    """Caminho do executor de threads: desserializa tudo e avalia as árvores em threads."""
+    tree_store = TreeStore()
+    forests = [
+        tree_store.get_several_trees([tree_store.add_serialised(tree) for tree in forest])
+        for forest in serialised_forests
+    ]
+    strategy = FedForest(ForestContainer(), n_jobs=n_jobs)
+    return strategy.aggregate_fit_best_trees_strategy(forests)
+
+
+def aggregate_with_processes(serialised_forests, scorer: ProcessPoolScorer):
+    """Caminho do pool de processos: avalia a partir dos bytes e desserializa só as árvores selecionadas."""
+    tree_store = scorer.tree_store
+    forests = [[tree_store.add_serialised(tree) for tree in forest] for forest in serialised_forests]
+    strategy = FedForest(ForestContainer(), scorer=scorer)
+    return tree_store.get_several_trees(strategy.aggregate_fit_best_trees_strategy(forests))
+
+
+def measure(aggregate, repeat):
+    aggregate()  # aquecimento (no pool de processos, inicia os processos)
+    durations = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        aggregate()
+        durations.append(time.perf_counter() - start_time)
+    return float(np.median(durations))
+
+
+def main():
+    args = parse.parse_args()
+    serialised_forests = build_serialised_forests(args.clients, args.trees, args.jobs)
+    print(f"{args.clients} florestas x {args.trees} árvores, {args.jobs} workers")
+
+    thread_time = measure(lambda: aggregate_with_threads(serialised_forests, args.jobs), args.repeat)
+
+    process_pool = create_process_pool(args.jobs)
+    scorer = ProcessPoolScorer(process_pool, TreeStore())
+    process_time = measure(lambda: aggregate_with_processes(serialised_forests, scorer), args.repeat)
+    process_pool.shutdown(wait=True)
+
+    print(f"{'executor':<12}{'tempo (s)':>12}")
+    print(f"{'threads':<12}{thread_time:>12.3f}")
+    print(f"{'processos':<12}{process_time:>12.3f}")
+    print(f"speedup: {thread_time / process_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
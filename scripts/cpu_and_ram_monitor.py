@@ -1,8 +1,8 @@
-import psutil
+import os
+import csv
 import time
-import json
 
-from fedt.utils import create_specific_logs_folder, setup_logger, get_process_cmd, find_target_processes
+from fedt.utils import create_specific_logs_folder, setup_logger
 
 from pathlib import Path
 import logging
@@ -31,7 +31,18 @@ parse.add_argument(
     "--pid",
     type=int,
     default=None,
-    help="PID específico a monitorar. Se definido, ignora TARGET_STRINGS."
+    help="PID específico a monitorar (com os processos filhos). Se definido, ignora TARGET_STRINGS."
+)
+parse.add_argument(
+    "--interval",
+    type=float,
+    default=0.5,
+    help="Intervalo entre amostras, em segundos (aceita valores abaixo de 0.1)."
+)
+parse.add_argument(
+    "--threads",
+    action="store_true",
+    help="Também registra o uso de CPU de cada thread."
 )
 
 args = parse.parse_args()
@@ -50,133 +61,259 @@ logs_folder = create_specific_logs_folder(strategy, "cpu_ram")
 
 # Lista de padrões a monitorar (usado apenas quando pid não é fornecido)
 TARGET_STRINGS = ["--client-id", "fedt run server"]
-LOG_FILE = logs_folder / f"cpu_and_ram_{user}_{strategy}_{simulation_number}.json"
-CHECK_INTERVAL = 0.5
-SAVE_INTERVAL = 50
-
-
-def monitor_specific_pid(pid):
-    """Monitorar apenas um PID específico."""
-    logger.info(f"Monitorando somente o PID {pid}")
+LOG_FILE = logs_folder / f"cpu_and_ram_{user}_{strategy}_{simulation_number}.csv"
+CHECK_INTERVAL = args.interval
+PER_THREAD = args.threads
+RESCAN_INTERVAL = 1.0 # segundos entre buscas por processos novos em /proc
+FLUSH_INTERVAL = 1.0 # segundos entre flushes do CSV
+# Processos recém-criados podem ainda não ter feito exec (cmdline vazio ou igual ao do pai): o cmdline
+# é relido nas buscas feitas nesse período, que precisa cobrir várias buscas, não só a primeira.
+EXEC_GRACE = 3 * RESCAN_INTERVAL
+
+CSV_COLUMNS = ["timestamp", "target", "pid", "tid", "name", "cpu_percent", "memory_mb", "num_threads"]
+
+PROC = Path("/proc")
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+PAGE_SIZE_MB = os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def read_stat(path):
+    """
+    ### Função:
+    Ler um /proc/<pid>/stat (ou /proc/<pid>/task/<tid>/stat).
+    ### Returns:
+    - (estado, ppid, tempo de CPU em segundos, número de threads, RSS em MB).
+    """
+    with open(path, "rb") as file:
+        raw = file.read()
+    # O nome do processo (campo 2) pode ter espaços e parênteses, então os campos começam após o último ')'.
+    fields = raw[raw.rindex(b")") + 2:].split()
+    cpu_time = (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+    return fields[0], int(fields[1]), cpu_time, int(fields[17]), int(fields[21]) * PAGE_SIZE_MB
+
+
+def read_thread_cpu_time(pid, tid):
+    """Tempo de CPU de uma thread em segundos, pelo schedstat (nanossegundos) quando disponível."""
+    try:
+        with open(PROC / str(pid) / "task" / str(tid) / "schedstat", "rb") as file:
+            return int(file.read().split()[0]) / 1e9
+    except (FileNotFoundError, IndexError):
+        return read_stat(PROC / str(pid) / "task" / str(tid) / "stat")[2]
 
-    data = {pid: []}
-    iteration_count = 0
 
+def read_cmdline(pid):
     try:
-        proc = psutil.Process(pid)
-    except psutil.NoSuchProcess:
-        logger.error(f"PID {pid} não existe.")
-        return
+        with open(PROC / str(pid) / "cmdline", "rb") as file:
+            return file.read().replace(b"\0", b" ").decode(errors="replace").strip()
+    except (FileNotFoundError, ProcessLookupError, PermissionError):
+        return ""
 
-    logger.warning(f"Processo encontrado: PID={pid}, CMD={proc.cmdline()}")
 
-    while proc.is_running():
-        try:
-            cpu = proc.cpu_percent(interval=None)
-            mem = proc.memory_info().rss / (1024 * 1024)
-            threads = proc.num_threads()
-            timestamp = time.time()
+def read_thread_name(pid, tid):
+    try:
+        with open(PROC / str(pid) / "task" / str(tid) / "comm", "r") as file:
+            return file.read().strip()
+    except (FileNotFoundError, ProcessLookupError):
+        return ""
+
+
+class ProcessTreeSampler():
+    """
+    Amostra CPU e RAM dos processos alvo e dos seus descendentes, lendo o /proc diretamente.
+    Os processos são descobertos de forma incremental: a cada RESCAN_INTERVAL só os PIDs ainda
+    não vistos têm o cmdline lido, e um PID novo cujo pai já é monitorado entra na mesma categoria.
+    Cada amostra vira uma linha de CSV, acrescentada ao arquivo aberto.
+    """
+
+    def __init__(self, writer, targets=None, root_pids=None) -> None:
+        self.writer = writer
+        self.targets = targets or []
+        self.tracked = {} # pid -> target
+        self.seen = {} # pid -> instante em que foi visto pela primeira vez
+        self.last_cpu = {} # pid ou (pid, tid) -> (tempo de CPU, instante)
+        self.thread_names = {} # (pid, tid) -> nome da thread
+        self.last_scan = float("-inf")
+        for pid, target in (root_pids or {}).items():
+            self.tracked[pid] = target
+            self.seen[pid] = time.monotonic()
+
+    def scan(self, now) -> None:
+        """Procurar, entre os PIDs de /proc ainda não vistos, alvos e filhos de processos monitorados."""
+        self.last_scan = now
+        present = {int(entry) for entry in os.listdir(PROC) if entry.isdigit()}
+        # Esquece os PIDs que já não existem, para o dicionário não crescer sem limite.
+        self.seen = {pid: first_seen for pid, first_seen in self.seen.items() if pid in present}
+
+        new_pids = []
+        for pid in present:
+            if pid in self.tracked:
+                continue
+            first_seen = self.seen.setdefault(pid, now)
+            if now - first_seen <= EXEC_GRACE:
+                new_pids.append(pid)
+
+        # Pais antes dos filhos: o PID cresce com a criação, salvo quando o contador dá a volta.
+        for pid in sorted(new_pids):
+            try:
+                ppid = read_stat(PROC / str(pid) / "stat")[1]
+            except (FileNotFoundError, ProcessLookupError):
+                continue
+            target = self.tracked.get(ppid)
+            if target is None and self.targets:
+                cmd = read_cmdline(pid)
+                target = next((t for t in self.targets if t in cmd), None)
+            if target is not None:
+                self.tracked[pid] = target
+                logger.warning(f"Novo processo detectado ({target}): PID {pid}")
+
+    def cpu_percent(self, key, cpu_time, now):
+        """Percentual de CPU desde a amostra anterior (100 = um núcleo inteiro, como no psutil)."""
+        previous = self.last_cpu.get(key)
+        self.last_cpu[key] = (cpu_time, now)
+        if previous is None or now <= previous[1]:
+            return 0.0
+        return 100.0 * (cpu_time - previous[0]) / (now - previous[1])
+
+    def sample(self) -> None:
+        now = time.monotonic()
+        if now - self.last_scan >= RESCAN_INTERVAL:
+            self.scan(now)
+
+        timestamp = time.time()
+        rows = []
+        for pid, target in list(self.tracked.items()):
+            try:
+                state, _, cpu_time, num_threads, memory_mb = read_stat(PROC / str(pid) / "stat")
+            except (FileNotFoundError, ProcessLookupError):
+                state = b"X"
+            if state in (b"Z", b"X"):
+                del self.tracked[pid]
+                self.last_cpu = {key: value for key, value in self.last_cpu.items()
+                                 if key != pid and not (isinstance(key, tuple) and key[0] == pid)}
+                self.thread_names = {key: name for key, name in self.thread_names.items() if key[0] != pid}
+                logger.info(f"Processo finalizado: PID {pid}")
+                continue
+
+            rows.append((timestamp, target, pid, 0, "", round(self.cpu_percent(pid, cpu_time, now), 2),
+                         round(memory_mb, 3), num_threads))
+
+            if PER_THREAD:
+                try:
+                    tids = os.listdir(PROC / str(pid) / "task")
+                except (FileNotFoundError, ProcessLookupError):
+                    continue
+                for tid in map(int, tids):
+                    try:
+                        thread_cpu_time = read_thread_cpu_time(pid, tid)
+                    except (FileNotFoundError, ProcessLookupError):
+                        continue
+                    key = (pid, tid)
+                    if key not in self.thread_names:
+                        self.thread_names[key] = read_thread_name(pid, tid)
+                    name = self.thread_names[key]
+                    rows.append((timestamp, target, pid, tid, name,
+                                 round(self.cpu_percent(key, thread_cpu_time, now), 2), "", ""))
 
-            data[pid].append({
-                "timestamp": timestamp,
-                "cpu_percent": cpu,
-                "memory_mb": mem,
-                "num_threads": threads
-            })
+        self.writer.writerows(rows)
 
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            break
+    def run(self) -> None:
+        next_tick = time.monotonic()
+        next_flush = next_tick + FLUSH_INTERVAL
+        iteration_count = 0
+        while self.tracked:
+            self.sample()
+            iteration_count += 1
 
-        iteration_count += 1
+            now = time.monotonic()
+            if now >= next_flush:
+                self.writer.flush()
+                next_flush = now + FLUSH_INTERVAL
+                logger.debug(f"CSV atualizado ({iteration_count} iterações).")
 
-        if iteration_count % SAVE_INTERVAL == 0:
-            with open(LOG_FILE, "w") as f:
-                json.dump(data, f, indent=2)
-            logger.info(f"JSON atualizado ({iteration_count} iterações).")
+            # Agenda pelo relógio para o intervalo não acumular o tempo gasto na amostra.
+            next_tick += CHECK_INTERVAL
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.monotonic()
 
-        time.sleep(CHECK_INTERVAL)
 
-    # Salva final
-    with open(LOG_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+class CsvAppender():
+    """Acrescenta as amostras ao CSV, com o cabeçalho apenas num arquivo novo."""
 
-    logger.info("Processo finalizado. Monitoramento encerrado.")
-    logger.info(f"Resultados salvos em '{LOG_FILE}'")
+    def __init__(self, path) -> None:
+        new_file = not Path(path).exists() or Path(path).stat().st_size == 0
+        self.file = open(path, "a", newline="", buffering=1024 * 1024)
+        self.writer = csv.writer(self.file)
+        if new_file:
+            self.writer.writerow(CSV_COLUMNS)
 
+    def writerows(self, rows) -> None:
+        self.writer.writerows(rows)
 
-def monitor_by_patterns():
-    """Versão original que monitora vários processos por TARGET_STRINGS."""
-    logger.info(f"Aguardando processos com {TARGET_STRINGS} no comando...")
+    def flush(self) -> None:
+        self.file.flush()
 
-    processes = {}
-    while not any(processes.values()):
-        processes = find_target_processes(TARGET_STRINGS)
-        if not any(processes.values()):
-            time.sleep(CHECK_INTERVAL)
+    def close(self) -> None:
+        self.file.close()
 
-    data = {t: {} for t in TARGET_STRINGS}
-    iteration_count = 0
 
-    active_pids = [p.pid for plist in processes.values() for p in plist]
-    logger.warning(f"Processos encontrados: {active_pids}")
+def report_own_usage(start_wall, start_cpu) -> None:
+    elapsed = time.monotonic() - start_wall
+    own_cpu = sum(os.times()[:2]) - start_cpu
+    if elapsed > 0:
+        logger.info(f"CPU usada pelo monitor: {100.0 * own_cpu / elapsed:.2f}% em {elapsed:.1f} s")
 
-    while any(processes.values()):
-        for target, plist in list(processes.items()):
-            for proc in list(plist):
-                try:
-                    if not proc.is_running():
-                        plist.remove(proc)
-                        continue
 
-                    pid = proc.pid
-                    cpu = proc.cpu_percent(interval=None)
-                    mem = proc.memory_info().rss / (1024 * 1024)
-                    threads = proc.num_threads()
-                    timestamp = time.time()
+def monitor_specific_pid(pid):
+    """Monitorar um PID específico e os processos filhos dele."""
+    logger.info(f"Monitorando somente o PID {pid}")
 
-                    if pid not in data[target]:
-                        data[target][pid] = []
+    if not (PROC / str(pid)).exists():
+        logger.error(f"PID {pid} não existe.")
+        return
 
-                    data[target][pid].append({
-                        "timestamp": timestamp,
-                        "cpu_percent": cpu,
-                        "memory_mb": mem,
-                        "num_threads": threads
-                    })
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    if proc in plist:
-                        plist.remove(proc)
+    logger.warning(f"Processo encontrado: PID={pid}, CMD={read_cmdline(pid)}")
 
-        current_pids = {p.pid for plist in processes.values() for p in plist}
-        new_matches = find_target_processes(TARGET_STRINGS)
+    appender = CsvAppender(LOG_FILE)
+    try:
+        ProcessTreeSampler(appender, root_pids={pid: str(pid)}).run()
+    finally:
+        appender.close()
 
-        for target, new_list in new_matches.items():
-            for new_proc in new_list:
-                if new_proc.pid not in current_pids:
-                    processes[target].append(new_proc)
-                    logger.warning(f"Novo processo detectado ({target}): PID {new_proc.pid}")
+    logger.info("Processo finalizado. Monitoramento encerrado.")
+    logger.info(f"Resultados salvos em '{LOG_FILE}'")
 
-        iteration_count += 1
 
-        if iteration_count % SAVE_INTERVAL == 0:
-            with open(LOG_FILE, "w") as f:
-                json.dump(data, f, indent=2)
-            logger.info(f"JSON atualizado ({iteration_count} iterações).")
+def monitor_by_patterns():
+    """Monitorar os processos cujo comando contém algum dos TARGET_STRINGS, e os filhos deles."""
+    logger.info(f"Aguardando processos com {TARGET_STRINGS} no comando...")
 
-        time.sleep(CHECK_INTERVAL)
+    appender = CsvAppender(LOG_FILE)
+    sampler = ProcessTreeSampler(appender, targets=TARGET_STRINGS)
+    try:
+        while not sampler.tracked:
+            sampler.scan(time.monotonic())
+            if not sampler.tracked:
+                time.sleep(min(CHECK_INTERVAL, RESCAN_INTERVAL))
 
-    with open(LOG_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+        logger.warning(f"Processos encontrados: {list(sampler.tracked)}")
+        sampler.run()
+    finally:
+        appender.close()
 
     logger.info("Todos os processos finalizados. Monitoramento encerrado.")
     logger.info(f"Resultados salvos em '{LOG_FILE}'")
 
 
 def main():
+    start_wall, start_cpu = time.monotonic(), sum(os.times()[:2])
     if specific_pid is not None:
         monitor_specific_pid(specific_pid)
     else:
         monitor_by_patterns()
+    report_own_usage(start_wall, start_cpu)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,105 @@
+from fedt.edge import run_edge
+from fedt.server import run_server
+from fedt.settings import client_script_path, imported_aggregation_strategy
+
+from multiprocessing import Process
+
+import argparse
+import asyncio
+import subprocess
+import time
+
+parse = argparse.ArgumentParser(description="Topologia hierárquica em loopback: root, edges e clientes.")
+parse.add_argument(
+    "--edges",
+    type=int,
+    default=4,
+    help="Número de edges ligados ao root."
+)
+parse.add_argument(
+    "--clients",
+    type=int,
+    default=40,
+    help="Número total de clientes, divididos entre os edges."
+)
+parse.add_argument(
+    "--strategy",
+    type=str,
+    default=imported_aggregation_strategy,
+    help="Estratégia de agregação do root e dos edges."
+)
+parse.add_argument(
+    "--root-port",
+    type=int,
+    default=50051,
+    help="Porta do root."
+)
+parse.add_argument(
+    "--edge-base-port",
+    type=int,
+    default=50061,
+    help="Porta do primeiro edge (os seguintes usam as portas seguintes)."
+)
+
+
+def start_root(strategy, number_of_edges, port):
+    asyncio.run(run_server(strategy, expected_clients=number_of_edges, address=f"127.0.0.1:{port}"))
+
+
+def start_edge(edge_ID, port, number_of_clients, upstream, strategy):
+    asyncio.run(run_edge(edge_ID, port, number_of_clients, upstream, strategy, host="127.0.0.1"))
+
+
+def split_clients(number_of_clients, number_of_edges):
+    """Distribui os IDs dos clientes entre os edges, em blocos contíguos."""
+    base, extra = divmod(number_of_clients, number_of_edges)
+    client_IDs, start = [], 0
+    for edge_ID in range(number_of_edges):
+        size = base + (1 if edge_ID < extra else 0)
+        client_IDs.append(list(range(start, start + size)))
+        start += size
+    return client_IDs
+
+
+def main():
+    args = parse.parse_args()
+    if args.clients < args.edges:
+        raise ValueError("Cada edge precisa de pelo menos um cliente.")
+
+    start_time = time.time()
+    root_proc = Process(target=start_root, args=(args.strategy, args.edges, args.root_port))
+    root_proc.start()
+    time.sleep(3)
+
+    edge_procs = []
+    client_procs = []
+    for edge_ID, client_IDs in enumerate(split_clients(args.clients, args.edges)):
+        edge_port = args.edge_base_port + edge_ID
+        edge_proc = Process(
+            target=start_edge,
+            args=(edge_ID, edge_port, len(client_IDs), f"127.0.0.1:{args.root_port}", args.strategy)
+        )
+        edge_proc.start()
+        edge_procs.append(edge_proc)
+        time.sleep(3)
+
+        for client_ID in client_IDs:
+            cmd = [
+                "python3", client_script_path,
+                "--client-id", str(client_ID),
+                "--strategy", args.strategy,
+                "--server-address", f"127.0.0.1:{edge_port}"
+            ]
+            client_procs.append(subprocess.Popen(cmd))
+
+    for client_proc in client_procs:
+        client_proc.wait()
+    for edge_proc in edge_procs:
+        edge_proc.join()
+    root_proc.join()
+
+    print(f"{args.edges} edges, {args.clients} clientes: {time.time() - start_time:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+from fedt.forest import FlatForest
+
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+
+import argparse
+import time
+
+parse = argparse.ArgumentParser(description="Benchmark de inferência: predict do sklearn vs. FlatForest.")
+parse.add_argument(
+    "--trees",
+    type=int,
+    nargs="+",
+    default=[10, 100, 300, 600, 1000],
+    help="Números de árvores testados."
+)
+parse.add_argument(
+    "--samples",
+    type=int,
+    nargs="+",
+    default=[1, 100, 790],
+    help="Tamanhos dos lotes de amostras (790 é o tamanho da validação do servidor)."
+)
+parse.add_argument(
+    "--jobs",
+    type=int,
+    default=1,
+    help="Número de threads do sklearn e da FlatForest."
+)
+parse.add_argument(
+    "--repeat",
+    type=int,
+    default=5,
+    help="Quantas vezes cada predição é repetida."
+)
+
+
+def build_forest(number_of_trees, n_jobs):
+    """Treina uma floresta em dados sintéticos com o tamanho de uma amostra de cliente."""
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(3000, 22)).astype(np.float32)
+    y = X[:, 0] * 3 + rng.normal(size=3000)
+    return RandomForestRegressor(n_estimators=number_of_trees, n_jobs=n_jobs, random_state=0).fit(X, y)
+
+
+def measure(predict, X, repeat):
+    predict(X)  # aquecimento
+    durations = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        predict(X)
+        durations.append(time.perf_counter() - start_time)
+    return float(np.median(durations))
+
+
+def main():
+    args = parse.parse_args()
+    X = np.random.default_rng(1).normal(size=(max(args.samples), 22)).astype(np.float32)
+
+    print(
+        f"{'árvores':>8}{'amostras':>10}{'sklearn (ms)':>14}{'compilar (ms)':>15}"
+        f"{'vetorizado (ms)':>17}{'flat (ms)':>11}{'speedup':>9}"
+    )
+    for number_of_trees in args.trees:
+        model = build_forest(number_of_trees, args.jobs)
+
+        start_time = time.perf_counter()
+        flat_forest = FlatForest(model.estimators_, args.jobs)
+        flat_forest.compile()
+        compile_time = time.perf_counter() - start_time
+
+        for number_of_samples in args.samples:
+            X_batch = X[:number_of_samples]
+            expected = model.predict(X_batch)
+            vectorised = flat_forest._predict_block(X_batch, flat_forest.roots).mean(axis=0)
+            if not (np.allclose(expected, flat_forest.predict(X_batch)) and np.allclose(expected, vectorised)):
+                raise RuntimeError("A FlatForest divergiu do sklearn.")
+
+            sklearn_time = measure(model.predict, X_batch, args.repeat)
+            flat_time = measure(flat_forest.predict, X_batch, args.repeat)
+            # Percurso vetorizado forçado, mesmo acima de VECTORISED_MAX_SAMPLES.
+            vectorised_time = measure(
+                lambda X_batch: flat_forest._predict_block(X_batch, flat_forest.roots).mean(axis=0),
+                X_batch, args.repeat
+            )
+            print(
+                f"{number_of_trees:>8}{number_of_samples:>10}{sklearn_time * 1000:>14.2f}"
+                f"{compile_time * 1000:>15.2f}{vectorised_time * 1000:>17.2f}"
+                f"{flat_time * 1000:>11.2f}{sklearn_time / flat_time:>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+from fedt.settings import imported_aggregation_strategy
+from fedt.tracing import traces_folder, read_trace_events, TRACE_SUFFIX
+
+import argparse
+import json
+
+parse = argparse.ArgumentParser(description="Junta os traces do servidor, dos edges e dos clientes num único Chrome trace.")
+parse.add_argument(
+    "--strategy",
+    type=str,
+    default=imported_aggregation_strategy,
+    help="Estratégia da simulação (pasta em logs/traces)."
+)
+parse.add_argument(
+    "--sim-number",
+    type=int,
+    default=1,
+    help="Número do arquivo de resultados da simulação (o N de <estratégia>_<nome>_N)."
+)
+parse.add_argument(
+    "--output",
+    type=str,
+    default=None,
+    help="Arquivo de saída (padrão: logs/traces/<estratégia>/<estratégia>_<N>.trace.json)."
+)
+
+
+def main():
+    args = parse.parse_args()
+    folder = traces_folder(args.strategy)
+    trace_files = sorted(folder.glob(f"{args.strategy}_*_{args.sim_number}{TRACE_SUFFIX}"))
+    if not trace_files:
+        raise FileNotFoundError(f"Nenhum trace da simulação {args.sim_number} em {folder}")
+
+    events = []
+    for path in trace_files:
+        events.extend(read_trace_events(path))
+
+    output_path = args.output or folder / f"{args.strategy}_{args.sim_number}.trace.json"
+    with open(output_path, "w", encoding="utf-8") as file:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file, separators=(",", ":"))
+
+    print(f"{len(trace_files)} traces, {len(events)} eventos: {output_path} (abrir no chrome://tracing ou no ui.perfetto.dev)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+from fedt import utils
+from fedt import fedT_pb2
+from fedt import fedT_pb2_grpc
+
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+
+import grpc.aio as grpc_aio
+
+import asyncio
+import argparse
+import time
+
+parse = argparse.ArgumentParser(description="Benchmark em loopback: uma árvore por mensagem vs. lotes de árvores.")
+parse.add_argument(
+    "--trees",
+    type=int,
+    default=900,
+    help="Número de árvores do modelo enviado."
+)
+parse.add_argument(
+    "--chunk-size",
+    type=int,
+    default=1024 * 1024,
+    help="Tamanho máximo de cada lote em bytes."
+)
+parse.add_argument(
+    "--repeat",
+    type=int,
+    default=5,
+    help="Quantas vezes cada transferência é repetida."
+)
+parse.add_argument(
+    "--port",
+    type=int,
+    default=50151,
+    help="Porta usada no loopback."
+)
+
+
+class BenchmarkServicer(fedT_pb2_grpc.FedTServicer):
+    """Servidor mínimo que só envia e recebe as árvores, sem agregação."""
+
+    def __init__(self, serialised_trees, chunk_size) -> None:
+        super().__init__()
+        self.serialised_trees = serialised_trees
+        self.chunk_size = chunk_size
+
+    async def get_server_model(self, request, context):
+        server_message = fedT_pb2.Forest_Server()
+        for tree in self.serialised_trees:
+            server_message.serialised_tree = tree
+            yield server_message
+
+    async def get_server_model_packed(self, request, context):
+        for chunk in utils.chunk_serialised_trees(self.serialised_trees, self.chunk_size):
+            yield fedT_pb2.Forest_Chunk_Server(serialised_trees=chunk)
+
+    async def aggregate_trees(self, request_iterator, context):
+        async for _ in request_iterator:
+            pass
+        yield fedT_pb2.Forest_Server()
+
+    async def aggregate_trees_packed(self, request_iterator, context):
+        async for _ in request_iterator:
+            pass
+        yield fedT_pb2.Forest_Chunk_Server()
+
+
+def build_serialised_trees(number_of_trees):
+    """Treina árvores em dados sintéticos com o tamanho de uma amostra de cliente."""
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(3000, 22))
+    y = X[:, 0] * 3 + rng.normal(size=3000)
+    model = RandomForestRegressor(n_estimators=number_of_trees, n_jobs=-1).fit(X, y)
+    return utils.serialise_several_trees(model.estimators_)
+
+
+async def download_per_tree(stub):
+    messages = 0
+    async for _ in stub.get_server_model(fedT_pb2.Request_Server(client_ID=0)):
+        messages += 1
+    return messages
+
+async def download_packed(stub):
+    messages = 0
+    async for _ in stub.get_server_model_packed(fedT_pb2.Request_Server(client_ID=0)):
+        messages += 1
+    return messages
+
+async def upload_per_tree(stub, serialised_trees):
+    async def _gen():
+        for tree in serialised_trees:
+            yield fedT_pb2.Forest_CLient(client_ID=0, serialised_tree=tree)
+            await asyncio.sleep(0)  # igual ao send_stream_trees do cliente
+    async for _ in stub.aggregate_trees(_gen()):
+        pass
+    return len(serialised_trees)
+
+async def upload_packed(stub, serialised_trees, chunk_size):
+    chunks = list(utils.chunk_serialised_trees(serialised_trees, chunk_size))
+    async def _gen():
+        for chunk in chunks:
+            yield fedT_pb2.Forest_Chunk_Client(client_ID=0, serialised_trees=chunk)
+    async for _ in stub.aggregate_trees_packed(_gen()):
+        pass
+    return len(chunks)
+
+
+async def benchmark(args):
+    serialised_trees = build_serialised_trees(args.trees)
+    payload_bytes = utils.get_size_of_many_serialised_models(serialised_trees)
+    print(f"{args.trees} árvores, {payload_bytes / 1024**2:.2f} MB, lotes de {args.chunk_size} bytes")
+
+    server = grpc_aio.server()
+    fedT_pb2_grpc.add_FedTServicer_to_server(BenchmarkServicer(serialised_trees, args.chunk_size), server)
+    server.add_insecure_port(f"127.0.0.1:{args.port}")
+    await server.start()
+
+    cases = [
+        ("download por árvore", lambda stub: download_per_tree(stub)),
+        ("download em lotes", lambda stub: download_packed(stub)),
+        ("upload por árvore", lambda stub: upload_per_tree(stub, serialised_trees)),
+        ("upload em lotes", lambda stub: upload_packed(stub, serialised_trees, args.chunk_size)),
+    ]
+
+    async with grpc_aio.insecure_channel(f"127.0.0.1:{args.port}") as channel:
+        stub = fedT_pb2_grpc.FedTStub(channel)
+
+        print(f"{'caso':<22}{'mensagens':>10}{'tempo (s)':>12}{'msgs/s':>12}{'MB/s':>10}")
+        for name, run_case in cases:
+            await run_case(stub)  # aquecimento
+
+            durations = []
+            for _ in range(args.repeat):
+                start_time = time.perf_counter()
+                messages = await run_case(stub)
+                durations.append(time.perf_counter() - start_time)
+
+            duration = float(np.median(durations))
+            print(f"{name:<22}{messages:>10}{duration:>12.4f}{messages / duration:>12.1f}{payload_bytes / 1024**2 / duration:>10.1f}")
+
+    await server.stop(grace=None)
+
+
+def main():
+    args = parse.parse_args()
+    asyncio.run(benchmark(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+from fedt import utils
+from fedt import fedT_pb2_grpc
+from fedt.settings import transport_config
+from fedt.transport import create_channel, create_server
+from scripts.protocol_benchmark import BenchmarkServicer, build_serialised_trees, download_packed, upload_packed
+
+import numpy as np
+
+import asyncio
+import argparse
+import time
+
+parse = argparse.ArgumentParser(description="Benchmark em loopback das opções de transporte do gRPC ([settings.transport]).")
+parse.add_argument(
+    "--trees",
+    type=int,
+    default=900,
+    help="Número de árvores do modelo enviado e recebido em cada round."
+)
+parse.add_argument(
+    "--chunk-size",
+    type=int,
+    default=1024 * 1024,
+    help="Tamanho máximo de cada lote em bytes."
+)
+parse.add_argument(
+    "--repeat",
+    type=int,
+    default=5,
+    help="Quantos rounds são medidos em cada configuração."
+)
+parse.add_argument(
+    "--port",
+    type=int,
+    default=50152,
+    help="Porta usada no loopback."
+)
+parse.add_argument(
+    "--interface",
+    type=str,
+    default="lo",
+    help="Interface lida em /proc/net/dev."
+)
+
+# Configurações comparadas: o config.toml e variações de uma opção por vez.
+CASES = {
+    "config.toml": {},
+    "padrão do gRPC": {
+        "compression": "none", "max_message_length": 0, "keepalive_time_ms": 0,
+        "http2_bdp_probe": True, "http2_lookahead_bytes": 0, "http2_max_frame_size": 0
+    },
+    "gzip": {"compression": "gzip"},
+    "deflate": {"compression": "deflate"},
+    "janela 64 KB, sem BDP": {"http2_bdp_probe": False, "http2_lookahead_bytes": 64 * 1024},
+    "janela 8 MB": {"http2_lookahead_bytes": 8 * 1024 * 1024},
+    "frames de 1 MB": {"http2_max_frame_size": 1024 * 1024 - 1},
+    "keepalive 10 s": {"keepalive_time_ms": 10000},
+}
+
+
+def interface_bytes(interface):
+    """Bytes transmitidos pela interface, segundo /proc/net/dev (no loopback cada byte passa uma vez)."""
+    with open("/proc/net/dev", "r", encoding="utf-8") as file:
+        for line in file:
+            name, _, counters = line.partition(":")
+            if name.strip() == interface:
+                return int(counters.split()[8])
+    raise ValueError(f"Interface {interface} não encontrada em /proc/net/dev.")
+
+
+async def run_round(stub, serialised_trees, chunk_size):
+    """Um round do ponto de vista do transporte: upload das árvores do cliente e download do modelo global."""
+    await upload_packed(stub, serialised_trees, chunk_size)
+    await download_packed(stub)
+
+
+async def measure_case(config, serialised_trees, args):
+    server = create_server(config)
+    fedT_pb2_grpc.add_FedTServicer_to_server(BenchmarkServicer(serialised_trees, args.chunk_size), server)
+    server.add_insecure_port(f"127.0.0.1:{args.port}")
+    await server.start()
+
+    try:
+        async with create_channel(f"127.0.0.1:{args.port}", config) as channel:
+            stub = fedT_pb2_grpc.FedTStub(channel)
+            await run_round(stub, serialised_trees, args.chunk_size)  # aquecimento (conexão e janelas)
+
+            durations = []
+            start_bytes = interface_bytes(args.interface)
+            for _ in range(args.repeat):
+                start_time = time.perf_counter()
+                await run_round(stub, serialised_trees, args.chunk_size)
+                durations.append(time.perf_counter() - start_time)
+            wire_bytes = (interface_bytes(args.interface) - start_bytes) / args.repeat
+    finally:
+        await server.stop(grace=None)
+
+    return wire_bytes, float(np.median(durations))
+
+
+async def benchmark(args):
+    serialised_trees = build_serialised_trees(args.trees)
+    payload_bytes = 2 * utils.get_size_of_many_serialised_models(serialised_trees)
+    print(f"{args.trees} árvores, {payload_bytes / 1024**2:.2f} MB de árvores por round (upload + download)")
+
+    print(f"{'configuração':<24}{'MB no fio':>11}{'overhead':>10}{'round (s)':>11}")
+    for name, overrides in CASES.items():
+        wire_bytes, round_time = await measure_case({**transport_config, **overrides}, serialised_trees, args)
+        print(f"{name:<24}{wire_bytes / 1024**2:>11.2f}{wire_bytes / payload_bytes:>10.3f}{round_time:>11.4f}")
+
+
+def main():
+    args = parse.parse_args()
+    asyncio.run(benchmark(args))
+
+
+if __name__ == "__main__":
+    main()
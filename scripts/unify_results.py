@@ -1,9 +1,9 @@
 from fedt.settings import final_results_folder, results_folder, logs_folder
 from fedt.utils import setup_logger, create_strategy_result_folder
+from fedt.metrics import read_metrics, METRICS_SUFFIXES
 from glob import glob
 import json
 from pathlib import Path
-import os
 import pandas as pd
 
 import logging
@@ -14,6 +14,14 @@ logger = setup_logger(
     level=logging.DEBUG
 )
 
+def find_result_file(folder, file_name):
+    """Procura o arquivo de resultados no formato JSONL e, se não existir, no JSON antigo."""
+    for suffix in METRICS_SUFFIXES:
+        path = (folder / f"{file_name}{suffix}").resolve()
+        if path.exists():
+            return path
+    return None
+
 def unify_clients_and_server_data():
     strategies_folder = [path for path in results_folder.iterdir() if path.is_dir()]
 
@@ -31,30 +39,29 @@ def unify_clients_and_server_data():
         logger.warning(f"O {base_target_folder.name} vai ser utilizado como base para a unificação")
         logger.warning(f"Arquivos que serão unificados à base {[additional.name for additional in additional_target_folders]}")
 
-        search_pattern = f"{strategy_folder.name}_{base_target_folder.name}_*.json"
+        search_pattern = f"{strategy_folder.name}_{base_target_folder.name}_*.json*"
         logger.debug(f"Padrão de busca de arquivos: {search_pattern}")
         base_target_files = base_target_folder.glob(search_pattern)
 
         for file_path in base_target_files:
             logger.info(file_path.name)
             
-            simulation_number = (file_path.name).split("_")[-1].replace(".json", "")
+            simulation_number = file_path.stem.split("_")[-1]
             logger.debug(f"Número de simulação: {simulation_number}")
 
-            with open(file_path, "r") as file:
-                base_data = json.load(file)
+            base_data = read_metrics(file_path)
 
             final_data = {base_target_folder.name : base_data}
             
             for target_folder in additional_target_folders:
-                additional_file_path = (target_folder / f"{strategy_folder.name}_{target_folder.name}_{simulation_number}.json").resolve()
-                logger.info(f"O arquivo {additional_file_path.name} será adicionado aos dados.")
+                additional_file_name = f"{strategy_folder.name}_{target_folder.name}_{simulation_number}"
+                additional_file_path = find_result_file(target_folder, additional_file_name)
 
-                if os.path.exists(additional_file_path):
-                    with open(additional_file_path, "r") as file:
-                        final_data[target_folder.name] = json.load(file)
+                if additional_file_path is not None:
+                    logger.info(f"O arquivo {additional_file_path.name} será adicionado aos dados.")
+                    final_data[target_folder.name] = read_metrics(additional_file_path)
                 else:
-                    logger.error(f"O arquivo {additional_file_path} não existe")
+                    logger.error(f"O arquivo {target_folder / additional_file_name} não existe")
 
             output_path = (final_strategy_results_folder / f"{strategy_folder.name}_{simulation_number}.json").resolve()
             with open(output_path, "w") as file:
@@ -212,6 +219,18 @@ def add_cpu_and_ram_on_results(result_data, time_dict, cpu_and_ram_json, user_ty
   #          (network_csv["frame.time_epoch"] <= time_dict[round]["round_end_time"])
  #       ]
 
+def load_cpu_and_ram_csv(path):
+    """
+    ### Função:
+    Ler o CSV do cpu_and_ram_monitor no formato {pid: [amostras]}, só com as linhas dos processos (tid 0).
+    """
+    samples = pd.read_csv(path)
+    samples = samples[samples["tid"] == 0]
+    return {
+        str(pid): frames[["timestamp", "cpu_percent", "memory_mb", "num_threads"]].to_dict("records")
+        for pid, frames in samples.groupby("pid", sort=False)
+    }
+
 def unify_cpu_and_ram_data():
     number_of_rounds = 40
 
@@ -221,16 +240,15 @@ def unify_cpu_and_ram_data():
     logger.info(f"Estrátegias encontradas: {[strategy_folder.name for strategy_folder in strategies_folder]}")
 
     for strategy_folder in strategies_folder:
-        search_pattern = f"cpu_and_ram_*_{strategy_folder.name}_*.json"
+        search_pattern = f"cpu_and_ram_*_{strategy_folder.name}_*.csv"
         logger.debug(f"Padrão de busca de arquivos: {search_pattern}")
         files_path = strategy_folder.glob(search_pattern)
 
         for path in files_path:
             logger.info(path)
-            with open(path, "r") as file:
-                cpu_and_ram_json = json.load(file)
+            cpu_and_ram_json = load_cpu_and_ram_csv(path)
             
-            simulation_number = int((path.name).split("_")[-1].replace(".json", ""))
+            simulation_number = int((path.name).split("_")[-1].replace(".csv", ""))
             logger.debug(f"Número da simulação: {simulation_number}")
 
             strategy_result_file_path = (final_results_folder / strategy_folder.name / f"{strategy_folder.name}_{simulation_number+1}.json").resolve()